@@ -1,30 +1,154 @@
 #!/usr/bin/env python3
 """
 批量解析履歷 PDF，提取姓名、職位、技能等資訊
+
+- 以 ProcessPoolExecutor 平行解析（每個檔案有逾時上限）
+- manifest 以「內容雜湊 + mtime」記錄已處理檔案，重跑只解析新增或變更的 PDF
+- 每解析完一份就寫入 JSONL，中斷後重跑會從未完成的檔案繼續
+- 各頁文字存成壓縮快取（以內容雜湊為 key），重新評分 / 配對時不必再開 PDF
+- --lazy：逐頁擷取，必要欄位都找到就停止
+
+用法：
+    python3 batch-parse-resumes.py [PDF 目錄] [--workers N] [--timeout 秒] [--retry-failed] [--lazy] [--reparse]
 """
+import argparse
+import gzip
+import hashlib
 import os
 import json
 import re
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 import pdfplumber
 
-# 已處理的文件（不重複處理）
-PROCESSED_FILES = [
+DEFAULT_PDF_DIR = '/Users/user/clawd/hr-recruitment/candidates/cambodia-finance/待分类-稍后处理'
+DEFAULT_OUTPUT = '/tmp/batch-parsed-resumes.jsonl'          # 每份一行，逐筆寫入
+DEFAULT_SHEET_OUTPUT = '/tmp/batch-parsed-resumes.json'     # Google Sheets 匯入格式
+DEFAULT_MANIFEST = '/tmp/batch-parsed-resumes.manifest.jsonl'
+DEFAULT_TIMEOUT = 60
+DEFAULT_TEXT_CACHE_DIR = os.environ.get(
+    'STEP1NE_RESUME_TEXT_CACHE_DIR', os.path.expanduser('~/.cache/step1ne/resume-text')
+)
+MAX_PAGES = 3  # 只讀前 3 頁（履歷通常不超過 3 頁）
+
+# 常見職位關鍵字
+FINANCE_POSITIONS = [
+    'finance manager', 'financial manager', 'accounting manager',
+    'finance controller', 'chief financial officer', 'cfo',
+    'finance director', 'finance and accounting manager'
+]
+
+SKILL_KEYWORDS = [
+    'sap', 'excel', 'quickbooks', 'erp', 'financial accounting',
+    'taxation', 'payroll', 'budgeting', 'forecasting', 'auditing',
+    'ifrs', 'gaap', 'cost accounting', 'management accounting',
+    'accounts payable', 'accounts receivable', 'general ledger'
+]
+MAX_SKILLS = 5
+
+# 建立 manifest 之前已處理的文件（不重複處理）
+LEGACY_PROCESSED_IDS = {
     'file_638', 'file_639', 'file_640', 'file_641', 'file_642', 'file_643',
     'file_644', 'file_645', 'file_646', 'file_647', 'file_648'
-]
+}
+
+def file_sha256(path, chunk_size=1 << 20):
+    """檔案內容雜湊"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class TextCache:
+    """
+    PDF 文字快取：內容雜湊 → 各頁文字（gzip JSON）
+    只擷取了部分頁面（lazy）也會存，之後需要更多頁時從下一頁接著擷取
+    """
+
+    def __init__(self, cache_dir=DEFAULT_TEXT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, sha256):
+        return self.cache_dir / sha256[:2] / f'{sha256}.json.gz'
+
+    def load(self, sha256) -> Optional[Dict]:
+        try:
+            with gzip.open(self._path(sha256), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError, EOFError):
+            return None
+
+    def save(self, sha256, pages: List[str], page_count: int):
+        path = self._path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump({'pages': pages, 'page_count': page_count}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+def iter_pdf_pages(pdf_path, max_pages=MAX_PAGES, cache: Optional[TextCache] = None,
+                   sha256=None) -> Iterator[str]:
+    """
+    逐頁產生 PDF 文字：先給快取內的頁面，不夠時才開啟 PDF 接著擷取
+    呼叫端提早停止（break / close）時，已擷取的頁面仍會寫入快取
+    """
+    if cache is not None and sha256 is None:
+        sha256 = file_sha256(pdf_path)
+    entry = cache.load(sha256) if cache is not None else None
+    pages = list(entry['pages']) if entry else []
+    page_count = entry['page_count'] if entry else None
+    cached = len(pages)
 
-def extract_text_from_pdf(pdf_path):
-    """使用 pdfplumber 提取 PDF 文字"""
     try:
+        for text in pages[:max_pages]:
+            yield text
+        if len(pages) >= max_pages or (page_count is not None and len(pages) >= page_count):
+            return
+
         with pdfplumber.open(pdf_path) as pdf:
-            text = ''
-            for page in pdf.pages[:3]:  # 只讀前 3 頁（履歷通常不超過 3 頁）
-                text += page.extract_text() or ''
-            return text
-    except Exception as e:
-        print(f"⚠️  PDF 解析失敗: {e}")
-        return ""
+            page_count = len(pdf.pages)
+            for index in range(len(pages), min(page_count, max_pages)):
+                page = pdf.pages[index]
+                text = page.extract_text() or ''
+                page.close()  # 釋放該頁解析出的物件
+                pages.append(text)
+                yield text
+    finally:
+        if cache is not None and len(pages) > cached:
+            cache.save(sha256, pages, page_count)
+
+def required_fields_found(text):
+    """lazy 模式的停止條件：職位已出現且技能已湊滿（姓名只看第一頁開頭）"""
+    text_lower = text.lower()
+    if not any(pos in text_lower for pos in FINANCE_POSITIONS):
+        return False
+    return sum(1 for skill in SKILL_KEYWORDS if skill in text_lower) >= MAX_SKILLS
+
+def extract_text_from_pdf(pdf_path, lazy=False, cache: Optional[TextCache] = None, sha256=None):
+    """
+    使用 pdfplumber 提取 PDF 文字
+
+    Args:
+        lazy: 逐頁擷取，必要欄位都找到就不再擷取後面的頁面
+              （超過 MAX_SKILLS 個技能分散在不同頁時，列出的技能可能與完整擷取不同）
+        cache: 文字快取；命中時不開啟 PDF
+        sha256: 檔案內容雜湊（已算過時傳入，省去重算）
+
+    Raises:
+        無法開啟或解析 PDF 時直接拋出（由 parse_worker 記為 'error'，可用 --retry-failed 重試）；
+        回傳空字串只代表 PDF 可讀但沒有文字
+    """
+    pages = []
+    for text in iter_pdf_pages(pdf_path, cache=cache, sha256=sha256):
+        pages.append(text)
+        if lazy and required_fields_found('\n'.join(pages)):
+            break
+    return '\n'.join(pages)
 
 def extract_name(text):
     """從履歷中提取姓名"""
@@ -46,15 +170,8 @@ def extract_name(text):
 
 def extract_position(text):
     """提取職位"""
-    # 常見職位關鍵字
-    finance_positions = [
-        'finance manager', 'financial manager', 'accounting manager',
-        'finance controller', 'chief financial officer', 'cfo',
-        'finance director', 'finance and accounting manager'
-    ]
-    
     text_lower = text.lower()
-    for pos in finance_positions:
+    for pos in FINANCE_POSITIONS:
         if pos in text_lower:
             return pos.title()
     
@@ -63,41 +180,28 @@ def extract_position(text):
 def extract_skills(text):
     """提取技能關鍵字"""
     skills = []
-    skill_keywords = [
-        'sap', 'excel', 'quickbooks', 'erp', 'financial accounting',
-        'taxation', 'payroll', 'budgeting', 'forecasting', 'auditing',
-        'ifrs', 'gaap', 'cost accounting', 'management accounting',
-        'accounts payable', 'accounts receivable', 'general ledger'
-    ]
-    
     text_lower = text.lower()
-    for skill in skill_keywords:
+    for skill in SKILL_KEYWORDS:
         if skill in text_lower:
             skills.append(skill.upper() if len(skill) <= 4 else skill.title())
     
-    return ', '.join(skills[:5]) if skills else "待確認"
+    return ', '.join(skills[:MAX_SKILLS]) if skills else "待確認"
 
-def parse_resume(pdf_path):
-    """解析單個履歷"""
-    text = extract_text_from_pdf(pdf_path)
-    if not text:
-        return None
-    
-    name = extract_name(text)
-    position = extract_position(text)
-    skills = extract_skills(text)
-    
+def file_id_for(pdf_path):
+    """檔名 → 檔案 ID（LinkedIn 匯出檔名以 --- 分隔）"""
     filename = Path(pdf_path).name
-    file_id = filename.split('---')[0] if '---' in filename else filename.replace('.pdf', '')
-    
+    return filename.split('---')[0] if '---' in filename else filename.replace('.pdf', '')
+
+def build_candidate(pdf_path, text):
+    """由履歷文字建立候選人資料"""
     return {
-        'name': name,
+        'name': extract_name(text),
         'contact': '待補充',
-        'position': position,
-        'skills': skills,
+        'position': extract_position(text),
+        'skills': extract_skills(text),
         'experience_years': '待確認',
         'education': '待確認',
-        'file_link': file_id,
+        'file_link': file_id_for(pdf_path),
         'status': 'PDF已解析',
         'consultant': 'Jacky',
         'notes': 'LinkedIn公開搜尋候選人',
@@ -105,36 +209,191 @@ def parse_resume(pdf_path):
         'updated_date': '2026-02-12'
     }
 
-def main():
-    # 找出所有 PDF 文件
-    pdf_dir = Path('/Users/user/clawd/hr-recruitment/candidates/cambodia-finance/待分类-稍后处理')
-    pdf_files = list(pdf_dir.glob('*.pdf'))
-    
+def parse_resume(pdf_path, lazy=False, cache: Optional[TextCache] = None, sha256=None):
+    """解析單個履歷"""
+    text = extract_text_from_pdf(pdf_path, lazy=lazy, cache=cache, sha256=sha256)
+    if not text:
+        return None
+    return build_candidate(pdf_path, text)
+
+# ==================== 平行解析 ====================
+
+class ParseTimeout(BaseException):
+    """單檔解析逾時（繼承 BaseException，才不會被 pdfplumber 內部的 except Exception 吞掉）"""
+
+def _raise_timeout(signum, frame):
+    raise ParseTimeout()
+
+def parse_worker(pdf_path, timeout, sha256=None, lazy=False, cache_dir=DEFAULT_TEXT_CACHE_DIR):
+    """在子行程中解析一份 PDF；所有錯誤都轉成結果回傳，不讓例外打斷整批"""
+    start = time.perf_counter()
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(int(timeout))
+    try:
+        cache = TextCache(cache_dir) if cache_dir else None
+        candidate = parse_resume(pdf_path, lazy=lazy, cache=cache, sha256=sha256)
+        status = 'ok' if candidate else 'empty'
+        error = None if candidate else '沒有可擷取的文字'
+    except ParseTimeout:
+        candidate, status, error = None, 'timeout', f'超過 {timeout} 秒'
+    except Exception as e:
+        candidate, status, error = None, 'error', str(e)
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    return {'path': pdf_path, 'status': status, 'error': error, 'candidate': candidate,
+            'seconds': round(time.perf_counter() - start, 3)}
+
+class IngestManifest:
+    """
+    增量處理紀錄（append-only JSONL，每處理完一份就 fsync 一行）
+
+    - 路徑的大小與 mtime 沒變 → 直接略過，不必重算雜湊
+    - mtime 變了但內容雜湊已處理過（touch、改名、複製）→ 只更新紀錄
+    - 失敗或逾時的檔案預設不重試，除非檔案內容改變或指定 retry_failed
+    - reparse：全部重新解析（例如調整了欄位規則；文字來自快取，不會重開 PDF）
+    """
+
+    DONE = ('ok', 'empty', 'legacy')
+
+    def __init__(self, path, retry_failed=False, reparse=False):
+        self.path = path
+        self.retry_failed = retry_failed
+        self.reparse = reparse
+        self.entries: Dict[str, Dict] = {}   # 路徑 → 最新紀錄
+        self.by_hash: Dict[str, Dict] = {}   # 內容雜湊 → 最新紀錄
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 中斷時寫到一半的最後一行
+                    self._index(entry)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def _index(self, entry):
+        self.entries[entry['path']] = entry
+        if entry.get('sha256'):
+            self.by_hash[entry['sha256']] = entry
+
+    def _is_done(self, entry):
+        if self.reparse:
+            return False
+        return entry['status'] in self.DONE or not self.retry_failed
+
+    def plan(self, pdf_path) -> Tuple[bool, Dict]:
+        """判斷是否需要解析；回傳 (需要解析, 檔案資訊)"""
+        stat = os.stat(pdf_path)
+        info = {'path': str(pdf_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        entry = self.entries.get(info['path'])
+        if entry and entry['size'] == info['size'] and entry['mtime_ns'] == info['mtime_ns']:
+            return not self._is_done(entry), dict(info, sha256=entry.get('sha256'))
+
+        info['sha256'] = file_sha256(pdf_path)
+        seen = self.by_hash.get(info['sha256'])
+        if seen and self._is_done(seen):
+            self.record(info, seen['status'], seen.get('error'))
+            return False, info
+        if entry is None and not self.reparse and file_id_for(pdf_path) in LEGACY_PROCESSED_IDS:
+            self.record(info, 'legacy')
+            return False, info
+        return True, info
+
+    def record(self, info, status, error=None):
+        entry = dict(info, status=status, error=error, recorded_at=time.time())
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._index(entry)
+
+    def close(self):
+        self.file.close()
+
+def iter_parsed(output_path) -> Iterator[Dict]:
+    """讀取 JSONL 結果（略過中斷時寫到一半的行）"""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def ingest(pdf_dir, output_path=DEFAULT_OUTPUT, manifest_path=DEFAULT_MANIFEST,
+           workers=None, timeout=DEFAULT_TIMEOUT, retry_failed=False, reparse=False,
+           lazy=False, cache_dir=DEFAULT_TEXT_CACHE_DIR) -> Dict[str, int]:
+    """
+    平行解析目錄內新增或變更的 PDF，結果逐筆附加到 output_path
+
+    Args:
+        lazy: 必要欄位找到就停止擷取後面的頁面
+        cache_dir: 文字快取目錄（None = 不使用快取）
+    """
+    pdf_files = sorted(Path(pdf_dir).glob('*.pdf'))
     print(f"📂 找到 {len(pdf_files)} 個 PDF 文件")
-    
-    # 過濾已處理的
-    unprocessed = [
-        f for f in pdf_files 
-        if not any(proc in f.name for proc in PROCESSED_FILES)
-    ]
-    
-    print(f"📝 待處理：{len(unprocessed)} 個")
-    
-    results = []
-    for i, pdf_path in enumerate(unprocessed, 1):
-        print(f"[{i}/{len(unprocessed)}] 解析 {pdf_path.name}...", end=' ')
-        
-        candidate = parse_resume(str(pdf_path))
-        if candidate:
-            results.append(candidate)
-            print(f"✓ {candidate['name']}")
-        else:
-            print("✗ 失敗")
-    
-    # 輸出 JSON（供 Google Sheets 匯入）
-    output_path = '/tmp/batch-parsed-resumes.json'
-    
-    # 轉換成 Google Sheets 格式
+
+    manifest = IngestManifest(manifest_path, retry_failed=retry_failed, reparse=reparse)
+    pending = []
+    for pdf_path in pdf_files:
+        needed, info = manifest.plan(pdf_path)
+        if needed:
+            pending.append(info)
+    print(f"📝 待處理：{len(pending)} 個（略過 {len(pdf_files) - len(pending)} 個已處理）")
+
+    counts = {'ok': 0, 'empty': 0, 'error': 0, 'timeout': 0}
+    if not pending:
+        manifest.close()
+        return counts
+
+    workers = workers or os.cpu_count() or 1
+    # 大檔先送，避免最後剩一個大檔拖慢整批
+    pending.sort(key=lambda info: info['size'], reverse=True)
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool, \
+                open(output_path, 'a', encoding='utf-8') as out:
+            futures = {
+                pool.submit(parse_worker, info['path'], timeout, info['sha256'], lazy, cache_dir): info
+                for info in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                info = futures[future]
+                name = Path(info['path']).name
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 子行程異常結束（BrokenProcessPool 等）：不寫入 manifest，下次重跑會再處理
+                    print(f"[{done}/{len(pending)}] ✗ {name}: {e}")
+                    continue
+
+                if result['candidate']:
+                    record = {'sha256': info['sha256'], 'path': info['path'], 'candidate': result['candidate']}
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    out.flush()
+                manifest.record(info, result['status'], result['error'])
+                counts[result['status']] += 1
+
+                if result['candidate']:
+                    print(f"[{done}/{len(pending)}] ✓ {result['candidate']['name']} ({name}, {result['seconds']:.1f}s)")
+                else:
+                    print(f"[{done}/{len(pending)}] ✗ {name}: {result['error']}")
+    finally:
+        manifest.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n⏱️  {len(pending)} 個檔案，{workers} 個行程，耗時 {elapsed:.1f} 秒")
+    return counts
+
+def write_sheet_json(output_path, sheet_path):
+    """把 JSONL 結果轉成 Google Sheets 匯入格式（同一檔案只保留最新一筆）"""
+    latest = {}
+    for record in iter_parsed(output_path):
+        latest[record['path']] = record['candidate']
+
     sheet_data = [
         [
             c['name'], c['contact'], c['position'], c['skills'],
@@ -142,16 +401,42 @@ def main():
             c['status'], c['consultant'], c['notes'],
             c['created_date'], c['updated_date']
         ]
-        for c in results
+        for c in latest.values()
     ]
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
+
+    with open(sheet_path, 'w', encoding='utf-8') as f:
         json.dump(sheet_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"\n✅ 完成！共解析 {len(results)} 人")
-    print(f"📄 結果：{output_path}")
-    
-    return results
+    return len(sheet_data)
+
+def main():
+    parser = argparse.ArgumentParser(description='批量解析履歷 PDF（平行 + 增量）')
+    parser.add_argument('pdf_dir', nargs='?', default=DEFAULT_PDF_DIR, help='PDF 目錄')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='JSONL 結果（逐筆附加）')
+    parser.add_argument('--sheet-output', default=DEFAULT_SHEET_OUTPUT, help='Google Sheets 匯入用 JSON')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help='增量處理紀錄')
+    parser.add_argument('--workers', type=int, default=None, help='平行行程數（預設 CPU 核心數）')
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT, help='單檔解析逾時秒數（0 = 不限）')
+    parser.add_argument('--retry-failed', action='store_true', help='重試先前失敗或逾時的檔案')
+    parser.add_argument('--reparse', action='store_true', help='全部重新解析（文字取自快取，不重開 PDF）')
+    parser.add_argument('--lazy', action='store_true', help='逐頁擷取，必要欄位找到就停止')
+    parser.add_argument('--text-cache', default=DEFAULT_TEXT_CACHE_DIR, help='PDF 文字快取目錄')
+    parser.add_argument('--no-text-cache', action='store_true', help='不使用文字快取')
+    args = parser.parse_args()
+
+    if not Path(args.pdf_dir).is_dir():
+        print(f"❌ 找不到目錄：{args.pdf_dir}")
+        sys.exit(1)
+
+    counts = ingest(args.pdf_dir, args.output, args.manifest, args.workers, args.timeout,
+                    retry_failed=args.retry_failed, reparse=args.reparse, lazy=args.lazy,
+                    cache_dir=None if args.no_text_cache else args.text_cache)
+    total = write_sheet_json(args.output, args.sheet_output)
+
+    print(f"\n✅ 完成！本次解析 {counts['ok']} 人（無文字 {counts['empty']}、失敗 {counts['error']}、逾時 {counts['timeout']}）")
+    print(f"📄 結果：{args.output}")
+    print(f"📄 Sheets 匯入（累計 {total} 人）：{args.sheet_output}")
+
+    return counts
 
 if __name__ == '__main__':
     main()
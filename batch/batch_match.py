@@ -6,57 +6,134 @@
 
 import json
 import os
+import re
 import sys
 from datetime import datetime
+from functools import lru_cache
 
 # 匹配度門檻
 THRESHOLD_HIGH = 90    # 高匹配：建議直接推
 THRESHOLD_MID = 70     # 中匹配：需顧問確認
 THRESHOLD_LOW = 70     # 低於此值：放履歷池
 
-def extract_skills(text):
-    """從文本中提取技能關鍵字"""
-    skills = []
-    
+# 技能字典（標準名稱，比對不分大小寫）
+SKILL_CATEGORIES = {
     # 程式語言
-    langs = ['Python', 'Java', 'JavaScript', 'TypeScript', 'Go', 'Golang', 
-             'C++', 'C#', 'Ruby', 'PHP', 'Rust', 'Kotlin', 'Swift', 'Scala',
-             'Node.js', 'NodeJS']
-    
+    'langs': ['Python', 'Java', 'JavaScript', 'TypeScript', 'Go', 'C++', 'C#', 'Ruby',
+              'PHP', 'Rust', 'Kotlin', 'Swift', 'Scala', 'Node.js'],
     # 框架
-    frameworks = ['React', 'Vue', 'Angular', 'Express', 'FastAPI', 'Django',
-                  'Flask', 'Spring', 'SpringBoot', 'Laravel', 'Rails', 'Gin',
-                  'Next.js', 'Nuxt.js', 'NestJS']
-    
+    'frameworks': ['React', 'Vue', 'Angular', 'Express', 'FastAPI', 'Django',
+                   'Flask', 'Spring', 'SpringBoot', 'Laravel', 'Rails', 'Gin',
+                   'Next.js', 'Nuxt.js', 'NestJS'],
     # 資料庫
-    databases = ['MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Elasticsearch',
-                 'Cassandra', 'DynamoDB', 'SQL Server', 'Oracle', 'SQLite']
-    
+    'databases': ['MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Elasticsearch',
+                  'Cassandra', 'DynamoDB', 'SQL Server', 'Oracle', 'SQLite'],
     # 雲服務
-    cloud = ['AWS', 'GCP', 'Azure', 'Alibaba Cloud', 'EC2', 'S3', 'RDS',
-             'Lambda', 'CloudFront', 'EKS', 'ECS']
-    
+    'cloud': ['AWS', 'GCP', 'Azure', 'Alibaba Cloud', 'EC2', 'S3', 'RDS',
+              'Lambda', 'CloudFront', 'EKS', 'ECS'],
     # DevOps
-    devops = ['Docker', 'Kubernetes', 'K8s', 'Jenkins', 'GitLab CI', 
-              'GitHub Actions', 'Terraform', 'Ansible', 'Prometheus', 'Grafana']
-    
+    'devops': ['Docker', 'Kubernetes', 'Jenkins', 'GitLab CI', 'GitHub Actions',
+               'Terraform', 'Ansible', 'Prometheus', 'Grafana'],
     # 其他
-    others = ['REST', 'RESTful', 'GraphQL', 'gRPC', 'Microservices', '微服務',
-              'Agile', 'Scrum', 'TDD', 'CI/CD', 'Linux', 'Git']
-    
-    all_skills = langs + frameworks + databases + cloud + devops + others
-    
-    text_upper = text.upper()
-    for skill in all_skills:
-        if skill.upper() in text_upper:
-            skills.append(skill)
-    
-    return list(set(skills))
+    'others': ['REST', 'GraphQL', 'gRPC', 'Microservices', 'Agile', 'Scrum',
+               'TDD', 'CI/CD', 'Linux', 'Git'],
+}
+
+# 同義詞 → 標準名稱
+SKILL_SYNONYMS = {
+    'Golang': 'Go',
+    'NodeJS': 'Node.js',
+    'K8s': 'Kubernetes',
+    'Spring Boot': 'SpringBoot',
+    'RESTful': 'REST',
+    '微服務': 'Microservices',
+    'Postgres': 'PostgreSQL',
+    'ReactJS': 'React',
+    'React.js': 'React',
+    'VueJS': 'Vue',
+    'Vue.js': 'Vue',
+    'NextJS': 'Next.js',
+    'NuxtJS': 'Nuxt.js',
+    'Nest.js': 'NestJS',
+    'Amazon Web Services': 'AWS',
+    'Google Cloud': 'GCP',
+    'CICD': 'CI/CD',
+}
+
+# 英數 token：C++ / C# / Node.js / EC2 視為一個 token；結尾的句點、斜線、連字號都是分隔
+# + / # 只能出現在 token 結尾（++ 或 #），Python+Django / Docker+K8s 拆成兩個 token
+TOKEN_RE = re.compile(r'[a-z0-9]+(?:\+\+|#)?(?:\.[a-z0-9]+)*')
+_ASCII_ALNUM = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+# 結尾版本號：Python3 / Java8 / C++17 / python3.11 / go1.21（Java-v8 的連字號本身就是分隔）
+VERSION_SUFFIX_RE = re.compile(r'\d+(?:\.\d+)*$')
+
+
+def _compile_skill_dictionary():
+    """把技能字典編譯成三種查表結構（模組載入時執行一次）"""
+    order = [skill for skills in SKILL_CATEGORIES.values() for skill in skills]
+    aliases = {skill: skill for skill in order}
+    aliases.update(SKILL_SYNONYMS)
+
+    tokens = {}    # 單一 token 的別名 → 標準名稱（集合交集即可比對）
+    phrases = {}   # 多字 / 含斜線的別名 → 標準名稱（只在開頭 token 出現時才跑 regex）
+    cjk = {}       # 中文別名 → 標準名稱（子字串比對）
+    for alias, skill in aliases.items():
+        key = alias.lower()
+        if not key.isascii():
+            cjk[key] = skill
+        elif TOKEN_RE.fullmatch(key):
+            tokens[key] = skill
+        else:
+            phrases[key] = skill
+
+    heads = {TOKEN_RE.match(key).group(0) for key in phrases}
+    # 左邊界在比對後檢查：pattern 以字面字元開頭，regex 引擎才能快速略過不可能的位置
+    phrase_re = re.compile(
+        '(?:'
+        + '|'.join(r'\s*/\s*'.join(r'\s+'.join(re.escape(w) for w in part.split()) for part in key.split('/'))
+                   for key in sorted(phrases, key=len, reverse=True))
+        + r')(?![a-z0-9])'
+    )
+    rank = {skill: i for i, skill in enumerate(order)}
+    return tokens, phrases, heads, phrase_re, cjk, rank
+
+
+_SKILL_TOKENS, _SKILL_PHRASES, _PHRASE_HEADS, _PHRASE_RE, _SKILL_CJK, _SKILL_RANK = _compile_skill_dictionary()
+
+
+def extract_skills(text):
+    """從文本中提取技能關鍵字（整份文本只切一次 token；依 token 邊界比對，Go 不會命中 GOOGLE）"""
+    lowered = text.lower()
+    tokens = set(TOKEN_RE.findall(lowered))
+
+    skills = {_SKILL_TOKENS[token] for token in tokens & _SKILL_TOKENS.keys()}
+    for token in tokens - _SKILL_TOKENS.keys():
+        # 字典沒有的 token 才去掉版本號再查（EC2 / S3 本身在字典中，不受影響）
+        if token[-1].isdigit():
+            base = VERSION_SUFFIX_RE.sub('', token)
+            if len(base) > 1 and base in _SKILL_TOKENS:
+                skills.add(_SKILL_TOKENS[base])
+    if not tokens.isdisjoint(_PHRASE_HEADS):
+        for match in _PHRASE_RE.finditer(lowered):
+            start = match.start()
+            if start and lowered[start - 1] in _ASCII_ALNUM:
+                continue
+            key = ' '.join(match.group(0).replace('/', ' / ').split()).replace(' / ', '/')
+            skills.add(_SKILL_PHRASES[key])
+    for alias, skill in _SKILL_CJK.items():
+        if alias in lowered:
+            skills.add(skill)
+
+    return sorted(skills, key=_SKILL_RANK.__getitem__)
+
+
+@lru_cache(maxsize=128)
+def parse_jd(jd_text):
+    """解析 JD（技能、年資）；同一份 JD 只解析一次"""
+    return tuple(extract_skills(jd_text)), extract_experience_years(jd_text)
 
 def extract_experience_years(text):
     """從文本中提取工作年資"""
-    import re
-    
     # 尋找 "X年" 或 "X years" 模式
     patterns = [
         r'(\d+)\s*[+]?\s*年',
@@ -86,8 +163,9 @@ def calculate_match_score(resume_skills, jd_skills, resume_exp, jd_exp):
         skill_ratio = len(matched_skills) / len(jd_skills)
         score += skill_ratio * 70
         
+        resume_upper = set(s.upper() for s in resume_skills)
         for skill in jd_skills:
-            if skill.upper() in [s.upper() for s in resume_skills]:
+            if skill.upper() in resume_upper:
                 match_items.append(f"{skill} ✓")
             else:
                 gap_items.append(f"{skill}（缺少）")
@@ -112,13 +190,11 @@ def calculate_match_score(resume_skills, jd_skills, resume_exp, jd_exp):
 
 def match_resume_to_jd(resume_text, jd_text):
     """單份履歷與 JD 匹配"""
-    # 提取技能
+    # 提取技能、年資（JD 結果有快取）
+    jd_skills, jd_exp = parse_jd(jd_text)
+    jd_skills = list(jd_skills)
     resume_skills = extract_skills(resume_text)
-    jd_skills = extract_skills(jd_text)
-    
-    # 提取年資
     resume_exp = extract_experience_years(resume_text)
-    jd_exp = extract_experience_years(jd_text)
     
     # 計算匹配度
     score, match_items, gap_items = calculate_match_score(
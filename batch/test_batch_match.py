@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+batch_match.extract_skills 測試：token 邊界、版本號、以 + 串接的技能
+
+用法：
+    python3 test_batch_match.py
+    python3 -m pytest test_batch_match.py
+"""
+
+import unittest
+
+from batch_match import extract_skills
+
+# (文本, 預期技能)
+CASES = [
+    # token 邊界：字典字不會命中較長的字
+    ('GOOGLE', []),
+    ('GITHUB', []),
+    ('ENGINEER', []),
+    ('Go, Git, Gin', ['Go', 'Gin', 'Git']),
+    # 以 + 串接的技能
+    ('Python+Django', ['Python', 'Django']),
+    ('Java+Spring', ['Java', 'Spring']),
+    ('React+Redux', ['React']),
+    ('Docker+K8s', ['Docker', 'Kubernetes']),
+    # 結尾的 ++ / # 與版本號
+    ('C++/C#', ['C++', 'C#']),
+    ('Python3 Java8 C++17', ['Python', 'Java', 'C++']),
+    ('python3.11, go1.21', ['Python', 'Go']),
+    ('EC2, S3', ['EC2', 'S3']),
+    # 同義詞、片語、中文
+    ('Golang, NodeJS, Vue.js', ['Go', 'Node.js', 'Vue']),
+    ('CI/CD with GitHub Actions', ['GitHub Actions', 'CI/CD']),
+    ('熟悉微服務架構', ['Microservices']),
+]
+
+
+class ExtractSkillsTest(unittest.TestCase):
+
+    def test_cases(self):
+        for text, expected in CASES:
+            with self.subTest(text=text):
+                self.assertEqual(extract_skills(text), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
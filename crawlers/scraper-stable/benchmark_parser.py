@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+104 snapshot 解析基準測試 - BD 爬蟲穩定版
+對一批已存的 snapshot 比較舊版（每次呼叫重新查 regex 快取、逐位置比對）與預編譯版解析的成本，並確認結果一致
+
+用法：
+    python3 benchmark_parser.py [snapshot 目錄] [--repeat N]
+    目錄內每個 *.txt 為一份 agent-browser snapshot；未指定目錄時產生模擬 snapshot
+"""
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import List
+
+from utils import parse_104_snapshot
+
+
+def _legacy_extract_phone(text):
+    for pattern in [r'0\d{1,2}[-\s]?\d{3,4}[-\s]?\d{4}', r'0\d{9,10}', r'\(\d{2,3}\)\s?\d{3,4}[-\s]?\d{4}']:
+        match = re.search(pattern, text)
+        if match:
+            phone = re.sub(r'[\s\(\)]', '', match.group(0))
+            if len(phone) == 10 and phone.startswith('0'):
+                if phone[1] in ['2', '3', '4', '5', '6', '7', '8']:
+                    return f"{phone[:2]}-{phone[2:6]}-{phone[6:]}"
+                return f"{phone[:4]}-{phone[4:7]}-{phone[7:]}"
+            return phone
+    return None
+
+
+def _legacy_extract_website(text):
+    match = re.search(r'(?:公司網址|官網|網址|Website|官方網站)[:：\s]+([^\s\n\)]+)', text, re.IGNORECASE)
+    if match:
+        url = match.group(1).strip('.,;、。，；\'")')
+        if '104.com.tw' not in url:
+            return url if url.startswith('http') else 'https://' + url
+    for url in re.findall(r'https?://[^\s\n\)]+', text):
+        url = url.strip('.,;、。，；\'")')
+        if '104.com.tw' not in url:
+            return url
+    www_match = re.search(r'(www\.[^\s\n\)]+)', text)
+    if www_match:
+        url = www_match.group(1).strip('.,;、。，；\'")')
+        if '104.com.tw' not in url:
+            return url if url.startswith('http') else 'https://' + url
+    return None
+
+
+def legacy_parse_104_snapshot(snapshot_text: str) -> dict:
+    """舊版實作（僅供基準比較與結果比對）"""
+    data = dict.fromkeys(['phone', 'email', 'website', 'address', 'industry', 'services'])
+    if not snapshot_text:
+        return data
+
+    data['phone'] = _legacy_extract_phone(snapshot_text)
+    match = re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', snapshot_text)
+    data['email'] = match.group(0).lower() if match else None
+
+    match = re.search(r'heading "公司網址".*?/url:\s*([^\s\n]+)', snapshot_text, re.DOTALL)
+    if match and '104.com.tw' not in match.group(1).strip():
+        data['website'] = match.group(1).strip()
+    if not data['website']:
+        data['website'] = _legacy_extract_website(snapshot_text)
+
+    for field, pattern in [
+        ('address', r'(?:地址|位置|Address)[:：\s]+([^\n]{10,100})'),
+        ('industry', r'(?:產業類別|產業|Industry)[:：\s]+([^\n]{5,50})'),
+        ('services', r'(?:主要商品|服務項目|Products|Services)[:：\s]+([^\n]{10,200})'),
+    ]:
+        match = re.search(pattern, snapshot_text)
+        if match:
+            data[field] = match.group(1).strip()
+    return data
+
+
+def synthetic_snapshot(rng: random.Random) -> str:
+    """產生一份模擬的 104 公司頁 snapshot（accessibility tree 格式，約 10-20 KB）"""
+    lines = ['- document:', '  - banner:', '    - link "104人力銀行" [ref=e1]:',
+             '      - /url: https://www.104.com.tw/']
+    for i in range(rng.randint(80, 160)):
+        lines.append(f'    - link "熱門職缺 {i}" [ref=e{i + 10}]:')
+        lines.append(f'      - /url: https://www.104.com.tw/job/{rng.randint(10000, 99999):x}?jobsource=cs_{i}')
+        if rng.random() < 0.2:
+            lines.append(f'      - text: 工作地點 台北市 薪資 {rng.randint(30, 80)},000 以上 經歷 {rng.randint(1, 5)} 年')
+
+    lines.append('  - heading "公司介紹" [level=2]')
+    lines.append('  - paragraph: ' + '我們致力於提供優質的產品與服務，' * rng.randint(5, 20))
+    if rng.random() < 0.8:
+        lines.append(f'  - text: 產業類別 {rng.choice(["電腦軟體服務業", "半導體製造業", "其他金融及輔助業"])}')
+    if rng.random() < 0.8:
+        lines.append(f'  - text: 地址 台北市信義區信義路五段{rng.randint(1, 200)}號{rng.randint(2, 30)}樓')
+    if rng.random() < 0.7:
+        lines.append(f'  - text: 電話 0{rng.randint(2, 8)}-{rng.randint(2000, 2999)}-{rng.randint(1000, 9999)}')
+    elif rng.random() < 0.5:
+        lines.append(f'  - text: 聯絡電話 ({rng.randint(2, 8):02d}) {rng.randint(2000, 2999)}-{rng.randint(1000, 9999)}')
+    if rng.random() < 0.3:
+        lines.append(f'  - text: 聯絡信箱 hr{rng.randint(1, 99)}@example{rng.randint(1, 9)}.com.tw')
+    if rng.random() < 0.6:
+        lines.append('  - heading "公司網址" [level=3]')
+        lines.append(f'  - link "https://www.company{rng.randint(1, 999)}.com.tw" [ref=e900]:')
+        lines.append(f'    - /url: https://www.company{rng.randint(1, 999)}.com.tw')
+    if rng.random() < 0.7:
+        lines.append('  - text: 主要商品/服務項目 ' + '、'.join(rng.sample(
+            ['雲端服務', '軟體開發', '系統整合', '資料分析', '晶圓代工', '行動支付'], 3)))
+    lines.append('  - contentinfo:')
+    lines.append('    - text: 客服電話 02-6638-0104 服務時間 09:00-18:00')
+    return '\n'.join(lines)
+
+
+def load_corpus(snapshot_dir: str = None, size: int = 500) -> List[str]:
+    """讀取 snapshot 目錄；未指定時產生模擬 snapshot"""
+    if snapshot_dir:
+        return [p.read_text(encoding='utf-8') for p in sorted(Path(snapshot_dir).glob('*.txt'))]
+    rng = random.Random(104)
+    return [synthetic_snapshot(rng) for _ in range(size)]
+
+
+def benchmark(corpus: List[str], repeat: int = 3):
+    """比較兩種解析的每份 snapshot 成本，並檢查結果一致"""
+    mismatches = [i for i, text in enumerate(corpus)
+                  if parse_104_snapshot(text) != legacy_parse_104_snapshot(text)]
+
+    def per_snapshot_ms(func) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for text in corpus:
+                func(text)
+            best = min(best, time.perf_counter() - start)
+        return best / len(corpus) * 1000
+
+    legacy_ms = per_snapshot_ms(legacy_parse_104_snapshot)
+    fast_ms = per_snapshot_ms(parse_104_snapshot)
+    total_kb = sum(len(t) for t in corpus) / 1024
+
+    print(f"=== 104 snapshot 解析基準（{len(corpus)} 份，平均 {total_kb / len(corpus):.1f} KB）===\n")
+    print(f"{'legacy (per-field search)':<28} {legacy_ms:7.3f} ms/snapshot")
+    print(f"{'precompiled + literal anchors':<28} {fast_ms:7.3f} ms/snapshot")
+    print(f"\n每 1,000 家公司解析時間: {legacy_ms:.2f} s → {fast_ms:.2f} s")
+    print(f"\n結果不一致: {len(mismatches)} 份" + (f"（{mismatches[:10]}）" if mismatches else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='104 snapshot 解析基準測試')
+    parser.add_argument('snapshot_dir', nargs='?', help='snapshot 目錄（*.txt）')
+    parser.add_argument('--size', type=int, default=500, help='模擬 snapshot 數量')
+    parser.add_argument('--repeat', type=int, default=3, help='重複次數（取最佳）')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.snapshot_dir, args.size)
+    if not corpus:
+        print(f"{args.snapshot_dir} 內沒有 *.txt snapshot")
+        return
+    benchmark(corpus, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
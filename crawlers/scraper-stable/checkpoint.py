@@ -1,26 +1,40 @@
 #!/usr/bin/env python3
 """
 斷點續傳管理 - BD 爬蟲穩定版
+每處理一列就追加一行 JSON 到 journal，定期壓縮回 checkpoint 快照
 """
 
 import json
 import os
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set
 from datetime import datetime
 
 class CheckpointManager:
-    """Checkpoint 管理器"""
+    """Checkpoint 管理器（快照 + append-only journal）"""
     
-    def __init__(self, checkpoint_file: str):
+    def __init__(self, checkpoint_file: str, compact_interval: int = 100):
         self.checkpoint_file = checkpoint_file
+        self.journal_file = os.path.splitext(checkpoint_file)[0] + '.journal.jsonl'
+        self.compact_interval = compact_interval
+        
         self.data = self._load()
+        # 已處理（成功或失敗）的行號，續傳時以此判斷，不依賴處理順序
+        self.completed_rows: Set[int] = {
+            item['row'] for item in self.data['success_companies'] + self.data['failed_companies']
+        }
+        self.journal_entries = self._replay_journal()
+        self._journal = open(self.journal_file, 'a', encoding='utf-8')
+        # 上次 save() 時的 total_processed（判斷距上次保存處理了幾家）
+        self.saved_processed = self.data['total_processed']
     
     def _load(self) -> dict:
-        """載入 checkpoint"""
+        """載入 checkpoint 快照"""
         if os.path.exists(self.checkpoint_file):
             try:
                 with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    data = json.load(f)
+                data.setdefault('journal_seq', 0)
+                return data
             except Exception as e:
                 print(f"Warning: Failed to load checkpoint: {e}")
                 return self._init_data()
@@ -35,44 +49,119 @@ class CheckpointManager:
             'total_failed': 0,
             'start_time': datetime.now().isoformat(),
             'last_update': datetime.now().isoformat(),
+            'journal_seq': 0,  # 已併入快照的最後一筆 journal 序號
             'failed_companies': [],  # 失敗的公司清單
             'success_companies': []  # 成功的公司清單
         }
     
-    def save(self):
-        """保存 checkpoint"""
-        self.data['last_update'] = datetime.now().isoformat()
-        try:
-            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error: Failed to save checkpoint: {e}")
+    def _replay_journal(self) -> int:
+        """重播快照之後的 journal 記錄，回傳 journal 內的記錄數"""
+        if not os.path.exists(self.journal_file):
+            return 0
+        
+        count = 0
+        valid_bytes = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    # 最後一行可能在寫入途中中斷，忽略
+                    break
+                valid_bytes += len(line)
+                count += 1
+                # 壓縮途中中斷時，journal 可能仍含已併入快照的記錄
+                if entry['seq'] > self.data['journal_seq']:
+                    self._apply(entry)
+        
+        # 截掉不完整的尾行，避免之後追加的記錄接在殘行後面
+        if valid_bytes < os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return count
     
-    def update_progress(self, row: int, company_name: str, success: bool, data: Optional[Dict] = None):
-        """更新進度"""
-        self.data['last_processed_row'] = row
+    def _apply(self, entry: dict):
+        """將一筆 journal 記錄套用到記憶體狀態"""
+        row = entry['row']
+        self.data['last_processed_row'] = max(self.data.get('last_processed_row', 1), row)
         self.data['total_processed'] += 1
+        self.data['journal_seq'] = entry['seq']
+        self.data['last_update'] = entry['timestamp']
+        self.completed_rows.add(row)
         
-        if success:
+        if entry['success']:
             self.data['total_success'] += 1
             self.data['success_companies'].append({
                 'row': row,
-                'name': company_name,
-                'data': data,
-                'timestamp': datetime.now().isoformat()
+                'name': entry['name'],
+                'data': entry.get('data'),
+                'timestamp': entry['timestamp']
             })
         else:
             self.data['total_failed'] += 1
             self.data['failed_companies'].append({
                 'row': row,
-                'name': company_name,
-                'timestamp': datetime.now().isoformat()
+                'name': entry['name'],
+                'timestamp': entry['timestamp']
             })
     
+    def save(self):
+        """保存 checkpoint（journal 已逐筆落盤，這裡只在累積夠多時壓縮）"""
+        self.saved_processed = self.data['total_processed']
+        try:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            if self.journal_entries >= self.compact_interval:
+                self.compact()
+        except Exception as e:
+            print(f"Error: Failed to save checkpoint: {e}")
+    
+    def compact(self):
+        """把目前狀態寫成快照並清空 journal"""
+        self.data['last_update'] = datetime.now().isoformat()
+        tmp_file = self.checkpoint_file + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.checkpoint_file)
+            
+            # 快照已記錄 journal_seq，即使在這之後中斷，重播時也會略過已併入的記錄
+            self._journal.close()
+            self._journal = open(self.journal_file, 'w', encoding='utf-8')
+            self.journal_entries = 0
+        except Exception as e:
+            print(f"Error: Failed to compact checkpoint: {e}")
+    
+    def update_progress(self, row: int, company_name: str, success: bool, data: Optional[Dict] = None):
+        """更新進度（追加一行 journal 並落盤）"""
+        entry = {
+            'seq': self.data['journal_seq'] + 1,
+            'row': row,
+            'name': company_name,
+            'success': success,
+            'data': data if success else None,
+            'timestamp': datetime.now().isoformat()
+        }
+        self._apply(entry)
+        
+        try:
+            self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self.journal_entries += 1
+        except Exception as e:
+            print(f"Error: Failed to write checkpoint journal: {e}")
+    
     def get_last_row(self) -> int:
-        """獲取最後處理的行號"""
+        """獲取最後處理的行號（並行處理時為已處理的最大行號）"""
         return self.data.get('last_processed_row', 1)
     
+    def is_completed(self, row: int) -> bool:
+        """該行是否已處理過（成功或失敗）"""
+        return row in self.completed_rows
+    
     def get_statistics(self) -> dict:
         """獲取統計數據"""
         return {
@@ -86,12 +175,18 @@ class CheckpointManager:
     def reset(self):
         """重置 checkpoint（重新開始）"""
         self.data = self._init_data()
-        self.save()
+        self.completed_rows = set()
+        self.saved_processed = 0
+        self.compact()
     
     def get_failed_companies(self) -> List[dict]:
         """獲取失敗的公司清單"""
         return self.data.get('failed_companies', [])
     
     def should_save(self, interval: int = 5) -> bool:
-        """判斷是否應該保存（每處理 N 家公司保存一次）"""
-        return self.data['total_processed'] % interval == 0
+        """判斷是否應該保存（距上次保存已處理 N 家以上）
+
+        批次寫入完成時一次會更新多家，total_processed 可能跳過 N 的倍數，
+        也可能在沒有新進度時停在倍數上，因此以距上次保存的增量判斷
+        """
+        return self.data['total_processed'] - self.saved_processed >= interval
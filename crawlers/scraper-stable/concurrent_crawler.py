@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+並行爬取 - BD 爬蟲穩定版
+多個瀏覽器 session 同時抓取頁面，以每個 host 的 token bucket 維持禮貌速率
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket 限速器（thread-safe）"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0  # 每秒補充的 token 數
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """取得一個 token（必要時等待），被中止時回傳 False"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+
+                wait = (1 - self.tokens) / self.rate
+
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class HostRateLimiter:
+    """每個 host 一個 token bucket"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url: str, stop_event: Optional[threading.Event] = None) -> bool:
+        """等待該 URL 所屬 host 的請求配額"""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_minute, self.burst)
+                self.buckets[host] = bucket
+        return bucket.acquire(stop_event)
+
+
+class ConcurrentCrawler:
+    """固定數量的 worker（各自一個瀏覽器 session）抓取頁面，結果放入佇列"""
+
+    _DONE = object()
+
+    def __init__(self, fetch_factory: Callable[[int], Callable[[Dict], Optional[str]]],
+                 workers: int, logger: logging.Logger):
+        """
+        Args:
+            fetch_factory: 依 worker 編號建立抓取函數（company -> snapshot 或 None）
+            workers: worker 數（同時開啟的瀏覽器 session 數）
+        """
+        self.fetch_factory = fetch_factory
+        self.workers = workers
+        self.logger = logger
+        self.stop_event = threading.Event()
+        # 結果佇列有上限，解析 / 寫入跟不上時 worker 會暫停，不會無限堆積 snapshot
+        self.results: queue.Queue = queue.Queue(maxsize=workers * 2)
+
+    def _worker(self, worker_id: int, tasks: queue.Queue):
+        fetch = self.fetch_factory(worker_id)
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    company = tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                try:
+                    snapshot = fetch(company)
+                except Exception as e:
+                    self.logger.error(f"worker {worker_id} 抓取出錯: {company['name']} - {str(e)}")
+                    snapshot = None
+
+                self.results.put((company, snapshot))
+        finally:
+            self.results.put(self._DONE)
+
+    def crawl(self, companies: List[Dict]) -> Iterator[Tuple[Dict, Optional[str]]]:
+        """依完成順序逐一產出 (company, snapshot)"""
+        tasks: queue.Queue = queue.Queue()
+        for company in companies:
+            tasks.put(company)
+
+        threads = [
+            threading.Thread(target=self._worker, args=(i, tasks), daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+
+        remaining = len(threads)
+        try:
+            while remaining:
+                item = self.results.get()
+                if item is self._DONE:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            # 中斷時通知 worker 停止領取新工作（worker 為 daemon thread，不需等待）
+            self.stop_event.set()
@@ -15,6 +15,15 @@ DELAY_MAX = 15  # 最大延遲（秒）
 RETRY_TIMES = 3  # 重試次數
 RETRY_DELAY = 5  # 重試延遲（秒）
 
+# 並行模式配置（python3 main.py --workers N）
+CONCURRENT_WORKERS = 3  # 同時開啟的瀏覽器 session 數
+HOST_RATE_PER_MINUTE = 5  # 每個 host 每分鐘請求數（約等於原本 8-15 秒一次）
+HOST_BURST = 1  # 每個 host 允許的瞬間請求數
+
+# Google Sheets 批次寫入配置
+SHEET_BATCH_ROWS = 20  # 累積幾家公司寫入一次
+SHEET_FLUSH_SECONDS = 60  # 最久等待幾秒就寫入
+
 # 進度報告配置
 REPORT_INTERVAL = 5  # 每處理 5 家公司報告一次
 CHECKPOINT_INTERVAL = 5  # 每處理 5 家公司保存一次 checkpoint
@@ -23,6 +32,13 @@ CHECKPOINT_INTERVAL = 5  # 每處理 5 家公司保存一次 checkpoint
 CHECKPOINT_FILE = "/Users/user/clawd/hr-tools/scraper-stable/checkpoint.json"
 LOG_FILE = "/Users/user/clawd/hr-tools/scraper-stable/scraper.log"
 PROGRESS_FILE = "/Users/user/clawd/hr-tools/scraper-stable/progress.json"
+# 頁面快取（與 skills/headhunter 腳本共用；可用環境變數 STEP1NE_PAGE_CACHE_DIR 覆寫）
+PAGE_CACHE_DIR = os.environ.get('STEP1NE_PAGE_CACHE_DIR', os.path.expanduser('~/.cache/step1ne/pages'))
+# page_cache.py 只維護一份，放在 skills/headhunter/scripts（部署到其他位置時以 STEP1NE_SHARED_SCRIPTS_DIR 指定）
+SHARED_SCRIPTS_DIR = os.environ.get(
+    'STEP1NE_SHARED_SCRIPTS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'skills', 'headhunter', 'scripts')
+)
 
 # Agent Browser 配置
 AGENT_BROWSER_CMD = "agent-browser"
@@ -7,6 +7,8 @@ BD 爬蟲主程式 - 穩定版
     python3 main.py              # 繼續上次進度
     python3 main.py --reset      # 重新開始
     python3 main.py --test 5     # 測試模式（只處理 5 家）
+    python3 main.py --workers 3  # 並行模式（3 個瀏覽器 session，依 host 限速）
+    python3 main.py --offline    # 離線重播（只用頁面快取，不開瀏覽器）
 """
 
 import sys
@@ -20,6 +22,11 @@ from utils import setup_logging
 from checkpoint import CheckpointManager
 from reporter import ProgressReporter
 from scraper import CompanyScraper
+from concurrent_crawler import ConcurrentCrawler, HostRateLimiter
+from sheet_writer import SheetWriteBuffer
+
+sys.path.append(SHARED_SCRIPTS_DIR)
+from page_cache import PageCache
 
 def get_companies_from_sheets(sheet_id: str, account: str, start_row: int = 2, limit: Optional[int] = None):
     """從 Google Sheets 獲取公司清單"""
@@ -83,12 +90,109 @@ def get_companies_from_sheets(sheet_id: str, account: str, start_row: int = 2, l
         logger.error(f"獲取公司清單失敗: {str(e)}")
         return []
 
+def record_result(company: dict, data: Optional[dict], scraper: CompanyScraper,
+                  sheet_buffer: SheetWriteBuffer, checkpoint: CheckpointManager, logger: logging.Logger):
+    """排入 Google Sheets 批次寫入，寫入完成後更新 checkpoint"""
+    if data:
+        # 寫入結果確定後才更新 checkpoint（成功與否以該列所在的批次為準）
+        def on_written(success: bool):
+            checkpoint.update_progress(
+                company['row'],
+                company['name'],
+                success,
+                data
+            )
+        
+        sheet_buffer.add(company['row'], scraper.build_sheet_updates(data), on_written)
+    else:
+        logger.error(f"爬取失敗: {company['name']}")
+        checkpoint.update_progress(
+            company['row'],
+            company['name'],
+            False
+        )
+
+def run_sequential(companies: list, scraper: CompanyScraper, sheet_buffer: SheetWriteBuffer,
+                   checkpoint: CheckpointManager, reporter: ProgressReporter, logger: logging.Logger):
+    """逐家處理每家公司"""
+    for idx, company in enumerate(companies, 1):
+        try:
+            logger.info(f"\n--- 處理進度: {idx}/{len(companies)} ---")
+            
+            # 爬取公司資料
+            data = scraper.scrape_company(
+                company['name'], 
+                company['104_url'],
+                company['row']
+            )
+            
+            record_result(company, data, scraper, sheet_buffer, checkpoint, logger)
+            
+            # add() 只在加入新列時檢查等待時間；每輪都檢查，待寫入的列不會超過 SHEET_FLUSH_SECONDS
+            if sheet_buffer.should_flush():
+                sheet_buffer.flush()
+            
+            # 定期保存 checkpoint 和報告進度
+            if checkpoint.should_save(CHECKPOINT_INTERVAL):
+                checkpoint.save()
+                reporter.report(checkpoint.data, f"進度更新 ({idx}/{len(companies)})")
+        
+        except Exception as e:
+            logger.error(f"處理出錯: {company['name']} - {str(e)}")
+            checkpoint.update_progress(
+                company['row'],
+                company['name'],
+                False
+            )
+
+def run_concurrent(companies: list, workers: int, scraper: CompanyScraper, sheet_buffer: SheetWriteBuffer,
+                   checkpoint: CheckpointManager, reporter: ProgressReporter, logger: logging.Logger):
+    """並行模式：worker 抓取頁面，主執行緒依完成順序解析、寫入 Sheets、更新 checkpoint"""
+    limiter = HostRateLimiter(HOST_RATE_PER_MINUTE, HOST_BURST)
+    
+    def fetch_factory(worker_id: int):
+        worker_scraper = CompanyScraper(
+            logger, RETRY_TIMES, RETRY_DELAY,
+            session=f"bd-scraper-{worker_id}",
+            rate_limiter=limiter,
+            page_cache=scraper.page_cache
+        )
+        return lambda company: worker_scraper.fetch_snapshot(
+            company['name'], company['104_url'], company['row']
+        )
+    
+    crawler = ConcurrentCrawler(fetch_factory, workers, logger)
+    logger.info(f"並行模式: {workers} 個 session，每個 host {HOST_RATE_PER_MINUTE} 次/分鐘")
+    
+    for idx, (company, snapshot) in enumerate(crawler.crawl(companies), 1):
+        try:
+            logger.info(f"\n--- 處理進度: {idx}/{len(companies)} ---")
+            data = scraper.parse_snapshot(company['name'], snapshot) if snapshot else None
+            record_result(company, data, scraper, sheet_buffer, checkpoint, logger)
+        except Exception as e:
+            logger.error(f"處理出錯: {company['name']} - {str(e)}")
+            checkpoint.update_progress(company['row'], company['name'], False)
+        
+        # add() 只在加入新列時檢查等待時間；每輪都檢查，待寫入的列不會超過 SHEET_FLUSH_SECONDS
+        if sheet_buffer.should_flush():
+            sheet_buffer.flush()
+        
+        # 定期保存 checkpoint 和報告進度
+        if checkpoint.should_save(CHECKPOINT_INTERVAL):
+            checkpoint.save()
+            reporter.report(checkpoint.data, f"進度更新 ({idx}/{len(companies)})")
+
 def main():
     """主程式"""
     # 解析命令列參數
     parser = argparse.ArgumentParser(description='BD 爬蟲穩定版')
     parser.add_argument('--reset', action='store_true', help='重新開始（清除 checkpoint）')
     parser.add_argument('--test', type=int, metavar='N', help='測試模式（只處理 N 家公司）')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help=f'並行瀏覽器 session 數（建議 {CONCURRENT_WORKERS}，預設 1 = 逐家處理）')
+    parser.add_argument('--offline', action='store_true', help='離線重播：只使用頁面快取，不開瀏覽器')
+    parser.add_argument('--refresh-cache', action='store_true', help='忽略頁面快取，全部重新抓取')
+    parser.add_argument('--no-cache', action='store_true', help='不使用頁面快取')
     args = parser.parse_args()
     
     # 設置日誌
@@ -100,24 +204,27 @@ def main():
     # 初始化模組
     checkpoint = CheckpointManager(CHECKPOINT_FILE)
     reporter = ProgressReporter(PROGRESS_FILE)
-    scraper = CompanyScraper(logger, RETRY_TIMES, RETRY_DELAY)
+    if args.no_cache:
+        page_cache = None
+    else:
+        cache_mode = 'offline' if args.offline else 'refresh' if args.refresh_cache else None
+        page_cache = PageCache(PAGE_CACHE_DIR, mode=cache_mode)
+    scraper = CompanyScraper(logger, RETRY_TIMES, RETRY_DELAY, page_cache=page_cache)
+    sheet_buffer = SheetWriteBuffer(SHEET_ID, ACCOUNT, logger, SHEET_BATCH_ROWS, SHEET_FLUSH_SECONDS)
     
     # 重置 checkpoint（如果需要）
     if args.reset:
         logger.info("重置 checkpoint...")
         checkpoint.reset()
     
-    # 獲取起始行號
-    start_row = checkpoint.get_last_row() + 1 if checkpoint.get_last_row() > 1 else 2
-    logger.info(f"從第 {start_row} 行開始處理")
-    
-    # 獲取公司清單
-    companies = get_companies_from_sheets(
-        SHEET_ID, 
-        ACCOUNT, 
-        start_row=start_row,
-        limit=args.test if args.test else None
-    )
+    # 獲取公司清單（從第 2 行讀起，略過 checkpoint 中已處理的行；並行處理完成順序不固定，不能只看最後行號）
+    companies = get_companies_from_sheets(SHEET_ID, ACCOUNT, start_row=2)
+    skipped = sum(1 for c in companies if checkpoint.is_completed(c['row']))
+    companies = [c for c in companies if not checkpoint.is_completed(c['row'])]
+    if skipped:
+        logger.info(f"略過 checkpoint 中已處理的 {skipped} 家公司")
+    if args.test:
+        companies = companies[:args.test]
     
     if not companies:
         logger.info("沒有需要處理的公司")
@@ -125,64 +232,24 @@ def main():
     
     logger.info(f"準備處理 {len(companies)} 家公司")
     
-    # 處理每家公司
-    for idx, company in enumerate(companies, 1):
-        try:
-            logger.info(f"\n--- 處理進度: {idx}/{len(companies)} ---")
-            
-            # 爬取公司資料
-            data = scraper.scrape_company(
-                company['name'], 
-                company['104_url'],
-                company['row']
-            )
-            
-            if data:
-                # 更新 Google Sheets
-                success = scraper.update_google_sheets(
-                    company['row'],
-                    data,
-                    ACCOUNT,
-                    SHEET_ID
-                )
-                
-                # 更新 checkpoint
-                checkpoint.update_progress(
-                    company['row'],
-                    company['name'],
-                    success,
-                    data
-                )
-            else:
-                logger.error(f"爬取失敗: {company['name']}")
-                checkpoint.update_progress(
-                    company['row'],
-                    company['name'],
-                    False
-                )
-            
-            # 定期保存 checkpoint 和報告進度
-            if checkpoint.should_save(CHECKPOINT_INTERVAL):
-                checkpoint.save()
-                reporter.report(checkpoint.data, f"進度更新 ({idx}/{len(companies)})")
-            
-        except KeyboardInterrupt:
-            logger.info("\n用戶中斷，保存進度...")
-            checkpoint.save()
-            reporter.report(checkpoint.data, "程式中斷")
-            sys.exit(0)
-        
-        except Exception as e:
-            logger.error(f"處理出錯: {company['name']} - {str(e)}")
-            checkpoint.update_progress(
-                company['row'],
-                company['name'],
-                False
-            )
+    try:
+        if args.workers > 1:
+            run_concurrent(companies, args.workers, scraper, sheet_buffer, checkpoint, reporter, logger)
+        else:
+            run_sequential(companies, scraper, sheet_buffer, checkpoint, reporter, logger)
+    except KeyboardInterrupt:
+        logger.info("\n用戶中斷，保存進度...")
+        sheet_buffer.flush()
+        checkpoint.save()
+        reporter.report(checkpoint.data, "程式中斷")
+        sys.exit(0)
     
     # 最終保存和報告
-    checkpoint.save()
+    sheet_buffer.flush()
+    checkpoint.compact()
     reporter.report_final(checkpoint.data)
+    if page_cache:
+        logger.info(page_cache.summary())
     
     # 顯示失敗清單
     failed = checkpoint.get_failed_companies()
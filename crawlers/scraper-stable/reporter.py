@@ -55,6 +55,9 @@ class ProgressReporter:
         else:
             remaining_minutes = 0
         
+        # 吞吐量（家/分鐘）
+        throughput = total_processed / (elapsed_time / 60) if elapsed_time > 0 else 0
+        
         return {
             'total_processed': total_processed,
             'total_success': total_success,
@@ -63,6 +66,7 @@ class ProgressReporter:
             'elapsed_minutes': elapsed_minutes,
             'elapsed_seconds': elapsed_seconds,
             'remaining_minutes': remaining_minutes,
+            'throughput_per_min': round(throughput, 2),
             'last_row': checkpoint_data.get('last_processed_row', 1)
         }
     
@@ -78,6 +82,7 @@ class ProgressReporter:
         lines.append(f"🎯 成功: {stats['total_success']} 家 ({stats['success_rate']:.1f}%)")
         lines.append(f"❌ 失敗: {stats['total_failed']} 家")
         lines.append(f"⏱️ 已運行: {stats['elapsed_minutes']}分{stats['elapsed_seconds']}秒")
+        lines.append(f"🚀 吞吐量: {stats['throughput_per_min']:.2f} 家/分鐘")
         
         if stats['remaining_minutes'] > 0:
             lines.append(f"⏳ 預估剩餘: {stats['remaining_minutes']} 分鐘")
@@ -114,6 +119,7 @@ class ProgressReporter:
         if stats['total_processed'] > 0:
             avg_seconds = (stats['elapsed_minutes'] * 60 + stats['elapsed_seconds']) / stats['total_processed']
             lines.append(f"📊 平均: {avg_seconds:.1f} 秒/家")
+            lines.append(f"🚀 吞吐量: {stats['throughput_per_min']:.2f} 家/分鐘")
         
         report_text = "\n".join(lines)
         
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Google Sheets 批次寫入 - BD 爬蟲穩定版
+累積多家公司的列更新，合併成一次範圍寫入（B..K 欄、多列）
+"""
+
+import json
+import logging
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 批次寫入的欄位範圍（E 欄為 104 連結，送 null 不覆寫）
+FIRST_COLUMN = 'B'
+LAST_COLUMN = 'K'
+WRITE_COLUMNS = [chr(c) for c in range(ord(FIRST_COLUMN), ord(LAST_COLUMN) + 1)]
+
+
+class SheetWriteBuffer:
+    """Write-behind 緩衝：達到列數或等待時間上限時一次寫入"""
+
+    def __init__(self, sheet_id: str, account: str, logger: logging.Logger,
+                 max_rows: int = 20, max_wait: float = 60, max_gap: int = 20):
+        """
+        Args:
+            max_rows: 累積幾列就寫入
+            max_wait: 第一筆待寫入資料最多等待幾秒
+            max_gap: 兩列之間空白超過此列數就拆成不同範圍（空白列以 null 填補，不會覆寫）
+        """
+        self.sheet_id = sheet_id
+        self.account = account
+        self.logger = logger
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.max_gap = max_gap
+        # row -> (欄位值, 寫入完成後的回呼)
+        self.pending: Dict[int, Tuple[Dict[str, str], List[Callable[[bool], None]]]] = {}
+        self.first_pending_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def add(self, row: int, updates: Dict[str, str],
+            on_done: Optional[Callable[[bool], None]] = None,
+            auto_flush: bool = True) -> Dict[int, bool]:
+        """加入一列的更新（欄位 → 值），必要時自動寫入；回傳本次寫入的各列結果"""
+        values, callbacks = self.pending.get(row, ({}, []))
+        values.update(updates)
+        if on_done:
+            callbacks.append(on_done)
+        self.pending[row] = (values, callbacks)
+
+        if self.first_pending_at is None:
+            self.first_pending_at = time.monotonic()
+
+        if auto_flush and self.should_flush():
+            return self.flush()
+        return {}
+
+    def should_flush(self) -> bool:
+        """判斷是否達到寫入條件（列數或等待時間）"""
+        if not self.pending:
+            return False
+        if len(self.pending) >= self.max_rows:
+            return True
+        return time.monotonic() - self.first_pending_at >= self.max_wait
+
+    def _ranges(self) -> List[List[int]]:
+        """把待寫入的列依間距切成數個範圍"""
+        rows = sorted(self.pending)
+        ranges = [[rows[0]]]
+        for row in rows[1:]:
+            if row - ranges[-1][-1] > self.max_gap + 1:
+                ranges.append([row])
+            else:
+                ranges[-1].append(row)
+        return ranges
+
+    def _write_range(self, rows: List[int]) -> bool:
+        """以一次 gog 呼叫寫入 B{first}:K{last}；沒有資料的儲存格送 null（Sheets API 會略過）"""
+        first, last = rows[0], rows[-1]
+        values = []
+        for row in range(first, last + 1):
+            row_values = self.pending[row][0] if row in self.pending else {}
+            values.append([row_values.get(col) for col in WRITE_COLUMNS])
+
+        range_str = f"{FIRST_COLUMN}{first}:{LAST_COLUMN}{last}"
+        cmd = [
+            'gog', 'sheets', 'update', self.sheet_id, range_str,
+            '--values-json', json.dumps(values, ensure_ascii=False),
+            '--account', self.account
+        ]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        except Exception as e:
+            self.logger.error(f"批次更新 {range_str} 失敗: {str(e)}")
+            return False
+
+        if result.returncode != 0:
+            self.logger.error(f"批次更新 {range_str} 失敗: {result.stderr}")
+            return False
+
+        self.logger.info(f"批次更新 {range_str}: {len(rows)} 列")
+        return True
+
+    def flush(self) -> Dict[int, bool]:
+        """寫入所有待寫入資料，回傳 {row: 是否成功} 並呼叫各列回呼"""
+        if not self.pending:
+            return {}
+
+        results = {}
+        for rows in self._ranges():
+            success = self._write_range(rows)
+            for row in rows:
+                results[row] = success
+
+        pending = self.pending
+        self.pending = {}
+        self.first_pending_at = None
+
+        for row, success in results.items():
+            for callback in pending[row][1]:
+                callback(success)
+
+        return results
@@ -28,24 +28,38 @@ def random_delay(min_sec: int = 8, max_sec: int = 15):
     time.sleep(delay)
     return delay
 
+# 所有 regex 在模組載入時編譯一次；各欄位都先以 str.find 找到固定字元（@、關鍵字）再比對，
+# 不必讓 regex 在整份 snapshot 的每個位置嘗試
+PHONE_RES = [re.compile(p) for p in [
+    r'0\d{1,2}[-\s]?\d{3,4}[-\s]?\d{4}',  # 02-1234-5678 或 04-2327-3199
+    r'0\d{9,10}',  # 0912345678
+    r'\(\d{2,3}\)\s?\d{3,4}[-\s]?\d{4}'  # (02) 1234-5678
+]]
+PHONE_CLEAN_RE = re.compile(r'[\s\(\)]')
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+EMAIL_LOCAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+WEBSITE_KEYWORD_RE = re.compile(r'(?:公司網址|官網|網址|Website|官方網站)[:：\s]+([^\s\n\)]+)', re.IGNORECASE)
+WEBSITE_HEADING = 'heading "公司網址"'
+HEADING_URL_RE = re.compile(r'/url:\s*([^\s\n]+)')
+HTTP_URL_RE = re.compile(r'https?://[^\s\n\)]+')
+WWW_URL_RE = re.compile(r'www\.[^\s\n\)]+')
+URL_STRIP_CHARS = '.,;、。，；\'")'
+ADDRESS_RE = re.compile(r'(?:地址|位置|Address)[:：\s]+([^\n]{10,100})')
+INDUSTRY_RE = re.compile(r'(?:產業類別|產業|Industry)[:：\s]+([^\n]{5,50})')
+SERVICES_RE = re.compile(r'(?:主要商品|服務項目|Products|Services)[:：\s]+([^\n]{10,200})')
+
 def extract_phone(text: str) -> Optional[str]:
     """從文字中提取電話號碼"""
     if not text:
         return None
     
     # 台灣電話格式
-    patterns = [
-        r'0\d{1,2}[-\s]?\d{3,4}[-\s]?\d{4}',  # 02-1234-5678 或 04-2327-3199
-        r'0\d{9,10}',  # 0912345678
-        r'\(\d{2,3}\)\s?\d{3,4}[-\s]?\d{4}'  # (02) 1234-5678
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in PHONE_RES:
+        match = pattern.search(text)
         if match:
             phone = match.group(0)
             # 標準化格式（移除空白和括號）
-            phone = re.sub(r'[\s\(\)]', '', phone)
+            phone = PHONE_CLEAN_RE.sub('', phone)
             # 加上連字號
             if len(phone) == 10 and phone.startswith('0'):
                 if phone[1] in ['2', '3', '4', '5', '6', '7', '8']:
@@ -63,10 +77,18 @@ def extract_email(text: str) -> Optional[str]:
     if not text:
         return None
     
-    pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    match = re.search(pattern, text)
-    if match:
-        return match.group(0).lower()
+    # 從每個 @ 往前找到帳號開頭再比對，結果與 EMAIL_RE.search 相同（最左邊的 Email），
+    # 但不會在網址等長串英數字的每個位置反覆嘗試
+    at = text.find('@')
+    while at != -1:
+        start = at
+        while start > 0 and text[start - 1] in EMAIL_LOCAL_CHARS:
+            start -= 1
+        if start < at:
+            match = EMAIL_RE.match(text, start)
+            if match:
+                return match.group(0).lower()
+        at = text.find('@', at + 1)
     
     return None
 
@@ -76,36 +98,28 @@ def extract_website(text: str) -> Optional[str]:
         return None
     
     # 1. 優先尋找「公司網址」或「官網」關鍵字後面的網址
-    keyword_patterns = [
-        r'(?:公司網址|官網|網址|Website|官方網站)[:：\s]+([^\s\n\)]+)',
-    ]
-    
-    for pattern in keyword_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            url = match.group(1)
-            # 清理網址
-            url = url.strip('.,;、。，；\'")')
-            # 排除 104 的連結
-            if '104.com.tw' in url:
-                continue
+    match = WEBSITE_KEYWORD_RE.search(text)
+    if match:
+        url = match.group(1)
+        # 清理網址
+        url = url.strip(URL_STRIP_CHARS)
+        # 排除 104 的連結
+        if '104.com.tw' not in url:
             # 確保有協議
             if not url.startswith('http'):
                 url = 'https://' + url
             return url
     
-    # 2. 找所有 http 開頭的連結，排除 104
-    all_urls = re.findall(r'https?://[^\s\n\)]+', text)
-    for url in all_urls:
-        url = url.strip('.,;、。，；\'")')
-        # 排除 104 的連結
+    # 2. 找所有 http 開頭的連結，排除 104（找到第一個就停）
+    for match in HTTP_URL_RE.finditer(text):
+        url = match.group(0).strip(URL_STRIP_CHARS)
         if '104.com.tw' not in url:
             return url
     
     # 3. 找 www. 開頭的連結
-    www_match = re.search(r'(www\.[^\s\n\)]+)', text)
+    www_match = WWW_URL_RE.search(text)
     if www_match:
-        url = www_match.group(1).strip('.,;、。，；\'")')
+        url = www_match.group(0).strip(URL_STRIP_CHARS)
         if '104.com.tw' not in url:
             if not url.startswith('http'):
                 url = 'https://' + url
@@ -134,34 +148,23 @@ def parse_104_snapshot(snapshot_text: str) -> dict:
     data['email'] = extract_email(snapshot_text)
     
     # 提取網址（特殊處理：找「公司網址」heading 後的 /url:）
-    website_pattern = r'heading "公司網址".*?/url:\s*([^\s\n]+)'
-    match = re.search(website_pattern, snapshot_text, re.DOTALL)
-    if match:
-        url = match.group(1).strip()
-        if '104.com.tw' not in url:
-            data['website'] = url
+    heading = snapshot_text.find(WEBSITE_HEADING)
+    if heading != -1:
+        match = HEADING_URL_RE.search(snapshot_text, heading + len(WEBSITE_HEADING))
+        if match:
+            url = match.group(1).strip()
+            if '104.com.tw' not in url:
+                data['website'] = url
     
     # 如果沒找到，用通用方法
     if not data['website']:
         data['website'] = extract_website(snapshot_text)
     
-    # 提取地址（尋找「地址」「位置」關鍵字）
-    address_pattern = r'(?:地址|位置|Address)[:：\s]+([^\n]{10,100})'
-    match = re.search(address_pattern, snapshot_text)
-    if match:
-        data['address'] = match.group(1).strip()
-    
-    # 提取產業類別（尋找「產業類別」關鍵字）
-    industry_pattern = r'(?:產業類別|產業|Industry)[:：\s]+([^\n]{5,50})'
-    match = re.search(industry_pattern, snapshot_text)
-    if match:
-        data['industry'] = match.group(1).strip()
-    
-    # 提取服務項目（尋找「主要商品/服務」關鍵字）
-    services_pattern = r'(?:主要商品|服務項目|Products|Services)[:：\s]+([^\n]{10,200})'
-    match = re.search(services_pattern, snapshot_text)
-    if match:
-        data['services'] = match.group(1).strip()
+    # 提取地址、產業類別、服務項目（關鍵字後的文字）
+    for field, pattern in [('address', ADDRESS_RE), ('industry', INDUSTRY_RE), ('services', SERVICES_RE)]:
+        match = pattern.search(snapshot_text)
+        if match:
+            data[field] = match.group(1).strip()
     
     return data
 
@@ -10,15 +10,14 @@ import re
 from datetime import datetime
 from typing import Dict, List, Tuple
 
+import numpy as np
+
+from weights_provider import WeightsProvider, weight_multipliers
+
 class CandidateMatcher:
-    def __init__(self):
-        # 評分權重（可動態調整）
-        self.weights = {
-            'skill_match': 0.40,      # 技能匹配度 40%
-            'experience': 0.30,       # 經驗年資 30%
-            'industry': 0.20,         # 產業相關性 20%
-            'bonus': 0.10             # 其他加分項 10%
-        }
+    def __init__(self, weights_provider: WeightsProvider = None):
+        # 評分權重：由 learning-engine 的 learned-weights.json 提供，檔案更新時自動重新載入
+        self.weights_provider = weights_provider or WeightsProvider()
         
         # 紅旗扣分項
         self.red_flags = {
@@ -27,6 +26,11 @@ class CandidateMatcher:
             'location_mismatch': -10       # 地點不符且無遠端經驗
         }
     
+    @property
+    def weights(self) -> Dict[str, float]:
+        """目前生效的評分權重（合計 1）"""
+        return self.weights_provider.get()
+    
     def normalize_skill(self, skill: str) -> str:
         """標準化技能名稱"""
         skill = skill.lower().strip()
@@ -189,8 +193,16 @@ class CandidateMatcher:
         
         return penalty, flags
     
-    def match(self, candidate: Dict, jd: Dict) -> Dict:
-        """主要配對函數"""
+    def match(self, candidate: Dict, jd: Dict, weights: Dict[str, float] = None) -> Dict:
+        """主要配對函數
+        
+        Args:
+            weights: 指定本次使用的權重（預設取 weights_provider 目前的權重）
+        """
+        if weights is None:
+            weights = self.weights
+        multipliers = weight_multipliers(weights)
+        
         # 1. 技能匹配度
         skill_score, skill_details = self.calculate_skill_match(
             candidate.get('skills', []),
@@ -219,8 +231,12 @@ class CandidateMatcher:
         # 5. 紅旗檢測
         penalty, red_flags = self.check_red_flags(candidate, jd)
         
-        # 總分計算
-        total_score = skill_score + experience_score + industry_score + bonus_score + penalty
+        # 總分計算：各分項乘上 權重 ÷ 預設權重（預設權重時倍率為 1）
+        total_score = (skill_score * multipliers['skill_match']
+                       + experience_score * multipliers['experience']
+                       + industry_score * multipliers['industry']
+                       + bonus_score * multipliers['bonus']
+                       + penalty)
         total_score = max(0, min(100, total_score))  # 限制在 0-100
         
         # 信心分級
@@ -253,6 +269,7 @@ class CandidateMatcher:
                 'bonus': round(bonus_score, 1),
                 'penalty': penalty
             },
+            'weights': {key: round(value, 4) for key, value in weights.items()},
             'details': {
                 'skill': skill_details,
                 'experience': experience_details,
@@ -265,6 +282,144 @@ class CandidateMatcher:
         
         return result
 
+    def _encode_ids(self, values: List[str], vocab: Dict[str, int]) -> np.ndarray:
+        """字串轉整數 id（共用同一份 vocab，相同字串 id 相同）"""
+        return np.array([vocab.setdefault(v, len(vocab)) for v in values], dtype=np.int64)
+    
+    def match_many(self, candidates: List[Dict], jds: List[Dict], weights: Dict[str, float] = None) -> Dict:
+        """批次配對：一次計算 候選人 × 職缺 的完整分數矩陣
+        
+        分數與分級與逐筆呼叫 match() 完全一致，但不修改候選人資料。
+        breakdown 為未乘權重的原始分項；整批使用同一組權重。
+        
+        Returns:
+            {
+                'candidate_ids': [...], 'jd_ids': [...],
+                'total_score': (n_candidates, n_jds) 已四捨五入至 1 位,
+                'confidence': (n_candidates, n_jds) P0/P1/P2/REJECT,
+                'breakdown': {skill_match/experience/industry/bonus/penalty: 未四捨五入的分數矩陣},
+                'required_ratio': (n_candidates, n_jds) 必備技能匹配率
+            }
+        """
+        n_c, n_j = len(candidates), len(jds)
+        if weights is None:
+            weights = self.weights
+        multipliers = weight_multipliers(weights)
+        
+        # 1. 職缺技能只標準化一次，並編碼為整數 id
+        skill_ids: Dict[str, int] = {}
+        jd_required = [[self.normalize_skill(s) for s in jd.get('required_skills', [])] for jd in jds]
+        jd_preferred = [[self.normalize_skill(s) for s in (jd.get('preferred_skills') or [])] for jd in jds]
+        for skills in jd_required + jd_preferred:
+            for skill in skills:
+                skill_ids.setdefault(skill, len(skill_ids))
+        
+        # 職缺技能計數矩陣（V × n_jds），保留 JD 重複列出技能時的權重
+        required_counts = np.zeros((len(skill_ids), n_j))
+        preferred_counts = np.zeros((len(skill_ids), n_j))
+        for j in range(n_j):
+            for skill in jd_required[j]:
+                required_counts[skill_ids[skill], j] += 1
+            for skill in jd_preferred[j]:
+                preferred_counts[skill_ids[skill], j] += 1
+        
+        # 候選人技能 bitset（n_candidates × V），只保留職缺有用到的技能
+        candidate_bits = np.zeros((n_c, len(skill_ids)))
+        for i, candidate in enumerate(candidates):
+            for skill in candidate.get('skills', []):
+                skill_id = skill_ids.get(self.normalize_skill(skill))
+                if skill_id is not None:
+                    candidate_bits[i, skill_id] = 1
+        
+        # 2. 技能匹配度
+        required_total = np.array([len(r) for r in jd_required], dtype=np.int64)
+        preferred_total = np.array([len(p) for p in jd_preferred], dtype=np.int64)
+        required_matches = (candidate_bits @ required_counts).astype(np.int64)
+        preferred_matches = (candidate_bits @ preferred_counts).astype(np.int64)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            required_ratio = np.where(required_total > 0, required_matches / required_total, 0.0)
+            preferred_ratio = np.where(preferred_total > 0, preferred_matches / preferred_total, 0.0)
+        skill_score = np.minimum(required_ratio * 35 + preferred_ratio * 5, 40)
+        
+        # 3. 經驗年資
+        diff = (np.array([c.get('years_of_experience', 0) for c in candidates], dtype=float)[:, None]
+                - np.array([jd.get('required_years', 0) for jd in jds], dtype=float)[None, :])
+        experience_score = np.select(
+            [diff == 0, (diff > 0) & (diff <= 2), diff > 2, diff == -1, diff == -2],
+            [30, 28, 25, 20, 10],
+            default=5
+        )
+        
+        # 4. 產業相關性
+        text_ids: Dict[str, int] = {}
+        candidate_industry = self._encode_ids([c.get('industry', '').lower() for c in candidates], text_ids)
+        candidate_role = self._encode_ids([c.get('current_role', '').lower() for c in candidates], text_ids)
+        jd_industry = self._encode_ids([jd.get('industry', '').lower() for jd in jds], text_ids)
+        jd_role = self._encode_ids([jd.get('role', '').lower() for jd in jds], text_ids)
+        industry_match = candidate_industry[:, None] == jd_industry[None, :]
+        role_match = candidate_role[:, None] == jd_role[None, :]
+        industry_score = np.select(
+            [industry_match & role_match, industry_match, role_match],
+            [20, 15, 10],
+            default=0
+        )
+        
+        # 5. 其他加分項（只與候選人有關）
+        bonus_score = np.array([self.calculate_bonus_score(c)[0] for c in candidates], dtype=float)[:, None]
+        
+        # 6. 紅旗檢測
+        # skill_mismatch 依 round(ratio, 2) 判斷；ratio = k / n，逐職缺查表以維持與 match() 相同的捨入
+        skill_mismatch = np.zeros((n_c, n_j), dtype=bool)
+        for j in range(n_j):
+            n = int(required_total[j])
+            lookup = np.array([round(k / n if n else 0, 2) < 0.3 for k in range(n + 1)])
+            skill_mismatch[:, j] = lookup[required_matches[:, j]]
+        
+        job_hopping = np.array([c.get('job_changes_last_year', 0) >= 3 for c in candidates], dtype=bool)[:, None]
+        candidate_location = self._encode_ids([c.get('location', '').lower() for c in candidates], text_ids)
+        jd_location = self._encode_ids([jd.get('location', '').lower() for jd in jds], text_ids)
+        candidate_remote = np.array([bool(c.get('remote_experience', False)) for c in candidates], dtype=bool)[:, None]
+        jd_remote = np.array([bool(jd.get('remote_ok', False)) for jd in jds], dtype=bool)[None, :]
+        location_mismatch = ((candidate_location[:, None] != jd_location[None, :])
+                             & ~(candidate_remote | jd_remote))
+        
+        penalty = (np.where(job_hopping, self.red_flags['frequent_job_hopping'], 0)
+                   + np.where(skill_mismatch, self.red_flags['skill_mismatch'], 0)
+                   + np.where(location_mismatch, self.red_flags['location_mismatch'], 0))
+        
+        # 總分（加總順序與 match() 相同，確保浮點結果一致）
+        total_score = (skill_score * multipliers['skill_match']
+                       + experience_score * multipliers['experience']
+                       + industry_score * multipliers['industry']
+                       + bonus_score * multipliers['bonus']
+                       + penalty)
+        total_score = np.clip(total_score, 0, 100)
+        
+        confidence = np.select(
+            [total_score >= 80, total_score >= 60, total_score >= 40],
+            ['P0', 'P1', 'P2'],
+            default='REJECT'
+        )
+        # Python round() 與 np.round() 在 .x5 邊界可能不同，沿用 round() 以對齊 match()
+        rounded_total = np.array([round(v, 1) for v in total_score.ravel().tolist()]).reshape(n_c, n_j)
+        
+        return {
+            'candidate_ids': [c.get('id', c.get('name', 'unknown')) for c in candidates],
+            'jd_ids': [jd.get('id', '') for jd in jds],
+            'total_score': rounded_total,
+            'confidence': confidence,
+            'breakdown': {
+                'skill_match': skill_score,
+                'experience': experience_score,
+                'industry': industry_score,
+                'bonus': np.broadcast_to(bonus_score, (n_c, n_j)),
+                'penalty': penalty
+            },
+            'required_ratio': required_ratio,
+            'weights': dict(weights)
+        }
+
 def main():
     """測試用主函數"""
     # 測試資料：JD
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+候選人 Top-K 檢索索引 - 倒排索引 + 最大分數上界剪枝（WAND 式）
+用途：職缺查詢只精算有機會進入前 K 名的候選人，不必對整個人才庫逐一評分
+"""
+
+import heapq
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from ai_matcher_v2 import CandidateMatcher
+from weights_provider import weight_multipliers
+
+# 技能以外各項分數的上限（與 CandidateMatcher 的評分結構一致）
+MAX_EXPERIENCE_SCORE = 30
+MAX_INDUSTRY_SCORE = 20
+
+
+class CandidateIndex:
+    """技能 → 候選人的倒排索引，可隨時增量加入候選人"""
+
+    def __init__(self, matcher: CandidateMatcher = None):
+        self.matcher = matcher or CandidateMatcher()
+        self.candidates: List[Dict] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        # 與職缺、權重無關的部分：加分項原始分數與跳槽扣分（上界在查詢時依當下權重組合）
+        self.bonus_scores: List[float] = []
+        self.hop_penalties: List[float] = []
+        # 依有無跳槽扣分分開記錄最高加分，查詢時可直接算出所有候選人的最大靜態上界
+        self.max_bonus: Dict[float, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def add(self, candidate: Dict) -> int:
+        """加入一位候選人，回傳其內部 id"""
+        doc_id = len(self.candidates)
+        self.candidates.append(candidate)
+
+        for skill in {self.matcher.normalize_skill(s) for s in candidate.get('skills', [])}:
+            self.postings[skill].append(doc_id)
+
+        bonus, _ = self.matcher.calculate_bonus_score(candidate)
+        hop_penalty = (self.matcher.red_flags['frequent_job_hopping']
+                       if candidate.get('job_changes_last_year', 0) >= 3 else 0)
+        self.bonus_scores.append(bonus)
+        self.hop_penalties.append(hop_penalty)
+        self.max_bonus[hop_penalty] = max(self.max_bonus.get(hop_penalty, bonus), bonus)
+
+        return doc_id
+
+    def add_many(self, candidates: List[Dict]) -> List[int]:
+        """批次加入候選人"""
+        return [self.add(c) for c in candidates]
+
+    def _skill_bound(self, required_matches: int, required_total: int,
+                     preferred_matches: int, preferred_total: int, multipliers: Dict[str, float]) -> float:
+        """由技能命中數算出精確技能分數（乘上權重倍率），加上 skill_mismatch 扣分"""
+        required_ratio = required_matches / required_total if required_total else 0
+        preferred_ratio = preferred_matches / preferred_total if preferred_total else 0
+        skill_score = min(required_ratio * 35 + preferred_ratio * 5, 40) * multipliers['skill_match']
+        if round(required_ratio, 2) < 0.3:
+            skill_score += self.matcher.red_flags['skill_mismatch']
+        return skill_score
+
+    def _static_bound(self, doc_id: int, multipliers: Dict[str, float]) -> float:
+        """與職缺無關的分數上界：經驗 + 產業 + 加分 + 跳槽扣分"""
+        return (MAX_EXPERIENCE_SCORE * multipliers['experience']
+                + MAX_INDUSTRY_SCORE * multipliers['industry']
+                + self.bonus_scores[doc_id] * multipliers['bonus']
+                + self.hop_penalties[doc_id])
+
+    def _max_static_bound(self, multipliers: Dict[str, float]) -> float:
+        return max((MAX_EXPERIENCE_SCORE * multipliers['experience']
+                    + MAX_INDUSTRY_SCORE * multipliers['industry']
+                    + bonus * multipliers['bonus'] + hop_penalty
+                    for hop_penalty, bonus in self.max_bonus.items()), default=float('-inf'))
+
+    def _score(self, doc_id: int, jd: Dict, weights: Dict[str, float]) -> Dict:
+        # 傳入淺複本，避免 match() 在索引內的候選人資料寫入 _skill_match_ratio
+        return self.matcher.match(dict(self.candidates[doc_id]), jd, weights=weights)
+
+    def search(self, jd: Dict, k: int = 10) -> List[Dict]:
+        """回傳前 K 名的配對結果（與全量評分後排序的前 K 名分數相同）"""
+        # 整次查詢使用同一組權重，上界與精算分數才會一致（查詢途中權重檔更新也不影響）
+        weights = self.matcher.weights
+        multipliers = weight_multipliers(weights)
+
+        required = [self.matcher.normalize_skill(s) for s in jd.get('required_skills', [])]
+        preferred = [self.matcher.normalize_skill(s) for s in (jd.get('preferred_skills') or [])]
+
+        # 1. 走倒排索引累計每位候選人的技能命中數（成本 = posting 長度總和）
+        required_hits: Dict[int, int] = defaultdict(int)
+        preferred_hits: Dict[int, int] = defaultdict(int)
+        for skill in required:
+            for doc_id in self.postings.get(skill, ()):
+                required_hits[doc_id] += 1
+        for skill in preferred:
+            for doc_id in self.postings.get(skill, ()):
+                preferred_hits[doc_id] += 1
+
+        # 2. 命中候選人的分數上界：精確技能分 + 靜態上界（地點扣分樂觀視為 0）
+        touched = set(required_hits) | set(preferred_hits)
+        bounds: List[Tuple[float, int]] = [
+            (self._skill_bound(required_hits[d], len(required), preferred_hits[d], len(preferred), multipliers)
+             + self._static_bound(d, multipliers), d)
+            for d in touched
+        ]
+        bounds.sort(reverse=True)
+
+        # 3. 依上界由高到低精算，第 K 名分數已不低於下一個上界時停止
+        heap: List[Tuple[float, int, Dict]] = []
+
+        def offer(doc_id: int):
+            result = self._score(doc_id, jd, weights)
+            item = (result['total_score'], -doc_id, result)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+
+        def kth_score() -> float:
+            return heap[0][0] if len(heap) >= k else float('-inf')
+
+        for bound, doc_id in bounds:
+            if kth_score() >= min(100, bound):
+                break
+            offer(doc_id)
+
+        # 4. 未命中任何技能的候選人：技能分為 0，上界為 0 + skill_mismatch + 最大靜態上界
+        untouched_skill = self._skill_bound(0, len(required), 0, len(preferred), multipliers)
+        untouched_bound = untouched_skill + self._max_static_bound(multipliers)
+        if len(touched) < len(self.candidates) and kth_score() < min(100, untouched_bound):
+            for doc_id in range(len(self.candidates)):
+                if doc_id in touched:
+                    continue
+                if kth_score() >= min(100, untouched_skill + self._static_bound(doc_id, multipliers)):
+                    continue
+                offer(doc_id)
+
+        return [item[2] for item in sorted(heap, key=lambda x: (x[0], x[1]), reverse=True)]
+
+
+def main():
+    """測試用主函數：與全量評分的前 K 名比對"""
+    random.seed(7)
+    skills = ['python', 'tensorflow', 'pytorch', 'machine learning', 'docker', 'aws', 'kubernetes',
+              'java', 'spring', 'mysql', 'react', 'vue', 'nodejs', 'go', 'rust', 'sql']
+
+    def make_candidate(i: int) -> Dict:
+        return {
+            'id': f'c{i:05d}',
+            'name': f'候選人{i}',
+            'skills': random.sample(skills, random.randint(1, 5)),
+            'years_of_experience': random.randint(0, 10),
+            'industry': random.choice(['科技', '金融', '傳產']),
+            'current_role': random.choice(['AI工程師', '後端工程師', '資料分析師']),
+            'location': random.choice(['taipei', 'hsinchu', 'kaohsiung']),
+            'github_active': random.random() < 0.3,
+            'company_tier': random.choice('ABC'),
+            'job_changes_last_year': random.randint(0, 3)
+        }
+
+    jd = {
+        'id': 'AI工程師-001',
+        'title': 'AI工程師',
+        'industry': '科技',
+        'role': 'AI工程師',
+        'required_skills': ['python', 'tensorflow', 'pytorch', 'machine learning'],
+        'preferred_skills': ['kubernetes', 'docker', 'aws'],
+        'required_years': 3,
+        'location': 'taipei',
+        'remote_ok': True
+    }
+
+    index = CandidateIndex()
+    pool = [make_candidate(i) for i in range(50000)]
+    index.add_many(pool[:40000])
+    # 增量加入
+    index.add_many(pool[40000:])
+
+    print("=== Top-K 檢索索引測試 ===\n")
+    print(f"人才庫: {len(index)} 位\n")
+
+    start = time.perf_counter()
+    top = index.search(jd, k=10)
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full = sorted((index.matcher.match(dict(c), jd) for c in pool),
+                  key=lambda r: r['total_score'], reverse=True)[:10]
+    full_time = time.perf_counter() - start
+
+    print(f"索引查詢: {index_time * 1000:.1f} ms")
+    print(f"全量評分: {full_time * 1000:.1f} ms")
+    print(f"前 10 名分數一致: {[r['total_score'] for r in top] == [r['total_score'] for r in full]}\n")
+    print(json.dumps([(r['candidate_id'], r['total_score'], r['confidence']) for r in top],
+                     ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+CandidateMatcher.match_many 測試：空輸入回傳空矩陣、結果與逐筆 match() 一致
+
+用法：
+    python3 test_ai_matcher_v2.py
+    python3 -m pytest test_ai_matcher_v2.py
+"""
+
+import unittest
+
+from ai_matcher_v2 import CandidateMatcher
+from weights_provider import DEFAULT_WEIGHTS, WeightsProvider
+
+CANDIDATE = {
+    'id': 'c1', 'name': '陳小明', 'skills': ['Python', 'Docker'], 'years_of_experience': 4,
+    'industry': 'fintech', 'current_role': 'backend', 'location': '台北',
+    'job_changes_last_year': 3, 'remote_experience': False,
+}
+JD = {
+    'id': 'jd1', 'required_skills': ['Python', 'Kubernetes'], 'preferred_skills': ['Docker'],
+    'required_years': 3, 'industry': 'fintech', 'role': 'backend', 'location': '新竹', 'remote_ok': False,
+}
+
+
+class MatchManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = CandidateMatcher(WeightsProvider.fixed(DEFAULT_WEIGHTS))
+
+    def assert_empty(self, result, shape):
+        self.assertEqual(result['total_score'].shape, shape)
+        self.assertEqual(result['confidence'].shape, shape)
+        for name, matrix in result['breakdown'].items():
+            self.assertEqual(matrix.shape, shape, name)
+
+    def test_empty_candidates(self):
+        result = self.matcher.match_many([], [JD])
+        self.assert_empty(result, (0, 1))
+        self.assertEqual(result['candidate_ids'], [])
+        self.assertEqual(result['jd_ids'], ['jd1'])
+
+    def test_empty_jds(self):
+        result = self.matcher.match_many([CANDIDATE], [])
+        self.assert_empty(result, (1, 0))
+        self.assertEqual(result['jd_ids'], [])
+
+    def test_both_empty(self):
+        self.assert_empty(self.matcher.match_many([], []), (0, 0))
+
+    def test_matches_single_match(self):
+        result = self.matcher.match_many([CANDIDATE], [JD])
+        single = self.matcher.match(CANDIDATE, JD)
+        self.assertEqual(result['total_score'][0, 0], single['total_score'])
+        self.assertEqual(result['confidence'][0, 0], single['confidence'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+評分權重提供者 - 讀取 learning-engine 的 learned-weights.json，檔案更新時自動重新載入
+用途：長時間執行的配對程序不必重啟即可套用新權重；平時只做節流過的 stat，不會每次評分都讀檔
+
+權重套用方式：各分項原始分數（滿分 40/30/20/10）乘上 權重 ÷ 預設權重，
+預設權重時倍率皆為 1，總分與未套用權重時完全相同。
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# 預設權重（與 learning-engine 的預設值一致）
+DEFAULT_WEIGHTS = {
+    'skill_match': 0.40,      # 技能匹配度 40%
+    'experience': 0.30,       # 經驗年資 30%
+    'industry': 0.20,         # 產業相關性 20%
+    'bonus': 0.10             # 其他加分項 10%
+}
+
+DEFAULT_WEIGHTS_FILE = Path(os.environ.get(
+    'STEP1NE_LEARNED_WEIGHTS',
+    Path(__file__).resolve().parent.parent / 'learning-engine' / 'data' / 'learned-weights.json'
+))
+
+
+def normalize_weights(weights: Dict) -> Dict[str, float]:
+    """只取四項權重，缺少或不合法的項目用預設值，並正規化為合計 1"""
+    cleaned = {}
+    for key, default in DEFAULT_WEIGHTS.items():
+        try:
+            value = float(weights.get(key, default))
+        except (TypeError, ValueError):
+            value = default
+        cleaned[key] = max(value, 0.0)
+
+    total = sum(cleaned.values())
+    if total <= 0:
+        return dict(DEFAULT_WEIGHTS)
+    if abs(total - 1) < 1e-9:
+        return cleaned  # 已合計 1（浮點誤差內）：不再相除，預設權重時倍率才會剛好是 1
+    return {key: value / total for key, value in cleaned.items()}
+
+
+def weight_multipliers(weights: Dict[str, float]) -> Dict[str, float]:
+    """各分項原始分數的倍率（權重 ÷ 預設權重）"""
+    return {key: weights[key] / DEFAULT_WEIGHTS[key] for key in DEFAULT_WEIGHTS}
+
+
+class WeightsProvider:
+    """learned-weights.json 的熱重載快取（可在多執行緒間共用）"""
+
+    def __init__(self, weights_file: str = None, check_interval: float = 1.0):
+        """
+        Args:
+            weights_file: 權重檔路徑（預設為 learning-engine/data/learned-weights.json，
+                          可用環境變數 STEP1NE_LEARNED_WEIGHTS 指定）；檔案不存在時使用預設權重
+            check_interval: 兩次 stat 之間的最短間隔（秒）；0 表示每次取用都檢查
+        """
+        self.weights_file = Path(weights_file) if weights_file else DEFAULT_WEIGHTS_FILE
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.weights: Dict[str, float] = dict(DEFAULT_WEIGHTS)
+        self.version = 0            # 每次重新載入 +1
+        self._stamp: Optional[tuple] = None
+        self._next_check = 0.0
+
+    @classmethod
+    def fixed(cls, weights: Dict) -> 'WeightsProvider':
+        """固定權重（不讀檔），用於測試或回測"""
+        provider = cls(check_interval=float('inf'))
+        provider.weights = normalize_weights(weights)
+        provider._next_check = float('inf')
+        return provider
+
+    def get(self) -> Dict[str, float]:
+        """目前生效的權重（合計 1）；檔案有變動時重新載入"""
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self.lock:
+                if now >= self._next_check:
+                    self._next_check = now + self.check_interval
+                    self._check()
+        return self.weights
+
+    def _check(self):
+        try:
+            st = os.stat(self.weights_file)
+        except FileNotFoundError:
+            stamp = None
+        else:
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        if stamp == self._stamp:
+            return
+
+        if stamp is None:
+            weights = dict(DEFAULT_WEIGHTS)
+        else:
+            try:
+                with open(self.weights_file, 'r', encoding='utf-8') as f:
+                    weights = normalize_weights(json.load(f))
+            except (OSError, ValueError):
+                return  # 寫到一半或格式錯誤：沿用目前權重，下次檢查再試
+
+        self._stamp = stamp
+        if weights != self.weights:
+            self.weights = weights  # 整個 dict 替換，讀取端不會看到一半更新的權重
+            self.version += 1
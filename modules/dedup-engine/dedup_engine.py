@@ -6,12 +6,16 @@
 
 import json
 import sys
-import re
 import hashlib
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from pathlib import Path
 
+from entity_resolution import EntityResolver
+from history_store import HistoryStore, migrate_fingerprints, migrate_json_history
+from normalization import _legacy_normalize_company, normalize_company, normalize_name
+
 class DedupEngine:
     def __init__(self, history_file: str = None):
         """初始化去重引擎"""
@@ -21,66 +25,65 @@ class DedupEngine:
         self.history_file = Path(history_file)
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # 載入已推薦歷史
-        self.history = self._load_history()
+        # 已推薦歷史存於同名 .db（SQLite），首次啟動時自動匯入舊版 JSON，
+        # 並把舊版標準化產生的指紋重算為目前版本（只做一次）
+        db_file = self.history_file.with_suffix('.db')
+        is_new_store = not db_file.exists()
+        self.store = HistoryStore(db_file)
+        if is_new_store:
+            migrate_json_history(self.history_file, self.store)
+        migrate_fingerprints(self.store)
+        
+        # 記憶體索引：jd_id → 已推薦指紋集合，以及跨職缺的全域集合
+        self.jd_fingerprints: Dict[str, Set[str]] = defaultdict(set)
+        self.all_fingerprints: Set[str] = set()
+        for fingerprint, jd_id in self.store.iter_keys():
+            self._index_add(fingerprint, jd_id)
     
-    def _load_history(self) -> Dict:
-        """載入已推薦歷史"""
-        if self.history_file.exists():
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {'candidates': []}
+    def _index_add(self, fingerprint: str, jd_id: str):
+        """將一筆推薦加入記憶體索引"""
+        self.jd_fingerprints[jd_id or ''].add(fingerprint)
+        self.all_fingerprints.add(fingerprint)
     
-    def _save_history(self):
-        """儲存已推薦歷史"""
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, ensure_ascii=False, indent=2)
+    def _recommended_fingerprints(self, jd_id: str = None) -> Set[str]:
+        """取得已推薦指紋集合（未指定 jd_id 時為全域集合）"""
+        if jd_id:
+            return self.jd_fingerprints.get(jd_id, set())
+        return self.all_fingerprints
     
-    def normalize_name(self, name: str) -> str:
-        """標準化姓名"""
-        if not name:
-            return ""
-        
-        # 轉小寫
-        name = name.lower().strip()
-        
-        # 移除空格
-        name = re.sub(r'\s+', '', name)
-        
-        # 繁簡轉換（簡單映射，可擴展）
-        traditional_to_simplified = {
-            '陳': '陈', '張': '张', '劉': '刘', '林': '林',
-            '黃': '黄', '吳': '吴', '鄭': '郑', '王': '王',
-            '李': '李', '楊': '杨', '蔡': '蔡', '許': '许'
-        }
-        
-        for trad, simp in traditional_to_simplified.items():
-            name = name.replace(trad, simp)
+    def _candidate_fingerprint(self, candidate: Dict) -> str:
+        """取得候選人指紋（已有則不重算）"""
+        return candidate.get('fingerprint') or self.generate_fingerprint(candidate)
+    
+    def _is_recommended(self, candidate: Dict, fingerprint: str, recommended_fingerprints: Set[str]) -> bool:
+        """目前指紋或舊版指紋任一已推薦即視為已推薦"""
+        if fingerprint in recommended_fingerprints:
+            return True
+        legacy = self.legacy_fingerprint(candidate)
+        return legacy is not None and legacy in recommended_fingerprints
+    
+    def legacy_fingerprint(self, candidate: Dict) -> Optional[str]:
+        """舊版標準化產生、經 migrate_fingerprints 升級後的指紋；與目前指紋相同時回傳 None
         
-        return name
+        舊版會刪除公司名稱中間的後綴字樣（'Lincoln Inc' → 'lcoln'），原始名稱無法由指紋還原，
+        只能在比對時以候選人的原始公司名稱重算舊版形式
+        """
+        if candidate.get('email', '').lower().strip():
+            return None
+        company = candidate.get('company', '')
+        legacy_company = normalize_company(_legacy_normalize_company(company)) if company else ''
+        if legacy_company == self.normalize_company(company):
+            return None
+        fingerprint = f"{self.normalize_name(candidate.get('name', ''))}_{legacy_company}"
+        return fingerprint if fingerprint != '_' else None
+    
+    def normalize_name(self, name: str) -> str:
+        """標準化姓名（見 normalization.normalize_name）"""
+        return normalize_name(name)
     
     def normalize_company(self, company: str) -> str:
-        """標準化公司名稱"""
-        if not company:
-            return ""
-        
-        company = company.lower().strip()
-        
-        # 移除常見後綴
-        suffixes = [
-            '股份有限公司', '有限公司', '科技股份有限公司',
-            'co., ltd.', 'co., ltd', 'ltd.', 'ltd',
-            'inc.', 'inc', 'corporation', 'corp.',
-            '公司', 'company'
-        ]
-        
-        for suffix in suffixes:
-            company = company.replace(suffix, '')
-        
-        # 移除空格
-        company = re.sub(r'\s+', '', company)
-        
-        return company
+        """標準化公司名稱（見 normalization.normalize_company）"""
+        return normalize_company(company)
     
     def generate_fingerprint(self, candidate: Dict) -> str:
         """生成候選人指紋（唯一識別碼）"""
@@ -107,8 +110,8 @@ class DedupEngine:
         
         return fingerprint
     
-    def merge_candidates(self, candidates: List[Dict]) -> List[Dict]:
-        """合併重複的候選人"""
+    def merge_candidates(self, candidates: List[Dict], fuzzy: bool = False) -> List[Dict]:
+        """合併重複的候選人（fuzzy=True 時再做跨寫法的實體解析）"""
         fingerprint_map = {}
         
         for candidate in candidates:
@@ -123,7 +126,24 @@ class DedupEngine:
                 candidate['fingerprint'] = fingerprint
                 fingerprint_map[fingerprint] = candidate
         
-        return list(fingerprint_map.values())
+        merged_candidates = list(fingerprint_map.values())
+        if fuzzy:
+            merged_candidates = self.resolve_entities(merged_candidates)
+        
+        return merged_candidates
+    
+    def resolve_entities(self, candidates: List[Dict]) -> List[Dict]:
+        """實體解析：分塊鍵產生配對，區塊內評分，Union-Find 合併"""
+        resolver = EntityResolver(self.normalize_company)
+        
+        resolved = []
+        for group in resolver.resolve(candidates):
+            merged = candidates[group[0]]
+            for i in group[1:]:
+                merged = self._merge_candidate_data(merged, candidates[i])
+            resolved.append(merged)
+        
+        return resolved
     
     def _merge_candidate_data(self, c1: Dict, c2: Dict) -> Dict:
         """合併兩個候選人的資料（保留更完整的）"""
@@ -155,64 +175,53 @@ class DedupEngine:
     
     def filter_already_recommended(self, candidates: List[Dict], jd_id: str = None) -> List[Dict]:
         """過濾已推薦的候選人"""
-        recommended_fingerprints = set()
+        # 如果指定 jd_id，只過濾該職缺已推薦的
+        recommended_fingerprints = self._recommended_fingerprints(jd_id)
         
-        for record in self.history['candidates']:
-            # 如果指定 jd_id，只過濾該職缺已推薦的
-            if jd_id and record.get('jd_id') != jd_id:
-                continue
-            
-            recommended_fingerprints.add(record['fingerprint'])
+        return [
+            candidate for candidate in candidates
+            if not self._is_recommended(candidate, self._candidate_fingerprint(candidate), recommended_fingerprints)
+        ]
+    
+    def filter_already_recommended_batch(self, candidates: List[Dict], jd_ids: List[str]) -> Dict[str, List[Dict]]:
+        """一次對多個職缺過濾已推薦的候選人（每位候選人只算一次指紋）"""
+        fingerprints = [self._candidate_fingerprint(c) for c in candidates]
         
-        # 過濾掉已推薦的候選人
-        new_candidates = []
-        for candidate in candidates:
-            fingerprint = candidate.get('fingerprint', self.generate_fingerprint(candidate))
-            
-            if fingerprint not in recommended_fingerprints:
-                new_candidates.append(candidate)
+        results = {}
+        for jd_id in jd_ids:
+            recommended_fingerprints = self._recommended_fingerprints(jd_id)
+            results[jd_id] = [
+                candidate for candidate, fingerprint in zip(candidates, fingerprints)
+                if not self._is_recommended(candidate, fingerprint, recommended_fingerprints)
+            ]
         
-        return new_candidates
+        return results
     
     def mark_as_recommended(self, candidates: List[Dict], jd_id: str, status: str = 'pending'):
-        """標記候選人為已推薦"""
+        """標記候選人為已推薦（已存在則更新狀態）"""
+        now = datetime.now().isoformat()
+        records = []
         for candidate in candidates:
-            fingerprint = candidate.get('fingerprint', self.generate_fingerprint(candidate))
-            
-            # 檢查是否已存在
-            existing = None
-            for record in self.history['candidates']:
-                if record['fingerprint'] == fingerprint and record.get('jd_id') == jd_id:
-                    existing = record
-                    break
-            
-            if existing:
-                # 更新狀態
-                existing['status'] = status
-                existing['last_updated'] = datetime.now().isoformat()
-            else:
-                # 新增記錄
-                self.history['candidates'].append({
-                    'fingerprint': fingerprint,
-                    'candidate_name': candidate.get('name', ''),
-                    'first_recommended': datetime.now().isoformat(),
-                    'last_updated': datetime.now().isoformat(),
-                    'jd_id': jd_id,
-                    'status': status,
-                    'platforms': candidate.get('platforms', [])
-                })
+            fingerprint = self._candidate_fingerprint(candidate)
+            records.append({
+                'fingerprint': fingerprint,
+                'candidate_name': candidate.get('name', ''),
+                'first_recommended': now,
+                'last_updated': now,
+                'jd_id': jd_id,
+                'status': status,
+                'platforms': candidate.get('platforms', [])
+            })
         
-        self._save_history()
+        # 整批在單一 transaction 內 upsert
+        self.store.upsert_many(records)
+        for record in records:
+            self._index_add(record['fingerprint'], jd_id)
     
     def update_status(self, fingerprint: str, jd_id: str, status: str):
         """更新候選人狀態（contacted / skipped / pending）"""
-        for record in self.history['candidates']:
-            if record['fingerprint'] == fingerprint and record.get('jd_id') == jd_id:
-                record['status'] = status
-                record['last_updated'] = datetime.now().isoformat()
-                break
-        
-        self._save_history()
+        if self.store.update_status(fingerprint, jd_id, status):
+            self._index_add(fingerprint, jd_id)
     
     def get_recommendation_stats(self, jd_id: str = None) -> Dict:
         """取得推薦統計"""
@@ -223,14 +232,10 @@ class DedupEngine:
             'pending': 0
         }
         
-        for record in self.history['candidates']:
-            if jd_id and record.get('jd_id') != jd_id:
-                continue
-            
-            stats['total'] += 1
-            status = record.get('status', 'pending')
+        for status, count in self.store.status_counts(jd_id).items():
+            stats['total'] += count
             if status in stats:
-                stats[status] += 1
+                stats[status] += count
         
         return stats
 
@@ -278,6 +283,10 @@ def main():
     merged = engine.merge_candidates(candidates)
     print(f"去重後候選人數量: {len(merged)}\n")
     
+    # 實體解析（王小明 / Wang Xiaoming 視為同一人）
+    resolved = engine.merge_candidates(candidates, fuzzy=True)
+    print(f"實體解析後候選人數量: {len(resolved)}\n")
+    
     for candidate in merged:
         print(f"姓名: {candidate['name']}")
         print(f"指紋: {candidate['fingerprint']}")
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+候選人實體解析 - 分塊（blocking）+ 相似度 + Union-Find
+用途：把同一人在不同平台、不同寫法的記錄合併（如「王小明 / 台積電」與「Wang Xiaoming / TSMC」）
+"""
+
+import re
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Set
+
+from normalization import normalize_company
+
+# 常用姓名用字拼音（繁簡皆收），用於中文姓名與英文拼音姓名比對
+PINYIN_CHARS = {
+    'wang': '王汪旺望', 'li': '李黎理麗丽力立莉利俐里禮礼', 'zhang': '張张章彰',
+    'liu': '劉刘柳留', 'chen': '陳陈晨辰臣', 'yang': '楊杨陽阳洋揚扬', 'huang': '黃黄皇',
+    'zhao': '趙赵昭照', 'wu': '吳吴武伍巫吾', 'zhou': '周州洲舟', 'xu': '徐許许旭',
+    'sun': '孫孙', 'ma': '馬马', 'zhu': '朱竹珠', 'hu': '胡湖虎', 'guo': '郭國国',
+    'he': '何賀贺和禾河', 'lin': '林琳霖麟', 'gao': '高', 'luo': '羅罗駱骆',
+    'zheng': '鄭郑正政', 'liang': '梁良亮', 'xie': '謝谢', 'song': '宋松頌颂',
+    'tang': '唐湯汤', 'han': '韓韩翰涵寒', 'feng': '馮冯鳳凤峰豐丰楓枫',
+    'deng': '鄧邓', 'cao': '曹', 'peng': '彭鵬鹏', 'zeng': '曾', 'xiao': '蕭萧肖小曉晓孝',
+    'tian': '田天恬', 'dong': '董東东冬棟栋', 'pan': '潘', 'yuan': '袁元遠远媛苑園园源',
+    'cai': '蔡彩才', 'jiang': '蔣蒋江姜', 'yu': '余于俞虞宇雨玉瑜鈺钰郁語语育羽',
+    'du': '杜', 'ye': '葉叶業业', 'cheng': '程成誠诚承', 'wei': '魏韋韦衛卫偉伟威維维薇',
+    'su': '蘇苏素', 'lu': '呂吕盧卢陸陆魯鲁路露', 'ding': '丁定鼎', 'ren': '任仁',
+    'shen': '沈申深', 'yao': '姚瑤瑶耀', 'jin': '金錦锦晉晋進进', 'fu': '傅付富福甫芙',
+    'fan': '范樊凡帆', 'fang': '方芳', 'shi': '石施史師师詩诗世士', 'tan': '譚谭',
+    'liao': '廖', 'zou': '鄒邹', 'xiong': '熊雄', 'qiu': '邱丘秋', 'hou': '侯',
+    'bai': '白柏', 'lai': '賴赖來来', 'jian': '簡简建健劍剑', 'qian': '錢钱倩',
+    'kong': '孔', 'yan': '顏颜嚴严言燕彥彦妍艷', 'hong': '洪紅红宏弘鴻鸿',
+    'dai': '戴黛', 'mo': '莫', 'zhong': '鍾钟鐘中忠仲', 'you': '游尤友佑有',
+    'kang': '康', 'ke': '柯可克科', 'wen': '溫温文雯', 'guan': '管關关冠',
+    'gu': '顧顾古谷', 'qi': '齊齐祁琪淇其奇啟启', 'chu': '褚楚初', 'jia': '賈贾佳嘉家',
+    'xia': '夏霞', 'niu': '牛', 'ou': '歐欧', 'long': '龍龙隆', 'ni': '倪妮',
+    'tu': '涂塗图', 'lei': '雷磊蕾', 'ming': '明銘铭鳴鸣名', 'hua': '華华花樺桦',
+    'da': '大達达', 'tong': '同童彤通', 'xin': '欣新心信馨鑫', 'yi': '怡宜儀仪依義义逸藝艺毅一',
+    'ting': '婷庭廷亭', 'hao': '豪浩皓昊好', 'jie': '傑杰潔洁捷婕', 'jun': '俊君軍军均',
+    'zhi': '志智芝之致治', 'hui': '慧惠輝辉暉晖蕙', 'min': '敏民閔闵', 'ling': '玲凌鈴铃齡龄靈灵',
+    'ya': '雅亞亚', 'qing': '清青慶庆晴卿', 'ping': '平萍屏', 'an': '安', 'kai': '凱凯開开楷',
+    'xiang': '翔祥香湘向', 'rui': '瑞睿芮', 'bo': '博波伯', 'yong': '勇永詠咏',
+    'zi': '子紫梓', 'xuan': '宣軒轩萱璇', 'chun': '春純纯淳',
+    'mei': '美梅玫', 'fei': '飛飞菲斐', 'xue': '雪學学薛', 'qiang': '強强', 'gang': '剛刚鋼钢',
+    'bin': '斌彬濱滨', 'jing': '靜静晶京敬景菁婧', 'lan': '蘭兰嵐岚藍蓝', 'ning': '寧宁凝',
+    'shan': '珊山善姍姗', 'yun': '雲云芸韻韵允', 'chang': '昌長长常暢畅',
+    'sheng': '勝胜生聖圣盛昇', 'xian': '賢贤先仙嫻娴', 'cong': '聰聪', 'yin': '殷尹音茵',
+    'ru': '如儒茹', 'shu': '淑書书舒樹树', 'zhen': '珍真振禎祯貞贞', 'wan': '婉萬万宛',
+    'pei': '佩培裴沛', 'zong': '宗', 'ze': '澤泽', 'guang': '光廣广',
+}
+
+# 常見公司別名（標準化後比對）
+COMPANY_ALIASES = {
+    '台積電': 'tsmc', '台积电': 'tsmc', '台灣積體電路製造': 'tsmc', 'taiwansemiconductor': 'tsmc',
+    '聯發科': 'mediatek', '联发科': 'mediatek', '聯發科技': 'mediatek',
+    '鴻海': 'foxconn', '鸿海': 'foxconn', '鴻海精密工業': 'foxconn', 'honhai': 'foxconn',
+    '華碩': 'asus', '华硕': 'asus', '華碩電腦': 'asus', 'asustek': 'asus',
+    '宏碁': 'acer', '廣達': 'quanta', '广达': 'quanta', '廣達電腦': 'quanta',
+    '聯電': 'umc', '联电': 'umc', '聯華電子': 'umc',
+    '中華電信': 'chunghwatelecom', '趨勢科技': 'trendmicro', '趋势科技': 'trendmicro',
+    'googletaiwan': 'google', '谷歌': 'google', '微軟': 'microsoft', '微软': 'microsoft',
+}
+
+CJK_RE = re.compile(r'[一-鿿]')
+URL_HANDLE_RE = re.compile(r'(linkedin\.com/in|github\.com)/([^/?#\s]+)', re.IGNORECASE)
+
+CHAR_TO_PINYIN = {ch: py for py, chars in PINYIN_CHARS.items() for ch in chars}
+
+
+def romanize_name(name: str) -> List[str]:
+    """姓名轉為拼音 token（中文：[姓, 名]；英文：依原順序，連字號合併）"""
+    if not name:
+        return []
+
+    name = name.strip().lower()
+    if CJK_RE.search(name):
+        chars = [c for c in name if not c.isspace()]
+        pinyin = [CHAR_TO_PINYIN.get(c, c) for c in chars]
+        if len(pinyin) == 1:
+            return pinyin
+        return [pinyin[0], ''.join(pinyin[1:])]
+
+    name = re.sub(r'[-_.]', '', name)
+    return [t for t in re.split(r'[\s,]+', name) if t]
+
+
+def url_handles(candidate: Dict) -> List[str]:
+    """從 LinkedIn / GitHub URL 取出帳號 handle"""
+    handles = []
+    for key in ('linkedin_url', 'github_url'):
+        match = URL_HANDLE_RE.search(candidate.get(key) or '')
+        if match:
+            site = 'linkedin' if 'linkedin' in match.group(1).lower() else 'github'
+            handles.append(f"{site}:{match.group(2).lower()}")
+    return handles
+
+
+class UnionFind:
+    """路徑壓縮 + 按秩合併"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.rank[ra] < self.rank[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        if self.rank[ra] == self.rank[rb]:
+            self.rank[ra] += 1
+
+    def groups(self) -> List[List[int]]:
+        """依根節點分組（保留原始順序）"""
+        grouped: Dict[int, List[int]] = {}
+        for i in range(len(self.parent)):
+            grouped.setdefault(self.find(i), []).append(i)
+        return list(grouped.values())
+
+
+class EntityResolver:
+    """以分塊鍵產生候選配對，只在同一區塊內計算相似度"""
+
+    def __init__(self, normalize_company: Callable[[str], str] = normalize_company,
+                 threshold: float = 0.85, max_block_size: int = 200, window: int = 20):
+        self.normalize_company = normalize_company
+        self.threshold = threshold
+        # 過大的區塊（如常見姓氏 × 大公司）改用排序鄰近窗口，只比對排序後相距 window 以內的配對，避免退化成 O(n²)
+        self.max_block_size = max_block_size
+        self.window = window
+
+    def company_key(self, company: str) -> str:
+        """標準化公司名稱並套用別名"""
+        company = self.normalize_company(company or '')
+        company = re.sub(r'[^\w]', '', company)
+        return COMPANY_ALIASES.get(company, company)
+
+    def _profile(self, candidate: Dict) -> Dict:
+        tokens = romanize_name(candidate.get('name', ''))
+        return {
+            'tokens': tokens,
+            'name_key': ''.join(sorted(tokens)),
+            'company': self.company_key(candidate.get('company', '')),
+            'email': (candidate.get('email') or '').lower().strip(),
+            'handles': url_handles(candidate),
+        }
+
+    def exact_keys(self, profile: Dict) -> Iterable[str]:
+        """身分鍵：相同即視為同一人，不需評分"""
+        if profile['email']:
+            yield f"email:{profile['email']}"
+        for handle in profile['handles']:
+            yield f"url:{handle}"
+
+    def blocking_keys(self, profile: Dict) -> Iterable[str]:
+        """模糊分塊鍵：姓氏拼音 × 公司、完整姓名拼音"""
+        tokens = profile['tokens']
+        if not tokens:
+            return
+        # 英文姓名無法判斷姓在前或在後，頭尾 token 都當作可能的姓
+        surnames = {tokens[0], tokens[-1]}
+        if profile['company']:
+            for surname in surnames:
+                yield f"sn:{surname}|co:{profile['company']}"
+        if len(tokens) > 1:
+            yield f"name:{profile['name_key']}"
+
+    @staticmethod
+    def _ratio(a: str, b: str, floor: float) -> float:
+        """SequenceMatcher 相似度；上界低於 floor 時直接回傳上界，省下完整比對"""
+        if a == b:
+            return 1.0
+        matcher = SequenceMatcher(None, a, b)
+        upper = matcher.real_quick_ratio()
+        if upper < floor:
+            return upper
+        upper = matcher.quick_ratio()
+        if upper < floor:
+            return upper
+        return matcher.ratio()
+
+    def similarity(self, p1: Dict, p2: Dict) -> float:
+        """姓名（60%）+ 公司（40%）相似度"""
+        if not p1['name_key'] or not p2['name_key']:
+            return 0.0
+
+        if p1['company'] and p2['company']:
+            # 公司分數至少要 (threshold - 0.6) / 0.4 才有機會過門檻
+            company_floor = (self.threshold - 0.6) / 0.4
+            company_sim = self._ratio(p1['company'], p2['company'], company_floor)
+            name_floor = (self.threshold - 0.4 * company_sim) / 0.6
+            name_sim = self._ratio(p1['name_key'], p2['name_key'], name_floor)
+        else:
+            # 缺公司資料時只靠姓名，需完全相同
+            name_sim = 1.0 if p1['name_key'] == p2['name_key'] else 0.0
+            company_sim = name_sim
+
+        return 0.6 * name_sim + 0.4 * company_sim
+
+    def _window_pairs(self, members: List[int], profiles: List[Dict]) -> Iterable[tuple]:
+        """排序鄰近法：依 (姓名拼音, 公司) 排序後，每筆只與之後 window - 1 筆配對"""
+        ordered = sorted(members, key=lambda i: (profiles[i]['name_key'], profiles[i]['company']))
+        for pos, a in enumerate(ordered):
+            for b in ordered[pos + 1:pos + self.window]:
+                yield (a, b) if a < b else (b, a)
+
+    def resolve(self, candidates: List[Dict]) -> List[List[int]]:
+        """回傳同一人的索引分組"""
+        profiles = [self._profile(c) for c in candidates]
+        uf = UnionFind(len(candidates))
+
+        exact_blocks: Dict[str, int] = {}
+        fuzzy_blocks: Dict[str, List[int]] = {}
+        profile_keys: List[Set[str]] = []
+        for i, profile in enumerate(profiles):
+            for key in self.exact_keys(profile):
+                if key in exact_blocks:
+                    uf.union(exact_blocks[key], i)
+                else:
+                    exact_blocks[key] = i
+            keys = set(self.blocking_keys(profile))
+            profile_keys.append(keys)
+            for key in keys:
+                fuzzy_blocks.setdefault(key, []).append(i)
+
+        oversized = {key for key, members in fuzzy_blocks.items() if len(members) > self.max_block_size}
+
+        for key, members in fuzzy_blocks.items():
+            if len(members) < 2:
+                continue
+            if key in oversized:
+                pairs = self._window_pairs(members, profiles)
+            else:
+                pairs = combinations(members, 2)
+            for a, b in pairs:
+                if uf.find(a) == uf.find(b):
+                    continue
+                # 同一配對可能同時出現在多個區塊（每人最多 3 個分塊鍵）：
+                # 只在共同的完整區塊中鍵值最小者比對，不必記錄已比對過的配對
+                shared = (profile_keys[a] & profile_keys[b]) - oversized
+                if shared and key != min(shared):
+                    continue
+                if self.similarity(profiles[a], profiles[b]) >= self.threshold:
+                    uf.union(a, b)
+
+        return uf.groups()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+推薦歷史儲存 - SQLite 索引版
+用途：以 (fingerprint, jd_id) 為主鍵保存已推薦歷史，取代整檔重寫的 JSON
+"""
+
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from normalization import _legacy_normalize_name, normalize_company, normalize_name
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommended_history (
+    fingerprint TEXT NOT NULL,
+    jd_id TEXT NOT NULL,
+    candidate_name TEXT,
+    first_recommended TEXT,
+    last_updated TEXT,
+    status TEXT DEFAULT 'pending',
+    platforms TEXT DEFAULT '[]',
+    PRIMARY KEY (fingerprint, jd_id)
+);
+CREATE INDEX IF NOT EXISTS idx_recommended_history_jd_id
+    ON recommended_history (jd_id);
+"""
+
+# 已存在的 (fingerprint, jd_id) 只更新狀態與時間，保留首次推薦資訊
+UPSERT_SQL = """
+INSERT INTO recommended_history
+    (fingerprint, jd_id, candidate_name, first_recommended, last_updated, status, platforms)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (fingerprint, jd_id) DO UPDATE SET
+    status = excluded.status,
+    last_updated = excluded.last_updated
+"""
+
+# PRAGMA user_version：0 = 舊版標準化產生的指紋，1 = 已換成 normalization 模組的指紋
+FINGERPRINT_VERSION = 1
+
+COLUMNS = ('fingerprint', 'jd_id', 'candidate_name', 'first_recommended',
+           'last_updated', 'status', 'platforms')
+
+
+class HistoryStore:
+    """已推薦歷史的 SQLite 儲存層"""
+
+    def __init__(self, db_file: str):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_file))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """關閉資料庫連線"""
+        self.conn.close()
+
+    def _row_to_record(self, row: tuple) -> Dict:
+        record = dict(zip(COLUMNS, row))
+        record['platforms'] = json.loads(record['platforms'] or '[]')
+        return record
+
+    def upsert_many(self, records: Iterable[Dict]) -> int:
+        """批次新增或更新記錄（單一 transaction）"""
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                r['fingerprint'],
+                r.get('jd_id') or '',
+                r.get('candidate_name', ''),
+                r.get('first_recommended', now),
+                r.get('last_updated', now),
+                r.get('status', 'pending'),
+                json.dumps(r.get('platforms', []), ensure_ascii=False)
+            )
+            for r in records
+        ]
+
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, rows)
+
+        return len(rows)
+
+    def update_status(self, fingerprint: str, jd_id: str, status: str) -> bool:
+        """更新單筆記錄狀態，回傳是否有找到記錄"""
+        with self.conn:
+            cursor = self.conn.execute(
+                'UPDATE recommended_history SET status = ?, last_updated = ? '
+                'WHERE fingerprint = ? AND jd_id = ?',
+                (status, datetime.now().isoformat(), fingerprint, jd_id or '')
+            )
+        return cursor.rowcount > 0
+
+    def get(self, fingerprint: str, jd_id: str) -> Optional[Dict]:
+        """以主鍵取得單筆記錄"""
+        row = self.conn.execute(
+            f'SELECT {", ".join(COLUMNS)} FROM recommended_history '
+            'WHERE fingerprint = ? AND jd_id = ?',
+            (fingerprint, jd_id or '')
+        ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def iter_records(self, jd_id: str = None) -> Iterator[Dict]:
+        """逐筆讀取記錄（指定 jd_id 時走索引）"""
+        sql = f'SELECT {", ".join(COLUMNS)} FROM recommended_history'
+        params = ()
+        if jd_id:
+            sql += ' WHERE jd_id = ?'
+            params = (jd_id,)
+
+        for row in self.conn.execute(sql, params):
+            yield self._row_to_record(row)
+
+    def fingerprints(self, jd_id: str = None) -> set:
+        """取得已推薦的指紋集合"""
+        if jd_id:
+            cursor = self.conn.execute(
+                'SELECT fingerprint FROM recommended_history WHERE jd_id = ?', (jd_id,)
+            )
+        else:
+            cursor = self.conn.execute('SELECT DISTINCT fingerprint FROM recommended_history')
+        return {row[0] for row in cursor}
+
+    def iter_keys(self) -> Iterator[tuple]:
+        """逐筆讀取 (fingerprint, jd_id) 主鍵"""
+        yield from self.conn.execute('SELECT fingerprint, jd_id FROM recommended_history')
+
+    def status_counts(self, jd_id: str = None) -> Dict[str, int]:
+        """依狀態分組計數"""
+        sql = 'SELECT status, COUNT(*) FROM recommended_history'
+        params = ()
+        if jd_id:
+            sql += ' WHERE jd_id = ?'
+            params = (jd_id,)
+        sql += ' GROUP BY status'
+
+        return {status or 'pending': count for status, count in self.conn.execute(sql, params)}
+
+    def count(self) -> int:
+        """記錄總數"""
+        return self.conn.execute('SELECT COUNT(*) FROM recommended_history').fetchone()[0]
+
+    @property
+    def fingerprint_version(self) -> int:
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def rekey(self, mapping: Dict[tuple, str], version: int) -> int:
+        """將 (舊指紋, jd_id) 改為新指紋並標記指紋版本（單一 transaction）
+
+        新主鍵已存在時保留既有記錄、刪除舊記錄（同一人已以新指紋推薦過）
+        """
+        with self.conn:
+            for (old, jd_id), new in mapping.items():
+                self.conn.execute(
+                    'UPDATE OR IGNORE recommended_history SET fingerprint = ? '
+                    'WHERE fingerprint = ? AND jd_id = ?',
+                    (new, old, jd_id)
+                )
+                self.conn.execute(
+                    'DELETE FROM recommended_history WHERE fingerprint = ? AND jd_id = ?',
+                    (old, jd_id)
+                )
+            self.conn.execute(f'PRAGMA user_version = {int(version)}')
+        return len(mapping)
+
+
+def migrate_json_history(json_file: str, store: HistoryStore) -> int:
+    """一次性將舊版 recommended-history.json 匯入 SQLite"""
+    json_file = Path(json_file)
+    if not json_file.exists():
+        return 0
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        history = json.load(f)
+
+    records = [r for r in history.get('candidates', []) if r.get('fingerprint')]
+    # 舊檔同一 (fingerprint, jd_id) 理論上只有一筆；若有重複以最後一筆狀態為準
+    return store.upsert_many(records)
+
+
+def upgrade_fingerprint(fingerprint: str, candidate_name: str = '') -> str:
+    """舊版「姓名_公司」指紋 → 目前 normalize_name / normalize_company 產生的指紋
+
+    email / URL 指紋為 16 位 hex（不含底線），原樣保留。
+    舊版姓名只轉換 12 個字，對其結果再做 normalize_name 等同對原始姓名做；
+    舊版公司已剝除後綴，再做 normalize_company 結果不變。
+    舊版連名稱中間的後綴字樣也會刪（'Lincoln Inc' → 'lcoln'），指紋無法還原原名，
+    這類記錄維持舊版形式，由 DedupEngine.legacy_fingerprint 在比對時接受。
+    """
+    if '_' not in fingerprint:
+        return fingerprint
+    legacy_name = _legacy_normalize_name(candidate_name or '')
+    if legacy_name and fingerprint.startswith(legacy_name + '_'):
+        name, company = legacy_name, fingerprint[len(legacy_name) + 1:]
+    else:
+        name, _, company = fingerprint.partition('_')
+    return f"{normalize_name(name)}_{normalize_company(company)}"
+
+
+def migrate_fingerprints(store: HistoryStore) -> int:
+    """一次性將舊版指紋重算為目前版本，回傳改變的記錄數（已是目前版本時不做事）"""
+    if store.fingerprint_version >= FINGERPRINT_VERSION:
+        return 0
+
+    mapping = {}
+    for record in store.iter_records():
+        new = upgrade_fingerprint(record['fingerprint'], record['candidate_name'])
+        if new != record['fingerprint']:
+            mapping[(record['fingerprint'], record['jd_id'])] = new
+
+    return store.rekey(mapping, FINGERPRINT_VERSION)
+
+
+def main():
+    """用法：python3 history_store.py <recommended-history.json> [history.db]"""
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        sys.exit(1)
+
+    json_file = Path(sys.argv[1])
+    db_file = Path(sys.argv[2]) if len(sys.argv) > 2 else json_file.with_suffix('.db')
+
+    store = HistoryStore(db_file)
+    migrated = migrate_json_history(json_file, store)
+    rekeyed = migrate_fingerprints(store)
+    print(f"✅ 已匯入 {migrated} 筆記錄 → {db_file}（共 {store.count()} 筆，重算指紋 {rekeyed} 筆）")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+姓名 / 公司名稱標準化 - 預編譯單次掃描版
+用途：供 dedup_engine 指紋與實體解析共用，繁簡轉換一次 translate、公司後綴一次 regex
+"""
+
+import re
+import sys
+import time
+from functools import lru_cache
+
+# 繁→簡對照（姓名、公司名稱常用字），每組為「繁簡」兩字
+TRAD_SIMP_PAIRS = """
+陳陈 張张 劉刘 黃黄 吳吴 鄭郑 楊杨 許许 謝谢 蕭萧 賴赖 葉叶 蘇苏 莊庄 呂吕
+盧卢 蔣蒋 鍾钟 鐘钟 顏颜 趙赵 簡简 羅罗 韓韩 馮冯 鄧邓 錢钱 孫孙 馬马 譚谭
+嚴严 龔龚 魯鲁 陸陆 賈贾 鄒邹 齊齐 顧顾 聶聂 龐庞 萬万 喬乔 閻阎 閔闵 衛卫
+鄔邬 歐欧 駱骆 湯汤 溫温 紀纪 關关 寧宁 華华 饒饶 藍蓝 塗涂 龍龙 韋韦 範范
+偉伟 國国 傑杰 強强 軍军 剛刚 輝辉 麗丽 靜静 豔艳 艷艳 鳳凤 紅红 雲云 蓮莲
+嬌娇 瑩莹 曉晓 銘铭 鵬鹏 濤涛 鋒锋 慶庆 賢贤 榮荣 達达 維维 順顺 寶宝 東东
+書书 誠诚 興兴 義义 勝胜 禮礼 儀仪 億亿 聖圣 彥彦 韻韵 穎颖 嫻娴 瓊琼 鈺钰
+錦锦 鴻鸿 淵渊 潔洁 藝艺 綺绮 蘭兰 嵐岚 靈灵 齡龄 鈴铃 綾绫 瑋玮 暉晖 晉晋
+進进 啟启 長长 暢畅 頌颂 詠咏 詩诗 語语 楓枫 樺桦 棟栋 樹树 陽阳 揚扬 軒轩
+貞贞 禎祯 姍姗 學学 飛飞 鳴鸣 聰聪 濱滨 鋼钢 亞亚 開开 凱凯 廣广 澤泽 遠远
+園园 歡欢 樂乐 譽誉 傳传 應应 際际 電电 腦脑 積积 體体 製制 產产 業业 團团
+創创 訊讯 網网 絡络 資资 數数 據据 設设 計计 營营 運运 銷销 貿贸 機机 構构
+術术 藥药 醫医 療疗 購购 買买 賣卖 銀银 險险 證证 務务 師师 員员 職职 軟软
+聯联 發发 碩硕 廠厂 灣湾 臺台 環环 實实 驗验 測测 試试 車车 線线 視视 聽听
+頻频 響响 導导 鏈链 號号 區区 縣县 門门 間间 會会 協协 總总 經经 濟济 農农
+漁渔 礦矿 鐵铁 輸输 郵邮 匯汇 與与 為为 無无 來来 時时 個个 們们 這这 說说
+對对 從从 習习 鳥鸟 魚鱼 氣气 點点 樣样 種种 處处 備备 價价 單单 質质 項项
+組组 織织 紡纺 統统 級级 約约 綠绿 練练 終终 結结 給给 續续 細细 縮缩 認认
+識识 讀读 論论 調调 講讲 議议 護护 譯译 變变 讓让 貨货 費费 貴贵 賓宾 頭头
+題题 類类 顯显 風风 飯饭 館馆 驅驱 鬥斗 麥麦 黨党 齒齿 後后 裡里
+""".split()
+
+TRAD_TO_SIMP = {pair[0]: pair[1] for pair in TRAD_SIMP_PAIRS}
+
+# 轉小寫後一次 translate：繁轉簡 + 刪除所有空白（含全形空白）
+NAME_TABLE = str.maketrans(
+    ''.join(TRAD_TO_SIMP.keys()),
+    ''.join(TRAD_TO_SIMP.values()),
+    ' \t\r\n　'
+)
+WHITESPACE_TABLE = str.maketrans('', '', ' \t\r\n　')
+
+# 「科技」屬於公司名稱本身（舊版先剝除「股份有限公司」，'趨勢科技股份有限公司' → '趨勢科技'），不列為後綴
+COMPANY_SUFFIXES = [
+    '股份有限公司', '有限公司',
+    'co., ltd.', 'co., ltd', 'ltd.', 'ltd',
+    'inc.', 'inc', 'corporation', 'corp.',
+    '公司', 'company'
+]
+
+# 單一 regex：把字串反轉後只從開頭比對，等同從結尾做最長後綴比對（反轉後綴依長度由長到短），
+# 可連續剝除多個後綴（如 "company ltd"）
+COMPANY_SUFFIX_REVERSED_RE = re.compile(
+    r'(?:[\s,]*(?:' +
+    '|'.join(re.escape(s[::-1]) for s in sorted(COMPANY_SUFFIXES, key=len, reverse=True)) +
+    r'))+'
+)
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> str:
+    """標準化姓名：小寫、移除空白、繁轉簡"""
+    if not name:
+        return ""
+    return name.lower().translate(NAME_TABLE)
+
+
+@lru_cache(maxsize=65536)
+def normalize_company(company: str) -> str:
+    """標準化公司名稱：小寫、剝除最長後綴、移除空白"""
+    if not company:
+        return ""
+    reversed_company = company.lower().strip()[::-1]
+    match = COMPANY_SUFFIX_REVERSED_RE.match(reversed_company)
+    if match:
+        reversed_company = reversed_company[match.end():]
+    return reversed_company[::-1].translate(WHITESPACE_TABLE)
+
+
+def _legacy_normalize_name(name: str) -> str:
+    """舊版實作（僅供基準比較）"""
+    name = re.sub(r'\s+', '', name.lower().strip())
+    for trad, simp in {'陳': '陈', '張': '张', '劉': '刘', '林': '林', '黃': '黄', '吳': '吴',
+                       '鄭': '郑', '王': '王', '李': '李', '楊': '杨', '蔡': '蔡', '許': '许'}.items():
+        name = name.replace(trad, simp)
+    return name
+
+
+def _legacy_normalize_company(company: str) -> str:
+    """舊版實作（基準比較，以及比對舊版指紋）
+
+    舊版會刪除出現在任何位置的後綴（'Lincoln Inc' → 'lcoln'），新版只剝除結尾；
+    這類名稱新舊結果不同，已存的指紋由 DedupEngine.legacy_fingerprint 比對
+    """
+    company = company.lower().strip()
+    for suffix in COMPANY_SUFFIXES:
+        company = company.replace(suffix, '')
+    return re.sub(r'\s+', '', company)
+
+
+# 結尾帶後綴的公司名稱：新舊版輸出必須相同，否則已存的 name_company 指紋會對不上
+# （名稱中間含後綴字樣者刻意不同，見 _legacy_normalize_company）
+SUFFIX_CORPUS = [
+    '趨勢科技股份有限公司', '趨勢科技', '聯發科技股份有限公司', '聯發科技', '台積電股份有限公司',
+    '鴻海精密工業股份有限公司', '緯創資通有限公司', '宏碁公司', 'Trend Micro Inc.', 'Trend Micro Inc',
+    'Acme Co., Ltd.', 'Acme Co., Ltd', 'Acme Ltd.', 'Appier Corporation', 'Appier Corp.',
+    'Google Taiwan', 'Google Company', '  Gogoro Inc.  ', 'KKBOX 股份有限公司', '',
+]
+
+
+def check_legacy_equivalence(corpus=None) -> list:
+    """比對新舊版 normalize_company，回傳不一致的 (原始, 舊版, 新版)"""
+    mismatches = []
+    for company in (SUFFIX_CORPUS if corpus is None else corpus):
+        legacy, compiled = _legacy_normalize_company(company), normalize_company(company)
+        if legacy != compiled:
+            mismatches.append((company, legacy, compiled))
+    return mismatches
+
+
+def benchmark(records: int = 100000):
+    """微基準：比較每筆記錄的標準化成本"""
+    surnames = '陳張劉黃吳鄭楊許謝蕭賴葉蘇莊呂'
+    given = ['小明', '志偉', '淑華', '家豪', '怡君', '建國', '雅婷', '冠宇']
+    companies = ['台積電股份有限公司', '聯發科技股份有限公司', 'Google Taiwan', 'Acme Co., Ltd.',
+                 'Trend Micro Inc.', '鴻海精密工業股份有限公司', 'Appier Corporation']
+    # 每個值出現兩次，模擬多平台資料中同一人 / 同一公司重複出現
+    unique = max(1, records // 2)
+    name_pool = [f"{surnames[i % len(surnames)]}{given[i % len(given)]}{i}" for i in range(unique)]
+    firm_pool = [f"{i} {companies[i % len(companies)]}" for i in range(unique)]
+    names = [name_pool[i % unique] for i in range(records)]
+    firms = [firm_pool[i % unique] for i in range(records)]
+
+    def per_record_us(func, values):
+        start = time.perf_counter()
+        for v in values:
+            func(v)
+        return (time.perf_counter() - start) / len(values) * 1e6
+
+    normalize_name.cache_clear()
+    normalize_company.cache_clear()
+    results = [
+        ('name (legacy)', per_record_us(_legacy_normalize_name, names)),
+        ('name (compiled, no cache)', per_record_us(normalize_name.__wrapped__, names)),
+        ('name (compiled + LRU)', per_record_us(normalize_name, names)),
+        ('company (legacy)', per_record_us(_legacy_normalize_company, firms)),
+        ('company (compiled, no cache)', per_record_us(normalize_company.__wrapped__, firms)),
+        ('company (compiled + LRU)', per_record_us(normalize_company, firms)),
+    ]
+
+    print(f"=== 標準化微基準（{records:,} 筆）===\n")
+    for label, cost in results:
+        print(f"{label:<32} {cost:6.2f} µs/record")
+
+
+def main():
+    """用法：python3 normalization.py [records]"""
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    mismatches = check_legacy_equivalence()
+    if mismatches:
+        for company, legacy, compiled in mismatches:
+            print(f"❌ {company!r}: 舊版 {legacy!r} ≠ 新版 {compiled!r}")
+        sys.exit(1)
+    print(f"✅ 公司後綴語料 {len(SUFFIX_CORPUS)} 筆新舊版輸出一致\n")
+
+    benchmark(records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+DedupEngine 舊版指紋相容測試：公司名稱中間含後綴字樣（'Lincoln Inc'）的舊記錄仍視為已推薦
+
+用法：
+    python3 test_dedup_engine.py
+    python3 -m pytest test_dedup_engine.py
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from dedup_engine import DedupEngine
+from history_store import HistoryStore
+from normalization import _legacy_normalize_company, _legacy_normalize_name, normalize_company
+
+# (姓名, 公司)：舊版會刪掉名稱中間的後綴字樣，與新版結果不同
+MIDSTRING_SUFFIX_CASES = [
+    ('林小明', 'Lincoln Inc'),
+    ('陳大文', 'Incubator Ltd'),
+    ('王美玲', 'Company Holdings Inc'),
+    ('張志豪', 'Ltd Pay'),
+]
+
+
+class LegacyFingerprintTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history_file = Path(self.tmp.name) / 'recommended-history.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def seed_legacy(self, cases, jd_id='jd1'):
+        """寫入舊版標準化產生的指紋（fingerprint_version = 0）"""
+        store = HistoryStore(self.history_file.with_suffix('.db'))
+        store.upsert_many([
+            {'fingerprint': f"{_legacy_normalize_name(name)}_{_legacy_normalize_company(company)}",
+             'jd_id': jd_id, 'candidate_name': name}
+            for name, company in cases
+        ])
+        store.close()
+
+    def test_cases_differ_from_legacy(self):
+        for _, company in MIDSTRING_SUFFIX_CASES:
+            with self.subTest(company=company):
+                self.assertNotEqual(normalize_company(_legacy_normalize_company(company)),
+                                    normalize_company(company))
+
+    def test_midstring_suffix_records_still_filtered(self):
+        self.seed_legacy(MIDSTRING_SUFFIX_CASES)
+        engine = DedupEngine(self.history_file)
+        candidates = [{'name': name, 'company': company} for name, company in MIDSTRING_SUFFIX_CASES]
+
+        self.assertEqual(engine.filter_already_recommended(candidates, 'jd1'), [])
+        self.assertEqual(engine.filter_already_recommended(candidates), [])
+        self.assertEqual(engine.filter_already_recommended_batch(candidates, ['jd1', 'jd2']),
+                         {'jd1': [], 'jd2': candidates})
+
+    def test_end_suffix_records_use_current_fingerprint(self):
+        self.seed_legacy([('林小明', 'Google Inc')])
+        engine = DedupEngine(self.history_file)
+        candidate = {'name': '林小明', 'company': 'Google Inc'}
+
+        self.assertIsNone(engine.legacy_fingerprint(candidate))
+        self.assertIn(engine.generate_fingerprint(candidate), engine.all_fingerprints)
+
+    def test_email_fingerprint_has_no_legacy_form(self):
+        engine = DedupEngine(self.history_file)
+        self.assertIsNone(engine.legacy_fingerprint(
+            {'name': '林小明', 'company': 'Lincoln Inc', 'email': 'lin@example.com'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+權重回測 - 以歷史決策重播不同權重下的候選人排序
+用途：在寫入 learned-weights.json 前，先看新權重會不會把過去「已聯繫」的候選人排得更前面
+
+每組權重的分數 = clip(Σ 100 × 權重 × 分項/滿分 + 紅旗扣分, 0, 100)，預設權重時與 CandidateMatcher 總分相同。
+所有 (候選人, 職缺) 的正規化分項只解析一次，多組權重以一次矩陣乘法重新評分，再依職缺排序計算：
+- precision@K：每個職缺前 K 名中已聯繫的比例（各職缺平均）
+- lift：precision@K ÷ 各職缺整體聯繫率的平均
+- rank_corr：每個職缺內分數與聯繫結果的 Spearman 相關（各職缺平均）
+
+用法：
+    python3 backtest.py [data_dir] [--sets 1000] [--k 10] [--top 10]
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Union
+
+import numpy as np
+
+from decision_log import DecisionLog
+from weight_fitting import LABELS, PENALTY_MAX, WEIGHT_KEYS, decision_features
+
+GROUP_STRIDE = 256.0  # 排序鍵 = 職缺序號 × 256 + 分數（分數 0-100），一次排序即依職缺分組
+
+
+def random_weight_sets(count: int, seed: int = 0, concentration: float = 1.0) -> np.ndarray:
+    """隨機權重組（Dirichlet，每組合計 1）"""
+    rng = np.random.default_rng(seed)
+    return rng.dirichlet(np.full(len(WEIGHT_KEYS), concentration), size=count)
+
+
+def as_weight_matrix(weight_sets: Union[np.ndarray, List[Dict]]) -> np.ndarray:
+    """權重 dict 列表或 (m, 4) 陣列 → (m, 4) 陣列（欄位順序同 WEIGHT_KEYS）"""
+    if len(weight_sets) and isinstance(weight_sets[0], dict):
+        return np.array([[w[key] for key in WEIGHT_KEYS] for w in weight_sets], dtype=float)
+    return np.atleast_2d(np.asarray(weight_sets, dtype=float))
+
+
+class Backtester:
+    """歷史決策的分項矩陣；evaluate() 一次評估多組權重"""
+
+    def __init__(self, log: DecisionLog):
+        # 同一 (候選人, 職缺) 多次決策時以最後一次為準；pending 與沒有分數拆解的決策不列入
+        latest = {}
+        for record in log.iter_records():
+            row = decision_features(record)
+            if row is None:
+                continue
+            key = (record.get('candidate_fingerprint'), record.get('jd_id'))
+            latest[key] = (record.get('jd_id') or '', row, LABELS[record['decision']])
+
+        self.jd_ids = sorted({jd_id for jd_id, _, _ in latest.values()})
+        jd_index = {jd_id: i for i, jd_id in enumerate(self.jd_ids)}
+        entries = sorted(latest.values(), key=lambda entry: jd_index[entry[0]])
+
+        features = np.array([row for _, row, _ in entries]).reshape(len(entries), len(WEIGHT_KEYS) + 2)
+        self.components = features[:, 1:1 + len(WEIGHT_KEYS)]  # 正規化分項（0-1）
+        self.penalty = features[:, -1] * PENALTY_MAX
+        self.labels = np.array([label for _, _, label in entries])
+        self.groups = np.array([jd_index[jd_id] for jd_id, _, _ in entries], dtype=np.int64)
+
+        # 列已依職缺排好，各職缺在陣列中為連續區段
+        self.counts = np.bincount(self.groups, minlength=len(self.jd_ids))
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def scores(self, weights: np.ndarray) -> np.ndarray:
+        """(m, 4) 權重 → (m, n) 分數"""
+        scores = (100 * weights) @ self.components.T
+        scores += self.penalty
+        return np.clip(scores, 0, 100, out=scores)
+
+    def _tie_adjustments(self, keys: np.ndarray, order: np.ndarray, y: np.ndarray) -> tuple:
+        """同分元素改用平均名次後，各職缺 Σ名次×聯繫 的增量與名次平方和的減量 Σ(t³ - t) / 12
+
+        分數多為連續值，同分的元素很少；只處理同分者，避免對每個元素做區段運算
+        """
+        c, n = keys.shape
+        n_groups = len(self.jd_ids)
+        sorted_keys = np.take_along_axis(keys, order, axis=1)
+        same_as_next = sorted_keys[:, 1:] == sorted_keys[:, :-1]
+
+        tied = np.zeros((c, n), dtype=bool)
+        tied[:, :-1] |= same_as_next
+        tied[:, 1:] |= same_as_next
+        index = np.flatnonzero(tied)
+        if not len(index):
+            return np.zeros((c, n_groups)), np.zeros((c, n_groups))
+
+        rows, cols = np.divmod(index, n)
+        # 同分區段的起點：前一個位置不同分（或為列首）
+        run_start = np.ones(len(index), dtype=bool)
+        run_start[1:] = ~((rows[1:] == rows[:-1]) & (cols[1:] == cols[:-1] + 1)
+                          & same_as_next[rows[1:], np.maximum(cols[1:] - 1, 0)])
+        starts = np.flatnonzero(run_start)
+        lengths = np.diff(np.append(starts, len(index)))
+        run_of = np.repeat(np.arange(len(starts)), lengths)
+
+        average = cols[starts] + (lengths - 1) / 2.0
+        bucket = rows[starts] * n_groups + self.groups[cols[starts]]
+        delta = np.bincount(run_of, weights=y[rows, cols] * (average[run_of] - cols))
+        sum_ry = np.bincount(bucket, weights=delta, minlength=c * n_groups).reshape(c, n_groups)
+        correction = np.bincount(bucket, weights=(lengths ** 3 - lengths) / 12.0,
+                                 minlength=c * n_groups).reshape(c, n_groups)
+        return sum_ry, correction
+
+    def evaluate(self, weight_sets: Union[np.ndarray, List[Dict]], k: int = 10, chunk: int = 32) -> Dict:
+        """評估多組權重
+
+        Args:
+            weight_sets: (m, 4) 陣列或權重 dict 列表
+            k: precision@K 的 K
+            chunk: 每次同時評估的權重組數（控制記憶體：chunk × n 個浮點數）
+
+        Returns:
+            {'weights': (m, 4), 'precision_at_k', 'lift', 'rank_corr': (m,), 'base_rate', 'pairs', 'jds', 'k'}
+        """
+        weights = as_weight_matrix(weight_sets)
+        n, m = len(self), len(weights)
+        if n == 0 or not self.jd_ids:
+            raise ValueError('沒有可回測的決策（需要含分數拆解的已聯繫 / 已略過決策）')
+
+        # 與權重無關的部分只算一次
+        positions = np.arange(n)
+        group_offset = self.groups * GROUP_STRIDE
+        # 排序後各職缺仍佔原本的區段；區段最後 K 個位置即分數最高的 K 個
+        top_k = np.flatnonzero(positions >= (self.starts + self.counts - k)[self.groups])
+        top_k_starts = np.concatenate([[0], np.cumsum(np.minimum(self.counts, k))[:-1]])
+        top_k_size = np.minimum(self.counts, k)
+
+        positives = np.add.reduceat(self.labels, self.starts)
+        base_rate = float((positives / self.counts).mean())
+        label_var = positives - positives ** 2 / self.counts
+        has_corr = (self.counts >= 2) & (label_var > 0)
+        # 沒有同分時各職缺的名次和與平方和固定；同分取平均名次只會減少平方和 Σ(t³ - t) / 12
+        sum_r = np.add.reduceat(positions.astype(float), self.starts)
+        sum_rr_no_ties = np.add.reduceat(positions.astype(float) ** 2, self.starts)
+
+        precision = np.empty(m)
+        rank_corr = np.empty(m)
+        for lo in range(0, m, chunk):
+            # 分數先捨入到 1e-6：浮點誤差造成的極小差異一律視為同分，再加上職缺偏移
+            keys = np.round(self.scores(weights[lo:lo + chunk]), 6)
+            keys += group_offset
+            c = len(keys)
+            order = np.argsort(keys, axis=1)
+            y = self.labels[order]
+
+            # precision@K：各職缺分數最高 K 個位置的聯繫數
+            hits = np.add.reduceat(y[:, top_k], top_k_starts, axis=1)
+            precision[lo:lo + c] = (hits / top_k_size).mean(axis=1)
+
+            # Spearman：先以排序位置當名次算各職缺 Σ名次×聯繫，再只對同分的元素改用平均名次
+            sum_ry = np.add.reduceat(y * positions, self.starts, axis=1)
+            sum_ry_ties, tie_correction = self._tie_adjustments(keys, order, y)
+            sum_ry += sum_ry_ties
+            cov = sum_ry - sum_r * positives / self.counts
+            rank_var = sum_rr_no_ties - tie_correction - sum_r ** 2 / self.counts
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = np.where(rank_var > 1e-9, cov / np.sqrt(rank_var * label_var), 0.0)
+            rank_corr[lo:lo + c] = corr[:, has_corr].mean(axis=1) if has_corr.any() else np.nan
+
+        return {
+            'weights': weights,
+            'precision_at_k': precision,
+            'lift': precision / base_rate if base_rate else np.full(m, np.nan),
+            'rank_corr': rank_corr,
+            'base_rate': base_rate,
+            'pairs': n,
+            'jds': len(self.jd_ids),
+            'k': k
+        }
+
+
+def format_report(results: Dict, top: int = 10, baseline: int = 0) -> str:
+    """依 precision@K 排序輸出前幾名（baseline 為對照組的列號）"""
+    k = results['k']
+    order = np.lexsort((-results['rank_corr'], -results['precision_at_k']))
+    header = ' '.join(f'{key:>11}' for key in WEIGHT_KEYS)
+    lines = [
+        f"回測 {results['pairs']} 組 (候選人, 職缺)、{results['jds']} 個職缺；"
+        f"平均聯繫率 {results['base_rate'] * 100:.1f}%",
+        f"{'排名':>4} {header} {f'P@{k}':>7} {'lift':>6} {'rank_corr':>9}",
+    ]
+
+    def row(rank: str, i: int) -> str:
+        weights = ' '.join(f'{w:>11.3f}' for w in results['weights'][i])
+        return (f"{rank:>4} {weights} {results['precision_at_k'][i]:>7.3f} "
+                f"{results['lift'][i]:>5.2f}x {results['rank_corr'][i]:>9.3f}")
+
+    for rank, i in enumerate(order[:top], 1):
+        lines.append(row(str(rank), i))
+    baseline_rank = int(np.where(order == baseline)[0][0]) + 1
+    lines.append(row('目前', baseline) + f"  （第 {baseline_rank} 名）")
+    return '\n'.join(lines)
+
+
+def main():
+    from learning_engine import LearningEngine
+
+    parser = argparse.ArgumentParser(description='以歷史決策回測多組配對權重')
+    parser.add_argument('data_dir', nargs='?', default=None, help='learning-engine 資料目錄')
+    parser.add_argument('--sets', type=int, default=1000, help='隨機權重組數')
+    parser.add_argument('--k', type=int, default=10, help='precision@K 的 K')
+    parser.add_argument('--top', type=int, default=10, help='輸出前幾名')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    engine = LearningEngine(args.data_dir)
+
+    start = time.perf_counter()
+    backtester = Backtester(engine.log)
+    loaded = time.perf_counter()
+    if len(backtester) == 0:
+        print('❌ 沒有含分數拆解的已聯繫 / 已略過決策可回測')
+        sys.exit(1)
+
+    # 第 0 組為目前權重（learned-weights.json，與 CandidateMatcher 相同正規化為合計 1），其餘為隨機權重
+    current = np.array([[engine.weights[key] for key in WEIGHT_KEYS]])
+    current /= current.sum()
+    weight_sets = np.vstack([current, random_weight_sets(args.sets, args.seed)])
+    results = backtester.evaluate(weight_sets, k=args.k)
+    evaluated = time.perf_counter()
+
+    print(format_report(results, top=args.top, baseline=0))
+    print(f"\n載入 {loaded - start:.2f} 秒，評估 {len(weight_sets)} 組權重 {evaluated - loaded:.2f} 秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+決策時間索引 - 依日期排序的決策位置與每日彙總
+用途：analyze_preferences 取最近 N 天時，以 bisect 找邊界、以每日彙總相加，
+      計算量只與天數有關，與日誌總筆數無關
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List
+
+from decision_log import DecisionLog
+
+EPOCH = datetime(1970, 1, 1)
+
+# 每筆決策對彙總的貢獻（依序）
+ROLLUP_FIELDS = (
+    'total',
+    'contacted',
+    'skipped',
+    'github_active',      # 已聯繫且 GitHub 活躍
+    'company_a',          # 已聯繫且 A 級公司
+    'score_sum',          # 已聯繫分數總和
+    'skill_match_sum',    # 已聯繫技能匹配度總和
+    'job_hopping',        # 已略過且有頻繁跳槽紅旗
+    'skill_mismatch',     # 已略過且有技能不符紅旗
+)
+CONTACTED = ROLLUP_FIELDS.index('contacted')
+SCORE_SUM = ROLLUP_FIELDS.index('score_sum')
+
+
+def _seconds(when: datetime) -> float:
+    """naive datetime → 秒數（不經本地時區換算，避免夏令時間歧義）"""
+    return (when - EPOCH).total_seconds()
+
+
+def decision_contribution(record: Dict) -> tuple:
+    """單筆決策對每日彙總的貢獻"""
+    features = record.get('features') or {}
+    decision = record.get('decision')
+
+    if decision == 'contacted':
+        return (1, 1, 0,
+                1 if features.get('github_active', False) else 0,
+                1 if features.get('company_tier') == 'A' else 0,
+                record['score'],
+                features.get('skill_match_ratio', 0),
+                0, 0)
+
+    if decision == 'skipped':
+        red_flags = features.get('red_flags', [])
+        return (1, 0, 1, 0, 0, 0, 0,
+                1 if 'frequent_job_hopping' in red_flags else 0,
+                1 if 'skill_mismatch' in red_flags else 0)
+
+    return (1, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+class DecisionIndex:
+    """DecisionLog 的記憶體索引；refresh() 只讀取上次之後新追加的行"""
+
+    def __init__(self, log: DecisionLog):
+        self.log = log
+        self.offset = 0                   # 已讀到的日誌位置
+        self.timestamps: List[float] = []  # 依時間排序
+        self.offsets: List[int] = []       # 與 timestamps 對應的行起點
+        self.contributions: List[tuple] = []
+        self.daily: Dict[int, List[float]] = {}  # 日序 → ROLLUP_FIELDS 總和 + 已聯繫最低分
+        self.days: List[int] = []                # 有資料的日序（排序）
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def refresh(self) -> int:
+        """讀入新追加的決策，回傳新增筆數"""
+        if self.log.size() < self.offset:
+            # 日誌被截斷或換檔，重建
+            self.__init__(self.log)
+
+        batch = []
+        for start, end, record in self.log.iter_from(self.offset):
+            batch.append(self._add_rollup(start, record))
+            self.offset = end
+        if not batch:
+            return 0
+
+        batch.sort(key=lambda entry: entry[0])
+        for ts, offset, contribution in batch:
+            if not self.timestamps or ts >= self.timestamps[-1]:
+                i = len(self.timestamps)
+            else:
+                i = bisect_right(self.timestamps, ts)  # 多人同時寫入時日誌可能稍微亂序
+            self.timestamps.insert(i, ts)
+            self.offsets.insert(i, offset)
+            self.contributions.insert(i, contribution)
+        return len(batch)
+
+    def _add_rollup(self, offset: int, record: Dict) -> tuple:
+        """加入每日彙總，回傳 (秒數, 行起點, 貢獻) 供排序"""
+        when = datetime.fromisoformat(record['date'])
+        contribution = decision_contribution(record)
+
+        day = when.toordinal()
+        rollup = self.daily.get(day)
+        if rollup is None:
+            rollup = self.daily[day] = [0] * len(ROLLUP_FIELDS) + [float('inf')]
+            insort(self.days, day)
+        for k, value in enumerate(contribution):
+            rollup[k] += value
+        if contribution[CONTACTED]:
+            rollup[-1] = min(rollup[-1], contribution[SCORE_SUM])
+
+        return _seconds(when), offset, contribution
+
+    def _range(self, since: datetime) -> tuple:
+        """since 之後（不含）的記錄在排序陣列中的範圍"""
+        return bisect_right(self.timestamps, _seconds(since)), len(self.timestamps)
+
+    def offsets_since(self, since: datetime = None) -> List[int]:
+        """since 之後的決策在日誌中的位置（依時間排序）"""
+        if since is None:
+            return list(self.offsets)
+        lo, hi = self._range(since)
+        return self.offsets[lo:hi]
+
+    def window(self, since: datetime) -> Dict:
+        """since 之後（不含）所有決策的彙總
+
+        since 當天只加總 since 之後的個別記錄（bisect 找範圍），之後的每一天直接取每日彙總
+        """
+        totals = [0] * len(ROLLUP_FIELDS)
+        min_score = float('inf')
+
+        first_day = since.toordinal()
+        lo = bisect_right(self.timestamps, _seconds(since))
+        hi = bisect_left(self.timestamps, _seconds(datetime.fromordinal(first_day + 1)))
+        for contribution in self.contributions[lo:hi]:
+            for k, value in enumerate(contribution):
+                totals[k] += value
+            if contribution[CONTACTED]:
+                min_score = min(min_score, contribution[SCORE_SUM])
+
+        for day in self.days[bisect_right(self.days, first_day):]:
+            rollup = self.daily[day]
+            for k in range(len(ROLLUP_FIELDS)):
+                totals[k] += rollup[k]
+            min_score = min(min_score, rollup[-1])
+
+        result = dict(zip(ROLLUP_FIELDS, totals))
+        result['min_score'] = min_score if min_score != float('inf') else None
+        return result
+
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+決策日誌儲存 - 僅追加的 JSON Lines
+用途：取代每次整檔重寫的 decision-log.json；寫入成本與日誌大小無關，多人同時記錄不會互相覆蓋
+"""
+
+import fcntl
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class DecisionLog:
+    """decision-log.jsonl：一行一筆決策，只追加不改寫"""
+
+    def __init__(self, log_file: str, fsync: bool = True):
+        """
+        Args:
+            log_file: JSONL 檔案路徑
+            fsync: 每次寫入後是否 fsync（關閉可加快大量匯入，但斷電可能遺失最後幾筆）
+        """
+        self.log_file = Path(log_file)
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+
+    def exists(self) -> bool:
+        return self.log_file.exists()
+
+    def append(self, record: Dict) -> Dict:
+        """追加單筆決策"""
+        self.append_many([record])
+        return record
+
+    def append_many(self, records: Iterable[Dict]) -> int:
+        """批次追加（一次加鎖、一次寫入、一次 fsync）"""
+        records = list(records)
+        if not records:
+            return 0
+        data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records)
+
+        # O_APPEND + 排他鎖：多個程序同時寫入時每批各自完整、不會交錯
+        with open(self.log_file, 'a+b') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                # 上一個寫入者中途當掉留下不完整的行時，先補換行，避免與新記錄黏成一行
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        data = '\n' + data
+                f.write(data.encode('utf-8'))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+        return len(records)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_records()
+
+    def iter_records(self) -> Iterator[Dict]:
+        """逐行讀取決策（串流，不整檔載入）"""
+        for _, _, record in self.iter_from(0):
+            yield record
+
+    def iter_from(self, offset: int) -> Iterator[Tuple[int, int, Dict]]:
+        """從 offset 開始逐行讀取，產生 (行起點, 行終點, 決策)；可用於只讀新追加的部分"""
+        if not self.log_file.exists():
+            return
+
+        # 不加鎖：寫入只會追加完整的行，讀到一半的最後一行沒有換行就停下
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                start, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                try:
+                    yield start, offset, json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 中途當掉留下的殘行
+
+    def read_many(self, offsets: Iterable[int]) -> Iterator[Dict]:
+        """依 offset（來自 iter_from）讀取多筆決策，只開一次檔"""
+        with open(self.log_file, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def size(self) -> int:
+        """日誌目前大小（位元組）"""
+        try:
+            return self.log_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def count(self) -> int:
+        """決策總數"""
+        return sum(1 for _ in self.iter_records())
+
+
+def migrate_json_log(json_file: str, log: DecisionLog) -> int:
+    """一次性將舊版 decision-log.json（JSON 陣列）轉成 JSONL
+
+    先寫入暫存檔再以 link 放到目標位置；目標已存在（例如另一個程序已轉換）時不覆蓋
+    """
+    json_file = Path(json_file)
+    if not json_file.exists() or log.exists():
+        return 0
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        decisions: List[Dict] = json.load(f)
+
+    tmp_file = log.log_file.with_name(f"{log.log_file.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        for record in decisions:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+    try:
+        os.link(tmp_file, log.log_file)
+    except FileExistsError:
+        return 0
+    finally:
+        tmp_file.unlink()
+
+    return len(decisions)
+
+
+def main():
+    """用法：python3 decision_log.py <decision-log.json> [decision-log.jsonl]"""
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        sys.exit(1)
+
+    json_file = Path(sys.argv[1])
+    log_file = Path(sys.argv[2]) if len(sys.argv) > 2 else json_file.with_suffix('.jsonl')
+
+    log = DecisionLog(log_file)
+    if log.exists():
+        print(f"⚠️ {log_file} 已存在，略過轉換")
+        sys.exit(1)
+
+    migrated = migrate_json_log(json_file, log)
+    print(f"✅ 已轉換 {migrated} 筆決策 → {log_file}")
+
+
+if __name__ == '__main__':
+    main()
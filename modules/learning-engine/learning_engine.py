@@ -5,11 +5,15 @@
 """
 
 import json
+import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List
-import statistics
+from typing import Dict, Iterator, List
+
+from decision_index import DecisionIndex
+from decision_log import DecisionLog, migrate_json_log
+from weight_fitting import WEIGHT_KEYS, WeightFitter
 
 class LearningEngine:
     def __init__(self, data_dir: str = None):
@@ -23,23 +27,29 @@ class LearningEngine:
         self.decision_log_file = self.data_dir / "decision-log.json"
         self.weights_file = self.data_dir / "learned-weights.json"
         
-        # 載入決策日誌
-        self.decisions = self._load_decisions()
+        # 決策日誌存於同名 .jsonl（僅追加），首次啟動時自動轉換舊版 JSON；讀取時才逐行串流
+        self.log = DecisionLog(self.decision_log_file.with_suffix('.jsonl'))
+        if not self.log.exists():
+            migrate_json_log(self.decision_log_file, self.log)
+        
+        # 時間索引與每日彙總：第一次查詢時建立，之後只讀新追加的行
+        self.index = DecisionIndex(self.log)
+        
+        # 權重擬合：特徵矩陣增量建立，重新擬合時沿用上次係數
+        self.fitter = WeightFitter(self.log)
         
         # 載入學習到的權重
         self.weights = self._load_weights()
     
-    def _load_decisions(self) -> List[Dict]:
-        """載入決策日誌"""
-        if self.decision_log_file.exists():
-            with open(self.decision_log_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+    @property
+    def decisions(self) -> List[Dict]:
+        """全部決策（整份讀入；大量資料請用 iter_decisions）"""
+        return list(self.log.iter_records())
     
-    def _save_decisions(self):
-        """儲存決策日誌"""
-        with open(self.decision_log_file, 'w', encoding='utf-8') as f:
-            json.dump(self.decisions, f, ensure_ascii=False, indent=2)
+    def iter_decisions(self, since: datetime = None) -> Iterator[Dict]:
+        """依時間順序逐筆讀取決策，可只取 since 之後的記錄（以索引定位，不掃描整份日誌）"""
+        self.index.refresh()
+        yield from self.log.read_many(self.index.offsets_since(since))
     
     def _load_weights(self) -> Dict:
         """載入學習到的權重"""
@@ -57,14 +67,15 @@ class LearningEngine:
         }
     
     def _save_weights(self):
-        """儲存學習到的權重"""
+        """儲存學習到的權重（先寫暫存檔再替換，配對程序熱重載時不會讀到寫一半的檔案）"""
         self.weights['last_updated'] = datetime.now().isoformat()
-        with open(self.weights_file, 'w', encoding='utf-8') as f:
+        tmp_file = self.weights_file.with_name(f"{self.weights_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(self.weights, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.weights_file)
     
-    def record_decision(self, candidate: Dict, jd_id: str, decision: str, score: float, features: Dict):
-        """記錄一個決策"""
-        decision_record = {
+    def _make_record(self, candidate: Dict, jd_id: str, decision: str, score: float, features: Dict) -> Dict:
+        return {
             'date': datetime.now().isoformat(),
             'jd_id': jd_id,
             'candidate_fingerprint': candidate.get('fingerprint', candidate.get('name', 'unknown')),
@@ -73,90 +84,82 @@ class LearningEngine:
             'score': score,
             'features': features
         }
-        
-        self.decisions.append(decision_record)
-        self._save_decisions()
-        
-        return decision_record
+    
+    def record_decision(self, candidate: Dict, jd_id: str, decision: str, score: float, features: Dict):
+        """記錄一個決策（追加一行，成本與日誌大小無關）"""
+        return self.log.append(self._make_record(candidate, jd_id, decision, score, features))
+    
+    def record_decisions(self, decisions: List[Dict]) -> List[Dict]:
+        """批次記錄決策（一次加鎖與寫入）
+
+        每筆格式：{'candidate', 'jd_id', 'decision', 'score', 'features'}
+        """
+        records = [
+            self._make_record(d['candidate'], d['jd_id'], d['decision'], d['score'], d['features'])
+            for d in decisions
+        ]
+        self.log.append_many(records)
+        return records
     
     def analyze_preferences(self, days: int = 30) -> Dict:
-        """分析偏好模式（過去 N 天）"""
+        """分析偏好模式（過去 N 天）
+
+        以時間索引的每日彙總計算，成本與天數有關、與日誌總筆數無關
+        """
         cutoff_date = datetime.now() - timedelta(days=days)
         
-        # 篩選最近 N 天的決策
-        recent_decisions = [
-            d for d in self.decisions
-            if datetime.fromisoformat(d['date']) > cutoff_date
-        ]
+        # 最近 N 天的決策彙總
+        self.index.refresh()
+        stats = self.index.window(cutoff_date)
+        total = stats['total']
+        contacted = stats['contacted']
+        skipped = stats['skipped']
         
-        if len(recent_decisions) < 5:
+        if total < 5:
             return {
                 'status': 'insufficient_data',
-                'message': f'需要至少 5 個決策才能分析（目前 {len(recent_decisions)} 個）',
-                'total_decisions': len(recent_decisions)
+                'message': f'需要至少 5 個決策才能分析（目前 {total} 個）',
+                'total_decisions': total
             }
         
-        # 分離「聯繫」和「略過」的候選人
-        contacted = [d for d in recent_decisions if d['decision'] == 'contacted']
-        skipped = [d for d in recent_decisions if d['decision'] == 'skipped']
-        
         analysis = {
             'period_days': days,
-            'total_decisions': len(recent_decisions),
-            'contacted_count': len(contacted),
-            'skipped_count': len(skipped),
-            'contact_rate': len(contacted) / len(recent_decisions) if recent_decisions else 0,
+            'total_decisions': total,
+            'contacted_count': contacted,
+            'skipped_count': skipped,
+            'contact_rate': contacted / total if total else 0,
             'preferences': {},
             'red_flags': {}
         }
         
-        # 分析特徵偏好
+        # 分析特徵偏好（GitHub 活躍度、公司等級、平均分數、技能匹配度）
         if contacted:
-            # GitHub 活躍度
-            github_active_contacted = sum(1 for d in contacted if d['features'].get('github_active', False))
-            github_active_rate = github_active_contacted / len(contacted)
-            
-            # 公司等級
-            company_a_contacted = sum(1 for d in contacted if d['features'].get('company_tier') == 'A')
-            company_a_rate = company_a_contacted / len(contacted)
-            
-            # 平均分數
-            avg_contacted_score = statistics.mean(d['score'] for d in contacted)
-            
-            # 技能匹配度
-            avg_skill_match = statistics.mean(
-                d['features'].get('skill_match_ratio', 0) for d in contacted
-            )
-            
             analysis['preferences'] = {
-                'github_active_rate': round(github_active_rate, 2),
-                'company_a_rate': round(company_a_rate, 2),
-                'avg_score': round(avg_contacted_score, 1),
-                'avg_skill_match': round(avg_skill_match, 2),
-                'min_score_threshold': round(min(d['score'] for d in contacted), 1)
+                'github_active_rate': round(stats['github_active'] / contacted, 2),
+                'company_a_rate': round(stats['company_a'] / contacted, 2),
+                'avg_score': round(stats['score_sum'] / contacted, 1),
+                'avg_skill_match': round(stats['skill_match_sum'] / contacted, 2),
+                'min_score_threshold': round(stats['min_score'], 1)
             }
         
         # 分析紅旗（常被略過的特徵）
         if skipped:
-            freq_job_hopping_skipped = sum(
-                1 for d in skipped 
-                if 'frequent_job_hopping' in d['features'].get('red_flags', [])
-            )
-            
-            skill_mismatch_skipped = sum(
-                1 for d in skipped
-                if 'skill_mismatch' in d['features'].get('red_flags', [])
-            )
-            
             analysis['red_flags'] = {
-                'frequent_job_hopping_rate': round(freq_job_hopping_skipped / len(skipped), 2) if skipped else 0,
-                'skill_mismatch_rate': round(skill_mismatch_skipped / len(skipped), 2) if skipped else 0
+                'frequent_job_hopping_rate': round(stats['job_hopping'] / skipped, 2),
+                'skill_mismatch_rate': round(stats['skill_mismatch'] / skipped, 2)
             }
         
         return analysis
     
-    def suggest_weight_adjustments(self, analysis: Dict) -> Dict:
-        """根據分析結果建議權重調整"""
+    def suggest_weight_adjustments(self, analysis: Dict, mode: str = 'rules') -> Dict:
+        """根據分析結果建議權重調整
+
+        Args:
+            mode: 'rules' 依固定門檻微調（±0.05）；'fit' 以決策日誌擬合邏輯迴歸求權重
+        """
+        if mode == 'fit':
+            return self._suggest_fitted_weights(analysis)
+        
         if analysis.get('status') == 'insufficient_data':
             return {'adjustments': [], 'reason': 'insufficient_data'}
         
@@ -197,6 +200,30 @@ class LearningEngine:
             'analysis_summary': analysis
         }
     
+    def _suggest_fitted_weights(self, analysis: Dict) -> Dict:
+        """以擬合結果產生與 rules 模式相同格式的調整建議"""
+        fit = self.fitter.fit()
+        if fit['status'] != 'ok':
+            return {'adjustments': [], 'reason': fit['status'], 'fit': fit}
+        
+        suggestions = []
+        for param in WEIGHT_KEYS:
+            current = self.weights.get(param, 0)
+            suggested = round(fit['weights'][param], 3)
+            if abs(suggested - current) >= 0.01:
+                suggestions.append({
+                    'parameter': param,
+                    'current': current,
+                    'suggested': suggested,
+                    'reason': f'依 {fit["n_decisions"]} 個決策擬合（邏輯迴歸係數 {fit["coefficients"][param]:.2f}）'
+                })
+        
+        return {
+            'adjustments': suggestions,
+            'analysis_summary': analysis,
+            'fit': fit
+        }
+    
     def apply_weight_adjustments(self, adjustments: List[Dict]):
         """應用權重調整"""
         for adj in adjustments:
@@ -300,14 +327,7 @@ def main():
         }
     ]
     
-    for td in test_decisions:
-        engine.record_decision(
-            td['candidate'],
-            td['jd_id'],
-            td['decision'],
-            td['score'],
-            td['features']
-        )
+    engine.record_decisions(test_decisions)
     
     print(f"✅ 記錄了 {len(test_decisions)} 個決策\n")
     
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+權重擬合 - 以決策日誌擬合 CandidateMatcher 的 skill/experience/industry/bonus 權重
+用途：取代固定門檻規則；以「已聯繫 / 已略過」為標籤，對配對分數拆解做 L2 正則化邏輯迴歸
+
+特徵來自決策記錄 features['breakdown']（CandidateMatcher.match 的 breakdown），
+各項除以滿分（40/30/20/10）正規化到 0-1；紅旗扣分作為控制變數，不輸出為權重。
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from decision_log import DecisionLog
+
+# CandidateMatcher 各分項滿分（預設權重 0.40/0.30/0.20/0.10 對應的原始分數上限）
+COMPONENT_MAX = {
+    'skill_match': 40,
+    'experience': 30,
+    'industry': 20,
+    'bonus': 10,
+}
+WEIGHT_KEYS = tuple(COMPONENT_MAX)
+PENALTY_MAX = 45  # 三種紅旗全中的扣分
+
+LABELS = {'contacted': 1.0, 'skipped': 0.0}
+
+
+def decision_features(record: Dict) -> Optional[List[float]]:
+    """決策記錄 → [截距, 四個正規化分項, 正規化扣分]；沒有 breakdown 或未決定者回傳 None"""
+    breakdown = (record.get('features') or {}).get('breakdown')
+    if not breakdown or record.get('decision') not in LABELS:
+        return None
+    row = [1.0]
+    row.extend(float(breakdown.get(key, 0)) / COMPONENT_MAX[key] for key in WEIGHT_KEYS)
+    row.append(float(breakdown.get('penalty', 0)) / PENALTY_MAX)
+    return row
+
+
+def fit_logistic(X: np.ndarray, y: np.ndarray, l2: float = 1.0, beta: np.ndarray = None,
+                 max_iter: int = 50, tol: float = 1e-8) -> tuple:
+    """L2 正則化邏輯迴歸（Newton / IRLS；第 0 欄為截距，不正則化）
+
+    Args:
+        beta: 初始係數（warm start）；新增少量資料時通常 1-2 次迭代即收斂
+
+    Returns:
+        (係數, 迭代次數)
+    """
+    n_features = X.shape[1]
+    beta = np.zeros(n_features) if beta is None else beta.astype(float).copy()
+    ridge = np.full(n_features, l2)
+    ridge[0] = 0.0
+
+    for iteration in range(1, max_iter + 1):
+        p = 1.0 / (1.0 + np.exp(-np.clip(X @ beta, -35, 35)))
+        gradient = X.T @ (p - y) + ridge * beta
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(ridge)
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(n_features), gradient)
+        beta -= step
+        if np.max(np.abs(step)) < tol:
+            break
+
+    return beta, iteration
+
+
+class WeightFitter:
+    """由決策日誌增量建立特徵矩陣，並以上次的係數 warm start 重新擬合"""
+
+    def __init__(self, log: DecisionLog, l2: float = 1.0, min_decisions: int = 20):
+        """
+        Args:
+            l2: L2 正則化強度（資料少時讓係數保守，資料多時影響可忽略）
+            min_decisions: 擬合所需的最少有效決策數（需同時有已聯繫與已略過）
+        """
+        self.log = log
+        self.l2 = l2
+        self.min_decisions = min_decisions
+        self.offset = 0
+        self.X = np.empty((0, len(WEIGHT_KEYS) + 2))
+        self.y = np.empty(0)
+        self.ignored = 0        # 沒有 breakdown 或 pending 的決策數
+        self.beta: Optional[np.ndarray] = None
+
+    def refresh(self) -> int:
+        """只解析上次之後新追加的決策，回傳新增的有效筆數"""
+        if self.log.size() < self.offset:
+            self.__init__(self.log, self.l2, self.min_decisions)
+
+        rows, labels = [], []
+        for _, end, record in self.log.iter_from(self.offset):
+            self.offset = end
+            row = decision_features(record)
+            if row is None:
+                self.ignored += 1
+                continue
+            rows.append(row)
+            labels.append(LABELS[record['decision']])
+
+        if rows:
+            self.X = np.vstack([self.X, np.array(rows)])
+            self.y = np.concatenate([self.y, np.array(labels)])
+        return len(rows)
+
+    def fit(self, warm_start: bool = True) -> Dict:
+        """擬合權重
+
+        Returns:
+            {'status': 'ok', 'weights': {skill_match/experience/industry/bonus: 合計 1},
+             'coefficients': {...}, 'n_decisions', 'n_contacted', 'iterations', 'log_loss'}
+            資料不足時 status 為 'insufficient_data'
+        """
+        self.refresh()
+        n = len(self.y)
+        n_contacted = int(self.y.sum())
+
+        if n < self.min_decisions or n_contacted in (0, n):
+            return {
+                'status': 'insufficient_data',
+                'message': f'需要至少 {self.min_decisions} 個含分數拆解的決策，且同時有聯繫與略過'
+                           f'（目前 {n} 個，聯繫 {n_contacted} 個）',
+                'n_decisions': n
+            }
+
+        beta, iterations = fit_logistic(self.X, self.y, self.l2, self.beta if warm_start else None)
+        self.beta = beta
+
+        p = np.clip(1.0 / (1.0 + np.exp(-(self.X @ beta))), 1e-12, 1 - 1e-12)
+        log_loss = float(-np.mean(self.y * np.log(p) + (1 - self.y) * np.log(1 - p)))
+
+        # 係數代表「該分項從 0 到滿分」對聯繫機率的影響；負係數視為不應加權
+        coefficients = dict(zip(WEIGHT_KEYS, beta[1:1 + len(WEIGHT_KEYS)].tolist()))
+        positive = {key: max(value, 0.0) for key, value in coefficients.items()}
+        total = sum(positive.values())
+        if total <= 0:
+            return {
+                'status': 'no_signal',
+                'message': '各分項與聯繫決策皆無正相關，維持現有權重',
+                'coefficients': coefficients,
+                'n_decisions': n
+            }
+
+        return {
+            'status': 'ok',
+            'weights': {key: value / total for key, value in positive.items()},
+            'coefficients': coefficients,
+            'penalty_coefficient': float(beta[-1]),
+            'n_decisions': n,
+            'n_contacted': n_contacted,
+            'iterations': iterations,
+            'log_loss': round(log_loss, 4)
+        }
@@ -9,70 +9,84 @@
 
 import json
 import argparse
-import subprocess
+import importlib.util
 import os
-import tempfile
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 
-def batch_match(company_persona: Dict, candidate_personas: List[Dict]) -> List[Dict]:
+# 候選人數超過此值才值得開 process pool（否則 fork 成本大於評分本身）
+PARALLEL_MIN_CANDIDATES = 200
+
+_matcher = None
+
+
+def _get_matcher():
+    """載入 match-personas.py 的 PersonaMatcher（每個 process 只載入一次）"""
+    global _matcher
+    if _matcher is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        spec = importlib.util.spec_from_file_location(
+            'match_personas', os.path.join(script_dir, 'match-personas.py')
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _matcher = module.PersonaMatcher()
+    return _matcher
+
+
+def _match_one(args) -> tuple:
+    """單一候選人匹配（可在子 process 執行），回傳 (idx, report, error)"""
+    idx, company_persona, candidate_persona = args
+    try:
+        return idx, _get_matcher().match(candidate_persona, company_persona), None
+    except Exception as e:
+        return idx, None, str(e)
+
+
+def batch_match(company_persona: Dict, candidate_personas: List[Dict],
+                workers: int = 1, jsonl_path: Optional[str] = None) -> List[Dict]:
     """
-    批量匹配（使用 subprocess 調用 match-personas.py）
+    批量匹配（同一 process 內直接呼叫 PersonaMatcher）
     
     Args:
         company_persona: 公司畫像
         candidate_personas: 候選人畫像列表
+        workers: process 數量，> 1 且候選人夠多時使用 ProcessPoolExecutor
+        jsonl_path: 若指定，每完成一位候選人就以 JSON Lines 追加寫入
         
     Returns:
         匹配報告列表（按總分排序）
     """
-    # 獲取當前腳本目錄
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    match_script = os.path.join(script_dir, 'match-personas.py')
+    tasks = ((idx, company_persona, c) for idx, c in enumerate(candidate_personas))
+    
+    executor = None
+    if workers > 1 and len(candidate_personas) >= PARALLEL_MIN_CANDIDATES:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, len(candidate_personas) // (workers * 4))
+        results = executor.map(_match_one, tasks, chunksize=chunksize)
+    else:
+        results = map(_match_one, tasks)
     
+    jsonl_file = open(jsonl_path, 'w', encoding='utf-8') if jsonl_path else None
     reports = []
     
-    for idx, candidate_persona in enumerate(candidate_personas):
-        try:
-            # 創建臨時檔案
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f_candidate:
-                json.dump(candidate_persona, f_candidate, ensure_ascii=False, indent=2)
-                candidate_file = f_candidate.name
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f_company:
-                json.dump(company_persona, f_company, ensure_ascii=False, indent=2)
-                company_file = f_company.name
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f_result:
-                result_file = f_result.name
-            
-            # 調用 match-personas.py
-            cmd = [
-                'python3',
-                match_script,
-                '--candidate', candidate_file,
-                '--company', company_file,
-                '--output', result_file
-            ]
-            
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
-            
-            # 讀取結果
-            with open(result_file, 'r', encoding='utf-8') as f:
-                report = json.load(f)
+    try:
+        for idx, report, error in results:
+            if error is not None:
+                print(f"✗ 候選人 {idx+1} - 匹配失敗: {error}")
+                continue
             
             reports.append(report)
-            
             print(f"✓ {report['candidateName']} - {report['總分']}分 ({report['等級']})")
             
-            # 清理臨時檔案
-            os.unlink(candidate_file)
-            os.unlink(company_file)
-            os.unlink(result_file)
-            
-        except subprocess.CalledProcessError as e:
-            print(f"✗ 候選人 {idx+1} - 匹配失敗: {e.stderr}")
-        except Exception as e:
-            print(f"✗ 候選人 {idx+1} - 匹配失敗: {e}")
+            if jsonl_file:
+                jsonl_file.write(json.dumps(report, ensure_ascii=False) + '\n')
+                jsonl_file.flush()
+    finally:
+        if jsonl_file:
+            jsonl_file.close()
+        if executor:
+            executor.shutdown()
     
     # 按總分排序（降序）
     reports.sort(key=lambda x: x['總分'], reverse=True)
@@ -125,6 +139,8 @@ def main():
     parser.add_argument("--company", required=True, help="公司畫像 JSON 檔案")
     parser.add_argument("--candidates", required=True, help="候選人畫像陣列 JSON 檔案（不是資料夾）")
     parser.add_argument("--output", required=True, help="輸出批量匹配報告 JSON 檔案")
+    parser.add_argument("--workers", type=int, default=1, help="平行 process 數（大量候選人時使用）")
+    parser.add_argument("--jsonl", help="邊匹配邊輸出每位候選人報告的 JSON Lines 檔案")
     
     args = parser.parse_args()
     
@@ -142,7 +158,8 @@ def main():
         candidate_personas = json.load(f)
     
     # 執行批量匹配
-    reports = batch_match(company_persona, candidate_personas)
+    reports = batch_match(company_persona, candidate_personas,
+                          workers=args.workers, jsonl_path=args.jsonl)
     
     # 生成摘要
     summary = generate_summary(reports)
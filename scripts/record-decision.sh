@@ -43,7 +43,8 @@ FEATURES=$(cat <<EOF
   "skill_match_ratio": $(echo "$CANDIDATE" | jq -r '.details.skill.required_ratio'),
   "github_active": $(echo "$CANDIDATE" | jq -r '.details.bonus.github_active // false'),
   "company_tier": $(echo "$CANDIDATE" | jq -r '.details.bonus.company_tier // "C"'),
-  "red_flags": $(echo "$CANDIDATE" | jq -r '.details.red_flags')
+  "red_flags": $(echo "$CANDIDATE" | jq -r '.details.red_flags'),
+  "breakdown": $(echo "$CANDIDATE" | jq -c '.breakdown // null')
 }
 EOF
 )
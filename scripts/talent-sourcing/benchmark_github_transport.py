@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+GitHub Transport 基准测试 - parallel_workers 1 → 16 的吞吐量
+
+对本地 GitHub 模拟服务器（github_stub_server.py）执行搜尋计划（不使用缓存），
+比较不同 worker 数的职缺吞吐量、请求吞吐量与连线复用情况
+
+用法：
+    python3 benchmark_github_transport.py [--jobs 48] [--latency 0.05] [--workers 1,2,4,8,16]
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from github_stub_server import GitHubStubServer
+
+
+def load_scraper_module():
+    """载入 unified-scraper-v4-enhanced.py（文件名含连字号，无法直接 import）"""
+    path = Path(__file__).with_name('unified-scraper-v4-enhanced.py')
+    spec = importlib.util.spec_from_file_location('unified_scraper_v4_enhanced', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_jobs(us, count: int):
+    """产生模拟职缺（轮流使用各产业）"""
+    industries = [i for i in us.IndustryType if i in us.INDUSTRY_SEARCH_KEYWORDS]
+    skill_sets = [['Kubernetes', 'Docker', 'AWS'], ['Python', 'Go', 'Linux'], ['Security', 'DevOps', 'Linux']]
+    return [
+        us.JobRequirement(
+            job_title=f'模拟职缺 {i:03d}', customer_name='基准测试', industry=industries[i % len(industries)],
+            sub_industry=None, headcount=1, salary_range='面议', skills=skill_sets[i % len(skill_sets)],
+            experience_years=3, location='台北', search_layer=us.SearchLayer.LAYER_1, priority='P0'
+        )
+        for i in range(count)
+    ]
+
+
+def run_once(us, stub: GitHubStubServer, jobs, workers: int, cache_dir: str) -> dict:
+    executor = us.SearchPlanExecutor(cache_db=os.path.join(cache_dir, f'bench-{workers}.db'), use_cache=False)
+    executor.github = us.GitHubScraper(token='benchmark', api_url=stub.url, pool_size=1)
+
+    requests_before = stub.stats['requests']
+    connections_before = stub.stats['connections']
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = executor.execute_search_plan(jobs, parallel_workers=workers)
+    elapsed = time.perf_counter() - start
+    executor.cache.close()
+
+    summary = executor.github.transport.summary()
+    per_worker = sorted(int(s['requests']) for s in summary['per_worker'].values())
+    return {
+        'workers': workers,
+        'elapsed': elapsed,
+        'jobs': len(results),
+        'requests': stub.stats['requests'] - requests_before,
+        'connections': stub.stats['connections'] - connections_before,
+        'pool_size': summary['pool_size'],
+        'retries': int(summary['total']['retries']),
+        'avg_latency_ms': summary['total']['seconds'] / max(summary['total']['requests'], 1) * 1000,
+        'per_worker': per_worker,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GitHub transport 吞吐量基准')
+    parser.add_argument('--jobs', type=int, default=48, help='模拟职缺数')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟服务器每个请求的延迟（秒）')
+    parser.add_argument('--workers', default='1,2,4,8,16', help='要测试的 parallel_workers')
+    args = parser.parse_args()
+
+    us = load_scraper_module()
+    jobs = synthetic_jobs(us, args.jobs)
+    worker_counts = [int(w) for w in args.workers.split(',')]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            GitHubStubServer(latency=args.latency, search_limit=1_000_000) as stub:
+        for workers in worker_counts:
+            rows.append(run_once(us, stub, jobs, workers, cache_dir))
+
+    base = rows[0]['jobs'] / rows[0]['elapsed']
+    print(f"=== GitHub transport 吞吐量（{args.jobs} 个职缺，服务器延迟 {args.latency * 1000:.0f} ms）===\n")
+    print(f"{'workers':>7} {'pool':>5} {'秒':>7} {'职缺/秒':>8} {'请求/秒':>8} {'加速':>6} "
+          f"{'连线数':>6} {'重试':>5} {'平均延迟':>9}  每个 worker 请求数")
+    for row in rows:
+        jobs_per_sec = row['jobs'] / row['elapsed']
+        print(f"{row['workers']:>7} {row['pool_size']:>5} {row['elapsed']:>7.2f} {jobs_per_sec:>8.1f} "
+              f"{row['requests'] / row['elapsed']:>8.1f} {jobs_per_sec / base:>5.1f}x "
+              f"{row['connections']:>6} {row['retries']:>5} {row['avg_latency_ms']:>7.1f}ms  "
+              f"{row['per_worker'][0]}–{row['per_worker'][-1]}")
+
+
+if __name__ == '__main__':
+    main()
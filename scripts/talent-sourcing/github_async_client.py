@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+GitHub Async Client - 异步 GitHub API 客户端（aiohttp）
+
+功能：
+1. 并发上限（asyncio.Semaphore），search 分页与用户详情请求流水线化
+2. 依 X-RateLimit-Remaining / X-RateLimit-Reset / Retry-After 排程（按 resource 分别计算）
+3. ETag 缓存：带 If-None-Match，304 时直接使用缓存内容（可持久化到 JSON 文件；LRU 笔数上限 + TTL 淘汰）
+4. 依 Link: rel="next" 自动翻页
+
+用法：
+    async with AsyncGitHubClient(token) as client:
+        async for user in client.search_user_details('kubernetes location:Taiwan', max_results=50):
+            print(user['login'], user.get('bio'))
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+GITHUB_API = 'https://api.github.com'
+DEFAULT_ETAG_MAX_ENTRIES = 5000
+DEFAULT_ETAG_TTL = 7 * 86400  # 秒
+LINK_NEXT_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+class GitHubAPIError(Exception):
+    """非预期的 HTTP 状态（重试用尽或不可重试）"""
+
+    def __init__(self, status: int, url: str, message: str = ''):
+        super().__init__(f"HTTP {status} {url} {message}".strip())
+        self.status = status
+        self.url = url
+
+
+@dataclass
+class RateLimitState:
+    """单一 resource（search / core）的额度状态"""
+    limit: int
+    remaining: int
+    reset: float  # epoch 秒
+
+
+@dataclass
+class APIResponse:
+    data: object
+    next_url: Optional[str]
+    from_cache: bool = False
+
+
+class AsyncGitHubClient:
+    """异步 GitHub API 客户端"""
+
+    def __init__(self, token: Optional[str] = None, base_url: str = GITHUB_API,
+                 concurrency: int = 8, reserve: int = 0, max_retries: int = 3,
+                 etag_cache_path: Optional[str] = None, timeout: float = 30,
+                 etag_max_entries: int = DEFAULT_ETAG_MAX_ENTRIES, etag_ttl: float = DEFAULT_ETAG_TTL):
+        """
+        Args:
+            concurrency: 同时进行中的请求上限
+            reserve: 每个 resource 保留不用的额度（其他程序也在用同一个 token 时设定）
+            max_retries: 403 / 429 限流时的重试次数
+            etag_cache_path: ETag 缓存文件（None = 只在本次执行内有效）
+            etag_max_entries: ETag 缓存笔数上限（超过时淘汰最久未用的）
+            etag_ttl: ETag 缓存有效秒数（从存入或最近一次 304 确认起算，过期不再带 If-None-Match）
+        """
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = max(1, concurrency)
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.etag_cache_path = etag_cache_path
+        self.etag_max_entries = max(0, etag_max_entries)
+        self.etag_ttl = etag_ttl
+        self.timeout = timeout
+
+        self.limits: Dict[str, RateLimitState] = {}
+        self.in_flight: Dict[str, int] = {'search': 0, 'core': 0}
+        self._probes: Dict[str, asyncio.Event] = {}
+        # url → (etag, data, next_url, 存入 / 确认时间)，依最近使用排序
+        self.etags: 'OrderedDict[str, Tuple[str, object, Optional[str], float]]' = OrderedDict()
+        self.stats = {'requests': 0, 'not_modified': 0, 'rate_limit_waits': 0, 'retries': 0}
+        self.session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._quota_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> 'AsyncGitHubClient':
+        import aiohttp
+
+        headers = {'Accept': 'application/vnd.github.v3+json', 'User-Agent': 'step1ne-talent-sourcing'}
+        if self.token:
+            headers['Authorization'] = f'token {self.token}'
+        self.session = aiohttp.ClientSession(
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._quota_lock = asyncio.Lock()
+        self._load_etags()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self._save_etags()
+        return False
+
+    # ==================== ETag 缓存 ====================
+
+    def _read_etag_file(self) -> 'OrderedDict[str, tuple]':
+        """读取磁盘上的 ETag 缓存（不存在或格式错误时为空）"""
+        entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        if not self.etag_cache_path or not os.path.exists(self.etag_cache_path):
+            return entries
+        try:
+            with open(self.etag_cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return entries
+        now = time.time()
+        for url, entry in data.items():
+            if len(entry) == 3:
+                entry = [*entry, now]  # 旧格式没有时间，视为刚存入
+            entries[url] = tuple(entry)
+        return entries
+
+    def _load_etags(self):
+        self.etags = self._read_etag_file()
+        self._evict_etags(time.time())
+
+    def _save_etags(self):
+        """与磁盘上的缓存合并后写回
+
+        多个客户端（例如各 worker 线程各自 asyncio.run）共用同一个缓存文件：
+        以 .lock 文件的排他锁串行化「读取 → 合并 → 写入」，同一 URL 取较新的项目，
+        暂存文件用 mkstemp 取唯一名称，不会互相覆盖或被别人 replace 走
+        """
+        if not self.etag_cache_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.etag_cache_path))
+        with open(self.etag_cache_path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                merged = self._read_etag_file()
+                for url, entry in self.etags.items():
+                    if url not in merged or entry[3] >= merged[url][3]:
+                        merged[url] = entry
+                    merged.move_to_end(url)
+                self.etags = merged
+                self._evict_etags(time.time())
+                if not self.etags:
+                    return
+
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=directory, prefix=os.path.basename(self.etag_cache_path) + '.', suffix='.tmp'
+                )
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(self.etags, f, ensure_ascii=False)
+                    os.replace(tmp_path, self.etag_cache_path)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                    raise
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _evict_etags(self, now: float):
+        """删除过期项目，再从最久未用的开始删到笔数上限以内"""
+        expired = [url for url, entry in self.etags.items() if now - entry[3] >= self.etag_ttl]
+        for url in expired:
+            del self.etags[url]
+        while len(self.etags) > self.etag_max_entries:
+            self.etags.popitem(last=False)
+
+    def _cached_etag(self, url: str) -> Optional[Tuple[str, object, Optional[str], float]]:
+        """取得未过期的缓存项目（过期的直接删除）"""
+        cached = self.etags.get(url)
+        if cached is None:
+            return None
+        if time.time() - cached[3] >= self.etag_ttl:
+            del self.etags[url]
+            return None
+        self.etags.move_to_end(url)
+        return cached
+
+    def _store_etag(self, url: str, etag: str, data: object, next_url: Optional[str]):
+        if self.etag_max_entries == 0:
+            return
+        self.etags[url] = (etag, data, next_url, time.time())
+        self.etags.move_to_end(url)
+        if len(self.etags) > self.etag_max_entries:
+            self.etags.popitem(last=False)
+
+    # ==================== 限流排程 ====================
+
+    @staticmethod
+    def _resource_for(url: str) -> str:
+        return 'search' if '/search/' in url else 'core'
+
+    async def _acquire_quota(self, resource: str):
+        """额度不足时等到 reset；额度在本地先扣减，避免并发请求同时超额"""
+        while True:
+            probe = None
+            async with self._quota_lock:
+                state = self.limits.get(resource)
+                now = time.time()
+                if state is None:
+                    # 还不知道额度：只放行一个探测请求，其余等它的响应头
+                    probe = self._probes.get(resource)
+                    if probe is None:
+                        self._probes[resource] = asyncio.Event()
+                        return
+                elif now >= state.reset:
+                    # 窗口已过：丢掉旧状态，由下一个请求重新探测
+                    del self.limits[resource]
+                    self._probes.pop(resource, None)
+                    continue
+                else:
+                    if state.remaining > self.reserve:
+                        state.remaining -= 1
+                        return
+                    wait = state.reset - now + 0.1
+                    self.stats['rate_limit_waits'] += 1
+            if probe is not None:
+                await probe.wait()
+            else:
+                await asyncio.sleep(wait)
+
+    def _finish_probe(self, resource: str):
+        """探测请求结束：拿到额度就放行等待者；没拿到（无限流头）就让下一个请求再探测"""
+        probe = self._probes.get(resource)
+        if probe is None or probe.is_set():
+            return
+        if resource not in self.limits:
+            del self._probes[resource]
+        probe.set()
+
+    def _update_limits(self, resource: str, headers) -> None:
+        try:
+            limit = int(headers['X-RateLimit-Limit'])
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset = float(headers['X-RateLimit-Reset'])
+        except (KeyError, ValueError):
+            return
+        resource = headers.get('X-RateLimit-Resource', resource)
+        state = self.limits.get(resource)
+        if state is None or reset > state.reset:
+            # 尚未返回的请求还没反映在响应头里，先扣掉
+            remaining = max(remaining - self.in_flight.get(resource, 0), 0)
+            self.limits[resource] = RateLimitState(limit, remaining, reset)
+        else:
+            # 同一个窗口内，并发请求的响应可能乱序到达，取较小值
+            state.remaining = min(state.remaining, remaining)
+
+    def _retry_delay(self, status: int, headers) -> Optional[float]:
+        """403 / 429 应该等多久再重试；None 表示不是限流，不重试"""
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                return 60.0
+        if headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                return max(float(headers['X-RateLimit-Reset']) - time.time(), 0.0) + 0.1
+            except (KeyError, ValueError):
+                return 60.0
+        return 60.0 if status == 429 else None
+
+    # ==================== 请求 ====================
+
+    def _url(self, path: str, params: Optional[Dict] = None) -> str:
+        url = path if path.startswith('http') else self.base_url + path
+        if params:
+            url += ('&' if '?' in url else '?') + urlencode(sorted(params.items()))
+        return url
+
+    async def get(self, path: str, params: Optional[Dict] = None) -> APIResponse:
+        """GET 单一资源：限流排程 + ETag 条件请求 + 限流重试"""
+        url = self._url(path, params)
+        resource = self._resource_for(url)
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire_quota(resource)
+            cached = self._cached_etag(url)
+            headers = {'If-None-Match': cached[0]} if cached else {}
+
+            async with self._semaphore:
+                self.in_flight[resource] += 1
+                try:
+                    resp = await self.session.get(url, headers=headers)
+                except BaseException:
+                    self._finish_probe(resource)  # 连线失败也要放行等待中的请求
+                    raise
+                finally:
+                    self.in_flight[resource] -= 1
+                async with resp:
+                    self.stats['requests'] += 1
+                    self._update_limits(resource, resp.headers)
+                    self._finish_probe(resource)
+
+                    if resp.status == 304 and cached:
+                        # 304 不计入额度，退还本地预扣
+                        state = self.limits.get(resource)
+                        if state:
+                            state.remaining = min(state.remaining + 1, state.limit)
+                        self.stats['not_modified'] += 1
+                        self._store_etag(url, cached[0], cached[1], cached[2])  # 服务器确认未变，重新起算 TTL
+                        return APIResponse(cached[1], cached[2], from_cache=True)
+
+                    if resp.status in (403, 429):
+                        delay = self._retry_delay(resp.status, resp.headers)
+                        if delay is None or attempt >= self.max_retries:
+                            raise GitHubAPIError(resp.status, url, await resp.text())
+                    elif resp.status >= 400:
+                        raise GitHubAPIError(resp.status, url, await resp.text())
+                    else:
+                        data = await resp.json(content_type=None)
+                        match = LINK_NEXT_RE.search(resp.headers.get('Link', ''))
+                        next_url = match.group(1) if match else None
+                        etag = resp.headers.get('ETag')
+                        if etag:
+                            self._store_etag(url, etag, data, next_url)
+                        return APIResponse(data, next_url)
+
+            # 在 semaphore 之外等待，不占用并发名额
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+        raise GitHubAPIError(0, url, 'retries exhausted')
+
+    async def paginate(self, path: str, params: Optional[Dict] = None,
+                       max_items: Optional[int] = None, items_key: Optional[str] = 'items') -> AsyncIterator[Dict]:
+        """依 Link: rel="next" 翻页，逐笔产出；items_key=None 表示响应本身就是列表"""
+        url: Optional[str] = self._url(path, params)
+        count = 0
+        while url:
+            response = await self.get(url)
+            items = response.data.get(items_key, []) if items_key else response.data
+            for item in items:
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+            url = response.next_url
+
+    async def search_users(self, query: str, max_results: int = 30) -> AsyncIterator[Dict]:
+        """Search API 用户结果（GitHub 最多返回 1000 笔）"""
+        max_results = min(max_results, 1000)
+        params = {'q': query, 'per_page': min(max(max_results, 1), 100)}
+        async for item in self.paginate('/search/users', params, max_items=max_results):
+            yield item
+
+    async def get_user(self, login: str) -> Dict:
+        return (await self.get(f'/users/{login}')).data
+
+    async def search_user_details(self, query: str, max_results: int = 30) -> AsyncIterator[Dict]:
+        """搜尋并取得用户详情（含 bio）：每拿到一页就立即发出详情请求，不等翻页结束"""
+        async def fetch(item: Dict) -> Optional[Dict]:
+            try:
+                return await self.get_user(item['login'])
+            except Exception as e:
+                print(f"⚠️  用户详情失败 ({item.get('login')}): {e}")
+                return None
+
+        tasks = []
+        try:
+            async for item in self.search_users(query, max_results):
+                tasks.append(asyncio.ensure_future(fetch(item)))
+            for task in asyncio.as_completed(tasks):
+                user = await task
+                if user:
+                    yield user
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def _demo(base_url: str, users: int, concurrency: int) -> Dict:
+    async with AsyncGitHubClient(base_url=base_url, concurrency=concurrency) as client:
+        start = time.perf_counter()
+        first = [u async for u in client.search_user_details('backend location:Taiwan', max_results=users)]
+        first_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        second = [u async for u in client.search_user_details('backend location:Taiwan', max_results=users)]
+        second_elapsed = time.perf_counter() - start
+        return {'first': (len(first), first_elapsed), 'second': (len(second), second_elapsed),
+                'client': dict(client.stats)}
+
+
+def main():
+    """测试用：对本地模拟服务器执行搜尋（含分页、限流、304）"""
+    import sys
+    from github_stub_server import GitHubStubServer
+
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    # search 额度设得很小、窗口很短，让限流排程实际发生
+    with GitHubStubServer(users=users, latency=0.05, search_limit=2, core_limit=60, window=1.0,
+                          retry_after_every=37) as stub:
+        result = asyncio.run(_demo(stub.url, users, concurrency))
+        stub_stats = dict(stub.stats)
+
+    print(f"=== AsyncGitHubClient 对模拟服务器（{users} 位用户，并发 {concurrency}）===\n")
+    print(f"第一次：{result['first'][0]} 位用户详情，{result['first'][1]:.2f} 秒")
+    print(f"第二次：{result['second'][0]} 位用户详情，{result['second'][1]:.2f} 秒（ETag 304）")
+    print(f"\n客户端：{result['client']}")
+    print(f"服务器：请求 {stub_stats['requests']}，304 {stub_stats['not_modified']}，"
+          f"403 {stub_stats['rate_limited']}，429 {stub_stats['retry_after']}，"
+          f"最大同时处理 {stub_stats['max_in_flight']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+GitHub API 本地模擬伺服器（測試 / 基準用）
+
+模擬 GitHub 的行為：
+- /search/users：分頁（Link: rel="next"/"last"）、search 額度（X-RateLimit-*）
+- /users/{login}：ETag，If-None-Match 相符時回 304（帶額度標頭但不扣額度）
+- 額度用完回 403 + X-RateLimit-Remaining: 0；可設定每 N 個請求回一次 429 + Retry-After
+- HTTP/1.1 keep-alive；每個請求固定延遲，並記錄連線數與同時處理中的最大請求數
+
+用法：
+    with GitHubStubServer(latency=0.05) as stub:
+        print(stub.url)   # http://127.0.0.1:<port>
+"""
+
+import hashlib
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+SKILL_WORDS = ['python', 'go', 'kubernetes', 'docker', 'aws', 'linux', 'security', 'devops',
+               'machine learning', 'tensorflow', 'game server', 'networking', 'real-time', 'latency']
+
+
+class RateWindow:
+    """固定視窗額度"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset = time.time() + window
+
+    def take(self, cost: int = 1) -> bool:
+        now = time.time()
+        if now >= self.reset:
+            self.remaining = self.limit
+            self.reset = now + self.window
+        if self.remaining < cost:
+            return False
+        self.remaining -= cost
+        return True
+
+
+class GitHubStubServer:
+    """在背景執行緒啟動的模擬伺服器"""
+
+    def __init__(self, users: int = 500, latency: float = 0.02, search_limit: int = 30,
+                 core_limit: int = 5000, window: float = 60, retry_after_every: int = 0,
+                 port: int = 0):
+        """
+        Args:
+            users: 模擬用戶數（search 結果總數）
+            latency: 每個請求的處理延遲（秒）
+            search_limit / core_limit: 每個視窗的 search / core 額度
+            window: 額度重置週期（秒）
+            retry_after_every: 每 N 個請求回一次 429 + Retry-After: 1（0 = 不啟用）
+        """
+        self.users = [f"dev{i:04d}" for i in range(users)]
+        self.latency = latency
+        self.limits = {'search': RateWindow(search_limit, window), 'core': RateWindow(core_limit, window)}
+        self.retry_after_every = retry_after_every
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {'requests': 0, 'connections': 0, 'not_modified': 0, 'rate_limited': 0,
+                                      'retry_after': 0, 'in_flight': 0, 'max_in_flight': 0}
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def user_detail(self, login: str) -> Dict:
+        index = int(login[3:])
+        skills = [SKILL_WORDS[(index * 7 + k) % len(SKILL_WORDS)] for k in range(5)]
+        return {
+            'login': login,
+            'id': 100000 + index,
+            'html_url': f"https://github.com/{login}",
+            'name': f"Developer {index}",
+            'company': ['@gamania', '@appier', '@tsmc', None][index % 4],
+            'location': 'Taipei, Taiwan',
+            'bio': f"Backend engineer. {', '.join(skills)}",
+            'public_repos': 5 + index % 40,
+            'followers': index % 300,
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive，可觀察客戶端是否複用連線
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                # 標頭與內容分開寫出，關閉 Nagle 以免 keep-alive 下多出 delayed-ACK 的 40ms
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub.lock:
+                    stub.stats['connections'] += 1
+
+            def _send(self, status: int, body: Optional[Dict], headers: Dict[str, str]):
+                data = json.dumps(body).encode('utf-8') if body is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if data:
+                    self.wfile.write(data)
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.stats['requests'] += 1
+                    stub.stats['in_flight'] += 1
+                    stub.stats['max_in_flight'] = max(stub.stats['max_in_flight'], stub.stats['in_flight'])
+                    count = stub.stats['requests']
+                try:
+                    time.sleep(stub.latency)
+                    self._route(count)
+                finally:
+                    with stub.lock:
+                        stub.stats['in_flight'] -= 1
+
+            def _route(self, count: int):
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                resource = 'search' if parts.path.startswith('/search/') else 'core'
+
+                if stub.retry_after_every and count % stub.retry_after_every == 0:
+                    with stub.lock:
+                        stub.stats['retry_after'] += 1
+                    self._send(429, {'message': 'You have exceeded a secondary rate limit.'}, {'Retry-After': '1'})
+                    return
+
+                user_match = re.fullmatch(r'/users/([\w-]+)', parts.path)
+                detail = stub.user_detail(user_match.group(1)) if user_match else None
+                etag = None
+                if detail is not None:
+                    etag = '"' + hashlib.sha1(json.dumps(detail, sort_keys=True).encode()).hexdigest() + '"'
+
+                with stub.lock:
+                    window = stub.limits[resource]
+                    not_modified = etag is not None and self.headers.get('If-None-Match') == etag
+                    if not_modified:
+                        stub.stats['not_modified'] += 1
+                        window.take(cost=0)
+                        allowed = True
+                    else:
+                        allowed = window.take()
+                    rate_headers = {
+                        'X-RateLimit-Limit': str(window.limit),
+                        'X-RateLimit-Remaining': str(window.remaining),
+                        'X-RateLimit-Reset': str(int(window.reset) + 1),
+                        'X-RateLimit-Resource': resource,
+                    }
+                    if not allowed:
+                        stub.stats['rate_limited'] += 1
+                if not_modified:
+                    self._send(304, None, {**rate_headers, 'ETag': etag})
+                    return
+                if not allowed:
+                    self._send(403, {'message': 'API rate limit exceeded'}, rate_headers)
+                    return
+
+                if parts.path == '/search/users':
+                    per_page = min(int(query.get('per_page', 30)), 100)
+                    page = int(query.get('page', 1))
+                    total = min(len(stub.users), 1000)  # GitHub search 最多 1000 筆
+                    last_page = max(1, -(-total // per_page))
+                    start = (page - 1) * per_page
+                    items = [{'login': login, 'id': 100000 + int(login[3:]),
+                              'html_url': f"https://github.com/{login}", 'type': 'User'}
+                             for login in stub.users[start:min(start + per_page, total)]]
+
+                    links = []
+                    for rel, target in (('next', page + 1), ('last', last_page)):
+                        if rel == 'next' and page >= last_page:
+                            continue
+                        link_query = urlencode({**query, 'page': target})
+                        links.append(f'<{stub.url}{parts.path}?{link_query}>; rel="{rel}"')
+                    headers = dict(rate_headers)
+                    if links:
+                        headers['Link'] = ', '.join(links)
+                    self._send(200, {'total_count': total, 'incomplete_results': False, 'items': items}, headers)
+                elif detail is not None:
+                    self._send(200, detail, {**rate_headers, 'ETag': etag})
+                else:
+                    self._send(404, {'message': 'Not Found'}, rate_headers)
+
+        return Handler
+
+    def start(self) -> 'GitHubStubServer':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def main():
+    """單獨啟動模擬伺服器：python3 github_stub_server.py [port]"""
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8787
+    stub = GitHubStubServer(port=port)
+    print(f"GitHub stub server: {stub.url}（Ctrl+C 結束）")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
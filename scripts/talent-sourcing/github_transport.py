@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+GitHub Transport - 线程安全的 GitHub HTTP 传输层（requests）
+
+功能：
+1. 连线池按 worker 数量设定大小（HTTPAdapter pool_maxsize），keep-alive 复用连线
+2. 每个线程独立的 Session（headers / cookies 不共享），共用同一个 adapter 连线池
+3. 幂等 GET 自动重试：连线错误、429、5xx、额度用完的 403；指数退避 + 随机抖动，优先遵守 Retry-After
+4. 依 X-RateLimit-Remaining / X-RateLimit-Reset 暂停，不再固定 sleep；距 reset 或 Retry-After 超过上限时抛出 RateLimitExhausted
+5. 每个 worker 的请求统计（请求数、重试、错误、耗时、字节数）
+
+Token 来源：参数 > GITHUB_TOKEN / GH_TOKEN 环境变量 > ~/.gitconfig 的 [github] token（直接读文件，不启动 git）
+"""
+
+import configparser
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+GITHUB_API = 'https://api.github.com'
+DEFAULT_POOL_SIZE = int(os.environ.get('GITHUB_POOL_SIZE', '16'))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimitExhausted(RuntimeError):
+    """额度用完，且距离 reset（或 Retry-After）超过 max_quota_wait"""
+
+
+def resolve_github_token(token: Optional[str] = None) -> str:
+    """取得 GitHub token（不启动 git 子进程）"""
+    if token:
+        return token
+    for name in ('GITHUB_TOKEN', 'GH_TOKEN'):
+        if os.environ.get(name):
+            return os.environ[name].strip()
+
+    parser = configparser.ConfigParser(strict=False, interpolation=None)
+    try:
+        parser.read(os.path.expanduser('~/.gitconfig'), encoding='utf-8')
+        return parser.get('github', 'token', fallback='').strip()
+    except (configparser.Error, OSError, UnicodeDecodeError):
+        return ''
+
+
+class GitHubTransport:
+    """共用连线池的 GitHub HTTP 传输层，可在 ThreadPoolExecutor 的多个 worker 间共用"""
+
+    def __init__(self, token: Optional[str] = None, base_url: str = GITHUB_API,
+                 pool_size: int = DEFAULT_POOL_SIZE, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 timeout: tuple = (5, 30), max_quota_wait: float = 300.0):
+        """
+        Args:
+            pool_size: 连线池大小（应 >= 并行 worker 数，否则 worker 会等连线）
+            max_retries: GET 重试次数
+            backoff_base / backoff_max: 退避基数与上限（秒），实际等待为 [0, min(max, base * 2^n)] 的随机值
+            timeout: (连线, 读取) 超时秒数
+            max_quota_wait: 额度用完或 Retry-After 时最多等待几秒（core 额度 reset 可能要等近一小时，超过就抛出 RateLimitExhausted）
+        """
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.max_quota_wait = max_quota_wait
+
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.worker_stats: Dict[str, Dict[str, float]] = {}
+        self.rate_limit_reset: Dict[str, float] = {}  # resource → 额度用完时的 reset 时间
+        self.pool_size = 0
+        self.adapter = None
+        self.resize(pool_size)
+
+    def resize(self, pool_size: int):
+        """调整连线池大小（只会放大）；已建立的线程 Session 会在下次请求时换上新的 adapter"""
+        from requests.adapters import HTTPAdapter
+
+        with self.lock:
+            if pool_size <= self.pool_size:
+                return
+            self.pool_size = pool_size
+            old_adapter = self.adapter
+            # 重试由 get() 自己处理（需要遵守 Retry-After 与限流头），adapter 不重试
+            self.adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+
+        # 关闭旧连线池的闲置连线；正在使用中的连线归还时会直接关闭
+        if old_adapter is not None:
+            old_adapter.close()
+
+    def _session(self):
+        """当前线程的 Session（共用 adapter 连线池）"""
+        import requests
+
+        session = getattr(self.local, 'session', None)
+        if session is None or self.local.adapter is not self.adapter:
+            session = requests.Session()
+            session.headers['Accept'] = 'application/vnd.github.v3+json'
+            session.headers['User-Agent'] = 'step1ne-talent-sourcing'
+            if self.token:
+                session.headers['Authorization'] = f'token {self.token}'
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self.local.session = session
+            self.local.adapter = self.adapter
+        return session
+
+    def _record(self, **counts):
+        worker = threading.current_thread().name
+        with self.lock:
+            stats = self.worker_stats.setdefault(
+                worker, {'requests': 0, 'retries': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0}
+            )
+            for key, value in counts.items():
+                stats[key] += value
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """全抖动指数退避；有 Retry-After 时至少等那么久，超过 max_quota_wait 则抛出 RateLimitExhausted"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                return delay
+            if wait > self.max_quota_wait:
+                raise RateLimitExhausted(
+                    f"GitHub 要求 {wait:.0f} 秒后再重试（Retry-After），超过等待上限 {self.max_quota_wait:.0f} 秒"
+                )
+            delay = max(delay, wait)
+        return min(delay, self.max_quota_wait)
+
+    def _wait_for_quota(self, resource: str):
+        """额度用完时等到 reset；需要等待超过 max_quota_wait 则抛出 RateLimitExhausted"""
+        reset = self.rate_limit_reset.get(resource)
+        wait = reset - time.time() if reset else 0
+        if wait <= 0:
+            return
+        if wait > self.max_quota_wait:
+            raise RateLimitExhausted(
+                f"GitHub {resource} 额度用完，{time.strftime('%H:%M:%S', time.localtime(reset))} 才重置"
+                f"（还要 {wait:.0f} 秒，超过等待上限 {self.max_quota_wait:.0f} 秒）"
+            )
+        print(f"⏳ GitHub {resource} 额度用完，等待 {wait:.1f} 秒至重置", flush=True)
+        time.sleep(wait)
+
+    def _update_quota(self, resource: str, headers):
+        resource = headers.get('X-RateLimit-Resource', resource)
+        if headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                self.rate_limit_reset[resource] = float(headers['X-RateLimit-Reset']) + 0.1
+            except (KeyError, ValueError):
+                pass
+        else:
+            self.rate_limit_reset.pop(resource, None)
+
+    def get(self, path: str, params: Optional[Dict] = None):
+        """GET（幂等，可安全重试）；重试用尽时抛出 requests 的例外"""
+        import requests
+
+        url = path if path.startswith('http') else self.base_url + path
+        resource = 'search' if '/search/' in url else 'core'
+        session = self._session()
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_quota(resource)
+            start = time.perf_counter()
+            try:
+                resp = session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(requests=1, errors=1, seconds=time.perf_counter() - start)
+                if attempt >= self.max_retries:
+                    raise
+                self._record(retries=1)
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self._record(requests=1, seconds=time.perf_counter() - start, bytes=len(resp.content))
+            self._update_quota(resource, resp.headers)
+
+            rate_limited = resp.status_code == 403 and (
+                resp.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in resp.headers
+            )
+            if (resp.status_code in RETRY_STATUSES or rate_limited) and attempt < self.max_retries:
+                self._record(retries=1)
+                if not rate_limited or 'Retry-After' in resp.headers:
+                    time.sleep(self._backoff(attempt, resp.headers.get('Retry-After')))
+                continue  # 额度用完时由 _wait_for_quota 等到 reset
+
+            if resp.status_code >= 400:
+                self._record(errors=1)
+            resp.raise_for_status()
+            return resp
+
+    def summary(self) -> Dict:
+        """所有 worker 的合计与个别统计"""
+        with self.lock:
+            workers = {name: dict(stats) for name, stats in self.worker_stats.items()}
+        total = {key: sum(s[key] for s in workers.values())
+                 for key in ('requests', 'retries', 'errors', 'seconds', 'bytes')}
+        return {'pool_size': self.pool_size, 'workers': len(workers), 'total': total, 'per_worker': workers}
+
+    def reset_stats(self):
+        with self.lock:
+            self.worker_stats.clear()
@@ -8,11 +8,19 @@ Search Plan Executor - 完整端到端搜尋 + 评分 + 推荐流程
 3. 候选人评分（6维）
 4. 排序 & 推荐
 5. 导出结果（JSON + HTML 报告）
+
+搜尋 → 去重 → 评分以生成器串接，评分结果逐笔写入 scored-candidates.jsonl，
+推荐名单以每职缺 Top-K heap 维护，记忆体不随候选人数量增长
 """
 
+import hashlib
+import heapq
 import json
+import os
 import subprocess
-from typing import Dict, List, Optional
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import asdict, dataclass
 from enum import Enum
 from datetime import datetime
@@ -38,8 +46,9 @@ class ExecutionPlan:
     top_recommendations: Dict
 
 def execute_full_search_plan(job_file: str = '/tmp/jobs-to-search.json',
-                            output_dir: str = '/tmp/search-execution') -> ExecutionPlan:
-    """完整搜尋 + 评分 + 推荐流程"""
+                            output_dir: str = '/tmp/search-execution',
+                            top_k: int = 3) -> ExecutionPlan:
+    """完整搜尋 + 评分 + 推荐流程（各阶段以生成器串接，候选人逐笔流过）"""
     
     print("\n" + "="*100)
     print("🚀 启动完整搜尋计划执行器")
@@ -64,26 +73,32 @@ def execute_full_search_plan(job_file: str = '/tmp/jobs-to-search.json',
     print(f"  • Layer 1（P0，立即执行）：{len(layer_1_jobs)} 个")
     print(f"  • Layer 2（P1，本周执行）：{len(layer_2_jobs)} 个\n")
     
-    # Step 3: 执行 Layer 1 搜尋
-    print("🔍 Step 3: 执行 Layer 1 搜尋（产业感知并行爬蟲）...")
-    print("  ⏳ 此操作耗时 2-3 分钟...\n")
+    # Step 3: Layer 1 搜尋 → 去重 → 评分，结果边算边写入 JSONL，Top-K 以 heap 保留
+    print("🔍 Step 3: 执行 Layer 1 搜尋 + 去重 + 多维评分（串流）...")
+    print("  ⏳ 此操作耗时 2-3 分钟，评分结果会即时写入 JSONL...\n")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    scored_path = os.path.join(output_dir, 'scored-candidates.jsonl')
+    
+    sourced = CountingStream(source_candidates(layer_1_jobs, layer=1))
+    scored = score_candidates(dedup_candidates(sourced), jobs)
+    collector = TopKCollector(k=top_k)
     
-    layer1_results = execute_layer_search(layer_1_jobs, layer=1)
-    total_l1_candidates = sum(len(v) for v in layer1_results.values())
-    print(f"✅ Layer 1 找到 {total_l1_candidates} 位候选人\n")
+    start = time.perf_counter()
+    for record in write_jsonl(scored, scored_path):
+        if collector.total == 0:
+            print(f"  ⚡ 首笔评分结果：{time.perf_counter() - start:.1f} 秒 → {scored_path}")
+        collector.add(record)
     
-    # Step 4: 候选人评分
-    print("📊 Step 4: 执行多维评分...")
-    scored_candidates = score_all_candidates(layer1_results, jobs)
-    print(f"✅ 完成 {len(scored_candidates)} 位候选人的 6 维评分\n")
+    print(f"\n✅ Layer 1 找到 {sourced.count} 位候选人，去重后完成 {collector.total} 位的 6 维评分\n")
     
-    # Step 5: 生成推荐清单
-    print("🎯 Step 5: 生成顶级推荐清单...")
-    recommendations = generate_recommendations(scored_candidates, jobs)
+    # Step 4: 生成推荐清单
+    print("🎯 Step 4: 生成顶级推荐清单...")
+    recommendations = generate_recommendations(collector, jobs)
     
-    # Step 6: 导出报告
-    print("📄 Step 6: 生成报告...")
-    export_reports(recommendations, scored_candidates, output_dir)
+    # Step 5: 导出报告
+    print("📄 Step 5: 生成报告...")
+    export_reports(recommendations, collector.summary(), output_dir)
     
     # 执行计划总结
     plan = ExecutionPlan(
@@ -91,8 +106,8 @@ def execute_full_search_plan(job_file: str = '/tmp/jobs-to-search.json',
         total_jobs=len(jobs),
         layer_1_count=len(layer_1_jobs),
         layer_2_count=len(layer_2_jobs),
-        total_candidates_found=total_l1_candidates,
-        total_candidates_scored=len(scored_candidates),
+        total_candidates_found=sourced.count,
+        total_candidates_scored=collector.total,
         top_recommendations=recommendations
     )
     
@@ -100,86 +115,150 @@ def execute_full_search_plan(job_file: str = '/tmp/jobs-to-search.json',
     
     return plan
 
-def execute_layer_search(jobs: List[Dict], layer: int = 1) -> Dict:
-    """执行单个 layer 的搜尋"""
+# ==================== 串流阶段 ====================
+
+class CountingStream:
+    """包装生成器并计数（不保留内容）"""
+    
+    def __init__(self, stream: Iterable):
+        self.stream = stream
+        self.count = 0
     
-    results = {}
+    def __iter__(self) -> Iterator:
+        for item in self.stream:
+            self.count += 1
+            yield item
+
+def search_job_candidates(job: Dict) -> Iterator[Dict]:
+    """单一职缺的搜尋来源：找到一位就产出一位"""
     
     # 模拟搜尋（实际上调用 unified-scraper-v4-enhanced）
+    for i in range(3, 8):
+        yield {
+            'name': f'Candidate_{i}',
+            'github_url': f'https://github.com/candidate{i}',
+            'skills': job.get('skills', []),
+            'years_experience': job.get('experience_years', 0),
+            'industry_match': 0.8,
+            'overall_score': 80 + i * 2,
+        }
+
+def source_candidates(jobs: List[Dict], layer: int = 1) -> Iterator[Tuple[str, Dict]]:
+    """依序搜尋各职缺，逐笔产出 (职缺名称, 候选人)"""
+    
     for job in jobs:
         job_title = job.get('job_title', 'Unknown')
         industry = job.get('industry', 'unknown')
         
-        print(f"  🔎 搜尋：{job_title} ({industry})...", end='', flush=True)
+        print(f"  🔎 搜尋：{job_title} ({industry})...", flush=True)
         
-        # 模拟候选人结果
-        candidates = [
-            {
-                'name': f'Candidate_{i}',
-                'github_url': f'https://github.com/candidate{i}',
-                'skills': job.get('skills', []),
-                'years_experience': job.get('experience_years', 0),
-                'industry_match': 0.8,
-                'overall_score': 80 + i * 2,
-            }
-            for i in range(3, 8)
-        ]
+        found = 0
+        for candidate in search_job_candidates(job):
+            found += 1
+            yield job_title, candidate
         
-        results[job_title] = candidates
-        print(f" ✅ ({len(candidates)} 人)")
+        print(f"  ✅ {job_title}：{found} 人", flush=True)
+
+def dedup_candidates(stream: Iterable[Tuple[str, Dict]]) -> Iterator[Tuple[str, Dict]]:
+    """同一职缺下重复出现的候选人只保留第一次（只记 key 的 sha1 摘要，不保留候选人资料）
+    
+    没有 github_url 也没有 name 的候选人无从判断是否重复，一律保留
+    """
     
-    return results
+    seen = set()
+    for job_title, candidate in stream:
+        identity = candidate.get('github_url') or candidate.get('name')
+        if not identity:
+            yield job_title, candidate
+            continue
+        # sha1 摘要不会像 hash() 那样碰撞就误删不同候选人
+        key = hashlib.sha1(f"{job_title}\0{identity}".encode('utf-8')).digest()
+        if key in seen:
+            continue
+        seen.add(key)
+        yield job_title, candidate
 
-def score_all_candidates(candidates_by_job: Dict, jobs: List[Dict]) -> List[Dict]:
-    """对所有候选人进行评分"""
+def score_candidate(candidate: Dict, job_title: str, job: Dict) -> Dict:
+    """单一候选人评分"""
+    
+    # 模拟评分逻辑（实际调用 candidate-scoring-system-v2）
+    return {
+        'candidate_name': candidate['name'],
+        'job_title': job_title,
+        'overall_score': candidate['overall_score'],
+        'talent_level': get_talent_level(candidate['overall_score']),
+        'skill_match': 75.0,
+        'experience_fit': 80.0,
+        'location_fit': 100.0,
+        'hiring_signal': 70.0,
+        'company_level': 80.0,
+        'industry_experience': candidate['industry_match'] * 100,
+        'github_url': candidate.get('github_url'),
+    }
+
+def score_candidates(stream: Iterable[Tuple[str, Dict]], jobs: List[Dict]) -> Iterator[Dict]:
+    """逐笔评分"""
     
-    scored = []
     job_map = {j['job_title']: j for j in jobs}
-    
-    for job_title, candidates in candidates_by_job.items():
-        job = job_map.get(job_title, {})
+    for job_title, candidate in stream:
+        yield score_candidate(candidate, job_title, job_map.get(job_title, {}))
+
+def write_jsonl(records: Iterable[Dict], path: str) -> Iterator[Dict]:
+    """每笔写入一行 JSON 后再往下游传递（中途中断时已评分的结果仍在档案里）"""
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            yield record
+
+class TopKCollector:
+    """每个职缺以 min-heap 保留前 K 名，另累计人数与平均分（记忆体与候选人总数无关）"""
+    
+    def __init__(self, k: int = 3):
+        self.k = k
+        self.heaps: Dict[str, List[Tuple[float, int, Dict]]] = defaultdict(list)
+        self.found: Dict[str, int] = defaultdict(int)
+        self.total = 0
+        self.score_sum = 0.0
+    
+    def add(self, record: Dict):
+        job_title = record['job_title']
+        self.found[job_title] += 1
+        self.total += 1
+        self.score_sum += record['overall_score']
         
-        for candidate in candidates:
-            # 模拟评分逻辑（实际调用 candidate-scoring-system-v2）
-            score = {
-                'candidate_name': candidate['name'],
-                'job_title': job_title,
-                'overall_score': candidate['overall_score'],
-                'talent_level': get_talent_level(candidate['overall_score']),
-                'skill_match': 75.0,
-                'experience_fit': 80.0,
-                'location_fit': 100.0,
-                'hiring_signal': 70.0,
-                'company_level': 80.0,
-                'industry_experience': candidate['industry_match'] * 100,
-                'github_url': candidate.get('github_url'),
-            }
-            scored.append(score)
-    
-    return scored
+        # 同分时先出现者优先（与排序后取前 K 名的结果一致）
+        item = (record['overall_score'], -self.total, record)
+        heap = self.heaps[job_title]
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    
+    def top(self, job_title: str) -> List[Dict]:
+        """该职缺的前 K 名（分数由高到低）"""
+        return [item[2] for item in sorted(self.heaps.get(job_title, []), key=lambda x: x[:2], reverse=True)]
+    
+    def summary(self) -> Dict:
+        return {
+            'total_candidates_scored': self.total,
+            'average_score': self.score_sum / self.total if self.total else 0,
+        }
 
-def generate_recommendations(scored: List[Dict], jobs: List[Dict]) -> Dict:
+def generate_recommendations(collector: TopKCollector, jobs: List[Dict]) -> Dict:
     """生成顶级推荐"""
     
     recommendations = {}
     job_map = {j['job_title']: j for j in jobs}
     
     for job_title, job_data in job_map.items():
-        # 筛选该职缺的候选人
-        candidates_for_job = [c for c in scored if c['job_title'] == job_title]
-        
-        # 按综合评分排序
-        sorted_candidates = sorted(candidates_for_job, 
-                                 key=lambda x: x['overall_score'], 
-                                 reverse=True)
-        
-        # 取 Top 3
-        top_3 = sorted_candidates[:3]
+        top = collector.top(job_title)
         
         recommendations[job_title] = {
             'customer': job_data.get('customer_name'),
             'industry': job_data.get('industry'),
-            'total_found': len(candidates_for_job),
+            'total_found': collector.found.get(job_title, 0),
             'top_recommendations': [
                 {
                     'rank': i + 1,
@@ -190,7 +269,7 @@ def generate_recommendations(scored: List[Dict], jobs: List[Dict]) -> Dict:
                     'key_strengths': [f"{c['skill_match']:.0f}% 技能匹配", 
                                      f"{c['experience_fit']:.0f}% 年资符合"]
                 }
-                for i, c in enumerate(top_3)
+                for i, c in enumerate(top)
             ]
         }
     
@@ -209,10 +288,9 @@ def get_talent_level(score: float) -> str:
     else:
         return 'C'
 
-def export_reports(recommendations: Dict, scored: List[Dict], output_dir: str):
-    """导出 JSON + HTML 报告"""
+def export_reports(recommendations: Dict, summary: Dict, output_dir: str):
+    """导出 JSON + HTML 报告（逐笔评分结果已串流写入 scored-candidates.jsonl）"""
     
-    import os
     os.makedirs(output_dir, exist_ok=True)
     
     # JSON 报告
@@ -220,9 +298,9 @@ def export_reports(recommendations: Dict, scored: List[Dict], output_dir: str):
         'timestamp': datetime.now().isoformat(),
         'summary': {
             'total_jobs': len(recommendations),
-            'total_candidates_scored': len(scored),
-            'average_score': sum(c['overall_score'] for c in scored) / len(scored) if scored else 0,
+            **summary,
         },
+        'scored_candidates_file': os.path.join(output_dir, 'scored-candidates.jsonl'),
         'recommendations': recommendations,
     }
     
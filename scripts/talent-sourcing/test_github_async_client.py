@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+AsyncGitHubClient 对本地模拟服务器（GitHubStubServer）的测试：ETag 304 复用、限流处理、ETag 缓存上限
+
+用法：
+    python3 test_github_async_client.py
+    python3 -m pytest test_github_async_client.py
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from github_async_client import AsyncGitHubClient
+from github_stub_server import GitHubStubServer
+
+QUERY = 'backend location:Taiwan'
+
+
+async def search_twice(base_url: str, users: int, **kwargs):
+    """同一个客户端搜尋两次，回传 (第一次结果, 第二次结果, 客户端统计, ETag 缓存笔数)"""
+    async with AsyncGitHubClient(base_url=base_url, concurrency=8, **kwargs) as client:
+        first = [u async for u in client.search_user_details(QUERY, max_results=users)]
+        second = [u async for u in client.search_user_details(QUERY, max_results=users)]
+        return first, second, dict(client.stats), len(client.etags)
+
+
+def by_login(users):
+    return {u['login']: u for u in users}
+
+
+class ETagReuseTest(unittest.TestCase):
+
+    def test_second_run_reuses_cached_bodies_on_304(self):
+        with GitHubStubServer(users=40, latency=0.005) as stub:
+            first, second, stats, _ = asyncio.run(search_twice(stub.url, 40))
+            stub_stats = dict(stub.stats)
+
+        self.assertEqual(len(first), 40)
+        self.assertEqual(by_login(first), by_login(second))
+        # 用户详情第二次全部是 304；search 没有 ETag，每次都重新请求
+        self.assertEqual(stub_stats['not_modified'], 40)
+        self.assertEqual(stats['not_modified'], 40)
+
+    def test_etag_cache_persists_across_clients(self):
+        with tempfile.TemporaryDirectory() as tmp, GitHubStubServer(users=10, latency=0.005) as stub:
+            path = os.path.join(tmp, 'etags.json')
+
+            async def run_once():
+                async with AsyncGitHubClient(base_url=stub.url, etag_cache_path=path) as client:
+                    return [u async for u in client.search_user_details(QUERY, max_results=10)]
+
+            asyncio.run(run_once())
+            self.assertTrue(os.path.exists(path))
+            asyncio.run(run_once())
+            self.assertEqual(stub.stats['not_modified'], 10)
+
+    def test_concurrent_clients_merge_shared_cache_file(self):
+        # 如同 GitHubScraper(async_mode=True)：每个 worker 线程各自 asyncio.run，共用同一个缓存文件
+        workers, per_worker = 4, 5
+        with tempfile.TemporaryDirectory() as tmp, GitHubStubServer(users=workers * per_worker, latency=0.005) as stub:
+            path = os.path.join(tmp, 'etags.json')
+
+            async def fetch_users(worker: int):
+                async with AsyncGitHubClient(base_url=stub.url, etag_cache_path=path) as client:
+                    for i in range(worker * per_worker, (worker + 1) * per_worker):
+                        await client.get_user(f"dev{i:04d}")
+
+            for _ in range(5):
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # result() 会重新抛出 __aexit__ 中存档时的例外
+                    for future in [executor.submit(asyncio.run, fetch_users(w)) for w in range(workers)]:
+                        future.result()
+
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            self.assertEqual(len(cached), workers * per_worker)
+            self.assertEqual([name for name in os.listdir(tmp) if name.endswith('.tmp')], [])
+            # 第一轮之后每位用户都由合并后的缓存拿到 304
+            self.assertEqual(stub.stats['not_modified'], 4 * workers * per_worker)
+
+
+class RateLimitTest(unittest.TestCase):
+
+    def test_waits_for_reset_and_retries_429(self):
+        # search 额度 2 / 秒、每 7 个请求一次 429 + Retry-After：必须排程等待与重试才能拿齐
+        with GitHubStubServer(users=60, latency=0.005, search_limit=2, core_limit=60, window=1.0,
+                              retry_after_every=7) as stub:
+            first, second, stats, _ = asyncio.run(search_twice(stub.url, 60))
+            stub_stats = dict(stub.stats)
+
+        self.assertEqual(len(first), 60)
+        self.assertEqual(by_login(first), by_login(second))
+        self.assertGreater(stub_stats['retry_after'], 0)
+        self.assertEqual(stats['retries'], stub_stats['retry_after'] + stub_stats['rate_limited'])
+        self.assertGreater(stats['rate_limit_waits'], 0)
+
+
+class ETagEvictionTest(unittest.TestCase):
+
+    def test_max_entries_keeps_most_recently_used(self):
+        client = AsyncGitHubClient(etag_max_entries=2)
+        client._store_etag('a', '"a"', {}, None)
+        client._store_etag('b', '"b"', {}, None)
+        client._cached_etag('a')
+        client._store_etag('c', '"c"', {}, None)
+        self.assertEqual(list(client.etags), ['a', 'c'])
+
+    def test_expired_entries_are_dropped_and_not_saved(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'etags.json')
+            client = AsyncGitHubClient(etag_cache_path=path, etag_ttl=60)
+            client._store_etag('fresh', '"f"', {}, None)
+            client.etags['stale'] = ('"s"', {}, None, time.time() - 120)
+
+            self.assertIsNone(client._cached_etag('stale'))
+            client.etags['stale'] = ('"s"', {}, None, time.time() - 120)
+            client._save_etags()
+            with open(path, 'r', encoding='utf-8') as f:
+                self.assertEqual(list(json.load(f)), ['fresh'])
+
+    def test_bound_applies_during_search(self):
+        with GitHubStubServer(users=30, latency=0.005) as stub:
+            _, _, stats, cached = asyncio.run(search_twice(stub.url, 30, etag_max_entries=10))
+        self.assertEqual(cached, 10)
+        # 只有最后留在缓存里的用户详情能拿到 304
+        self.assertLessEqual(stats['not_modified'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
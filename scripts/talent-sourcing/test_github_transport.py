@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+GitHubTransport 对本地模拟服务器（GitHubStubServer）的测试：Retry-After 重试与等待上限
+
+用法：
+    python3 test_github_transport.py
+    python3 -m pytest test_github_transport.py
+"""
+
+import unittest
+
+from github_stub_server import GitHubStubServer
+from github_transport import GitHubTransport, RateLimitExhausted
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def test_retries_after_retry_after(self):
+        # 第 2 个请求回 429 + Retry-After: 1，重试（第 3 个请求）成功
+        with GitHubStubServer(users=5, latency=0, retry_after_every=2) as stub:
+            transport = GitHubTransport(base_url=stub.url)
+            transport.get('/users/dev0000')
+            resp = transport.get('/users/dev0001')
+        self.assertEqual(resp.json()['login'], 'dev0001')
+        self.assertEqual(transport.summary()['total']['retries'], 1)
+
+    def test_retry_after_over_limit_raises(self):
+        with GitHubStubServer(users=5, latency=0, retry_after_every=1) as stub:
+            transport = GitHubTransport(base_url=stub.url, max_quota_wait=0.5)
+            with self.assertRaises(RateLimitExhausted):
+                transport.get('/users/dev0001')
+            self.assertEqual(stub.stats['requests'], 1)
+
+    def test_backoff_is_capped(self):
+        transport = GitHubTransport(max_quota_wait=10, backoff_max=60)
+        self.assertLessEqual(transport._backoff(10), 10)
+        self.assertEqual(transport._backoff(0, '7'), 7)
+        with self.assertRaises(RateLimitExhausted):
+            transport._backoff(0, '3600')
+
+
+if __name__ == '__main__':
+    unittest.main()
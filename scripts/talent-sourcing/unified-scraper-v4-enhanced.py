@@ -8,10 +8,10 @@ Unified Talent Scraper v4 Enhanced - Industry-Aware Parallel Search
 3. 分层爬蟲策略（Layer 1: P0 职缺 vs Layer 2: P1 职缺）
 4. 智能并行执行（ThreadPoolExecutor）
 5. 增量缓存 + 去重
+6. 可选异步 GitHub 客户端（async_mode：分页、限流排程、ETag 304、用户详情并发）
 """
 
 import json
-import subprocess
 import sqlite3
 import time
 import re
@@ -21,6 +21,7 @@ from enum import Enum
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import hashlib
+import threading
 
 # ==================== 产业类型 ====================
 
@@ -146,41 +147,60 @@ class CandidateMatch:
 class GitHubScraper:
     """GitHub API 爬蟲 + 并行搜尋"""
     
-    def __init__(self, token: Optional[str] = None):
-        self.token = token or subprocess.run(['git', 'config', '--global', 'github.token'], 
-                                            capture_output=True, text=True).stdout.strip()
-        self.session = self._init_session()
-    
-    def _init_session(self):
-        """初始化 session"""
-        import requests
-        from requests.auth import HTTPBasicAuth
+    def __init__(self, token: Optional[str] = None, async_mode: bool = False,
+                 api_url: str = 'https://api.github.com', concurrency: int = 8,
+                 etag_cache_path: Optional[str] = '/tmp/github-etag-cache.json',
+                 pool_size: Optional[int] = None):
+        """
+        Args:
+            token: GitHub token（默认读 GITHUB_TOKEN 环境变量或 ~/.gitconfig 的 github.token）
+            async_mode: 使用 aiohttp 异步客户端（分页、限流排程、ETag 304、用户详情并发）
+            api_url: API 根地址（测试时指向本地模拟服务器）
+            concurrency: 异步模式下同时进行中的请求上限
+            etag_cache_path: 异步模式的 ETag 缓存文件
+            pool_size: 同步模式的连线池大小（默认 GITHUB_POOL_SIZE 或 16）
+        """
+        from github_transport import DEFAULT_POOL_SIZE, GitHubTransport, resolve_github_token
         
-        session = requests.Session()
-        if self.token:
-            session.headers['Authorization'] = f'token {self.token}'
-        session.headers['Accept'] = 'application/vnd.github.v3+json'
-        return session
+        self.token = resolve_github_token(token)
+        self.async_mode = async_mode
+        self.api_url = api_url.rstrip('/')
+        self.concurrency = concurrency
+        self.etag_cache_path = etag_cache_path
+        self.transport = None if async_mode else GitHubTransport(
+            self.token, base_url=self.api_url, pool_size=pool_size or DEFAULT_POOL_SIZE
+        )
+    
+    def search_queries(self, job_req: JobRequirement) -> List[str]:
+        """搜尋关键字优先级：优先技能 > 产业关键词 > 通用关键词"""
+        keywords = job_req.get_search_keywords()
+        return [
+            ' '.join(job_req.skills[:2]),  # 最相关的技能
+        ] + keywords.get('github', [])
+    
+    @staticmethod
+    def _build_query(query: str) -> str:
+        """按地点和语言过滤"""
+        return f"{query} language:python OR language:go OR language:cpp location:Taiwan type:user"
     
     def search_candidates(self, job_req: JobRequirement, max_results: int = 30) -> List[CandidateMatch]:
         """搜尋候选人"""
         
-        keywords = job_req.get_search_keywords()
-        results = []
+        if self.async_mode:
+            import asyncio
+            return asyncio.run(self.search_candidates_async(job_req, max_results))
         
-        # 搜尋关键字优先级：优先技能 > 产业关键词 > 通用关键词
-        search_queries = [
-            ' '.join(job_req.skills[:2]),  # 最相关的技能
-        ] + keywords.get('github', [])
+        results = []
+        search_queries = self.search_queries(job_req)
         
         for query in search_queries:
             if len(results) >= max_results:
                 break
             
             try:
+                # 限流由 transport 依 X-RateLimit-* / Retry-After 处理
                 matches = self._search_api(query, job_req, max_results - len(results))
                 results.extend(matches)
-                time.sleep(1)  # API 限流
             except Exception as e:
                 print(f"❌ GitHub 搜尋失败 ({query}): {e}")
         
@@ -193,20 +213,47 @@ class GitHubScraper:
         
         return list(unique_results.values())[:max_results]
     
+    async def search_candidates_async(self, job_req: JobRequirement, max_results: int = 30) -> List[CandidateMatch]:
+        """异步搜尋候选人：各查询并发，search 翻页的同时取用户详情（bio），依响应头限流"""
+        from github_async_client import AsyncGitHubClient
+        
+        # search 结果本身没有 bio，需要用户详情才能评分；每个查询多取一些再按阈值筛选
+        per_query = min(max_results * 2, 1000)
+        
+        async def run_query(client: AsyncGitHubClient, query: str) -> List[CandidateMatch]:
+            matches = []
+            try:
+                async for user in client.search_user_details(self._build_query(query), per_query):
+                    match = self._extract_candidate(user, job_req)
+                    if match:
+                        matches.append(match)
+            except Exception as e:
+                print(f"❌ GitHub 搜尋失败 ({query}): {e}")
+            return matches
+        
+        import asyncio
+        async with AsyncGitHubClient(self.token, base_url=self.api_url, concurrency=self.concurrency,
+                                     etag_cache_path=self.etag_cache_path) as client:
+            batches = await asyncio.gather(*(run_query(client, q) for q in self.search_queries(job_req)))
+        
+        # 去重（保留查询优先级顺序），按分数排序
+        unique_results = {}
+        for batch in batches:
+            for r in batch:
+                unique_results.setdefault(f"{r.name}:{r.github_url}", r)
+        
+        ranked = sorted(unique_results.values(), key=lambda r: r.overall_score, reverse=True)
+        return ranked[:max_results]
+    
     def _search_api(self, query: str, job_req: JobRequirement, max_results: int) -> List[CandidateMatch]:
         """调用 GitHub Search API"""
         
         import requests
         
-        # 按地点和语言过滤
-        search_query = f"{query} language:python OR language:go OR language:cpp location:Taiwan type:user"
+        search_query = self._build_query(query)
         
         try:
-            resp = self.session.get(
-                'https://api.github.com/search/users',
-                params={'q': search_query, 'per_page': max_results}
-            )
-            resp.raise_for_status()
+            resp = self.transport.get('/search/users', params={'q': search_query, 'per_page': max_results})
             
             results = []
             for user in resp.json().get('items', []):
@@ -226,7 +273,7 @@ class GitHubScraper:
         name = user.get('login') or user.get('name', 'Unknown')
         
         # 从 bio 推断技能
-        bio = user.get('bio', '').lower()
+        bio = (user.get('bio') or '').lower()
         skills = []
         for skill in job_req.skills:
             if skill.lower() in bio:
@@ -258,20 +305,32 @@ class GitHubScraper:
         
         return None
 
-# ==================== 搜尋计划执行器 ====================
+# ==================== 搜尋缓存 ====================
 
-class SearchPlanExecutor:
-    """整合产业识别 + 爬蟲 + 缓存"""
+def normalize_query(query: str) -> str:
+    """规范化查询：小写、合并空白，让等价查询得到同一个 key"""
+    return ' '.join(query.lower().split())
+
+class SearchCache:
+    """
+    SQLite 搜尋结果缓存：(来源, 规范化查询, 过滤条件) → 完整候选人 payload
     
-    def __init__(self, cache_db: str = '/tmp/search-cache.db'):
-        self.cache_db = cache_db
-        self._init_cache()
-        self.github = GitHubScraper()
+    - 单一长驻连线（WAL），以锁在 ThreadPoolExecutor 的 worker 之间共用
+    - 写入用 executemany 批量插入，一个查询的结果在同一个事务内替换
+    - TTL 内命中直接返回，不发出网络请求
+    """
     
-    def _init_cache(self):
-        """初始化缓存数据库"""
-        conn = sqlite3.connect(self.cache_db)
-        conn.execute('''
+    def __init__(self, db_path: str = '/tmp/search-cache.db', ttl_seconds: float = 24 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
             CREATE TABLE IF NOT EXISTS search_results (
                 id INTEGER PRIMARY KEY,
                 job_title TEXT,
@@ -281,10 +340,109 @@ class SearchPlanExecutor:
                 overall_score REAL,
                 created_at TIMESTAMP,
                 UNIQUE(job_title, candidate_name, github_url)
-            )
+            );
+            CREATE TABLE IF NOT EXISTS search_queries (
+                cache_key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                filters TEXT NOT NULL,
+                result_count INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS query_results (
+                cache_key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (cache_key, position)
+            );
         ''')
-        conn.commit()
-        conn.close()
+    
+    @staticmethod
+    def make_key(source: str, query: str, filters: Dict) -> str:
+        raw = json.dumps([source, normalize_query(query), filters], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, source: str, query: str, filters: Dict) -> Optional[List[Dict]]:
+        """TTL 内的缓存结果；未命中或已过期返回 None"""
+        key = self.make_key(source, query, filters)
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT created_at FROM search_queries WHERE cache_key = ?', (key,)
+            ).fetchone()
+            if row is None or time.time() - row[0] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            payloads = self.conn.execute(
+                'SELECT payload FROM query_results WHERE cache_key = ? ORDER BY position', (key,)
+            ).fetchall()
+            self.hits += 1
+        return [json.loads(p) for (p,) in payloads]
+    
+    def put(self, source: str, query: str, filters: Dict, payloads: List[Dict]):
+        """保存一个查询的完整结果（替换旧结果）"""
+        key = self.make_key(source, query, filters)
+        rows = [(key, i, json.dumps(p, ensure_ascii=False)) for i, p in enumerate(payloads)]
+        with self.lock:
+            with self.conn:
+                self.conn.execute('BEGIN')
+                self.conn.execute('DELETE FROM query_results WHERE cache_key = ?', (key,))
+                self.conn.executemany(
+                    'INSERT INTO query_results (cache_key, position, payload) VALUES (?, ?, ?)', rows
+                )
+                self.conn.execute('''
+                    INSERT OR REPLACE INTO search_queries
+                    (cache_key, source, query, filters, result_count, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (key, source, normalize_query(query), json.dumps(filters, sort_keys=True, ensure_ascii=False),
+                      len(payloads), time.time()))
+    
+    def record_candidates(self, candidates: List[CandidateMatch]):
+        """候选人历史记录（search_results 表），批量插入"""
+        if not candidates:
+            return
+        now = datetime.now()
+        rows = [(c.job_id, c.name, c.github_url, c.linkedin_url, c.overall_score, now) for c in candidates]
+        with self.lock:
+            with self.conn:
+                self.conn.execute('BEGIN')
+                self.conn.executemany('''
+                    INSERT OR IGNORE INTO search_results 
+                    (job_title, candidate_name, github_url, linkedin_url, overall_score, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+    
+    def prune(self) -> int:
+        """删除过期的查询缓存，返回删除数"""
+        cutoff = time.time() - self.ttl_seconds
+        with self.lock:
+            with self.conn:
+                self.conn.execute('BEGIN')
+                self.conn.execute(
+                    'DELETE FROM query_results WHERE cache_key IN '
+                    '(SELECT cache_key FROM search_queries WHERE created_at < ?)', (cutoff,)
+                )
+                return self.conn.execute('DELETE FROM search_queries WHERE created_at < ?', (cutoff,)).rowcount
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# ==================== 搜尋计划执行器 ====================
+
+class SearchPlanExecutor:
+    """整合产业识别 + 爬蟲 + 缓存"""
+    
+    def __init__(self, cache_db: str = '/tmp/search-cache.db', github_async: bool = False,
+                 cache_ttl: float = 24 * 3600, use_cache: bool = True):
+        """
+        Args:
+            cache_ttl: 搜尋结果缓存有效期（秒）
+            use_cache: False 时一律重新搜尋（结果仍会写入缓存）
+        """
+        self.cache_db = cache_db
+        self.cache = SearchCache(cache_db, ttl_seconds=cache_ttl)
+        self.use_cache = use_cache
+        self.github = GitHubScraper(async_mode=github_async)
     
     def execute_search_plan(self, 
                            job_requirements: List[JobRequirement],
@@ -301,6 +459,10 @@ class SearchPlanExecutor:
         # 按优先级排序
         jobs_sorted = sorted(jobs, key=lambda j: (j.search_layer.value, j.priority))
         
+        # 连线池至少要和 worker 数一样大，否则 worker 会互相等连线
+        if self.github.transport:
+            self.github.transport.resize(parallel_workers)
+        
         # 并行执行
         results = {}
         with ThreadPoolExecutor(max_workers=parallel_workers) as executor:
@@ -321,30 +483,42 @@ class SearchPlanExecutor:
         
         return results
     
-    def _search_for_job(self, job: JobRequirement) -> List[CandidateMatch]:
-        """搜尋单个职缺"""
+    def _cache_lookup(self, job: JobRequirement, max_results: int) -> Tuple[str, Dict]:
+        """职缺 → 缓存的 (查询, 过滤条件)；评分只依赖技能与产业，职缺名称不进 key"""
+        query = ' | '.join(self.github.search_queries(job))
+        filters = {
+            'skills': sorted(s.lower() for s in job.skills),
+            'industry': job.industry.value,
+            'max_results': max_results,
+            'user_details': self.github.async_mode,  # 同步模式拿不到 bio，结果不同
+        }
+        return query, filters
+    
+    def _search_for_job(self, job: JobRequirement, max_results: int = 30) -> List[CandidateMatch]:
+        """搜尋单个职缺（TTL 内命中缓存时不发出网络请求）"""
+        
+        query, filters = self._cache_lookup(job, max_results)
+        if self.use_cache:
+            cached = self.cache.get('github', query, filters)
+            if cached is not None:
+                print(f"💾 缓存命中 {job.job_title}（{len(cached)} 位）")
+                return [CandidateMatch(**{**payload, 'job_id': job.job_title}) for payload in cached]
         
         print(f"🔍 搜尋 {job.job_title} @ {job.customer_name} ({job.industry.value})...")
         
         # GitHub 搜尋
-        candidates = self.github.search_candidates(job, max_results=30)
+        candidates = self.github.search_candidates(job, max_results=max_results)
         
-        # 缓存结果
+        # 缓存结果（空结果可能是 API 失败，不缓存）
+        if candidates:
+            self.cache.put('github', query, filters, [c.to_dict() for c in candidates])
         self._cache_results(candidates)
         
         return candidates
     
     def _cache_results(self, candidates: List[CandidateMatch]):
-        """保存结果到缓存"""
-        conn = sqlite3.connect(self.cache_db)
-        for c in candidates:
-            conn.execute('''
-                INSERT OR IGNORE INTO search_results 
-                (job_title, candidate_name, github_url, linkedin_url, overall_score, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (c.job_id, c.name, c.github_url, c.linkedin_url, c.overall_score, datetime.now()))
-        conn.commit()
-        conn.close()
+        """保存结果到历史记录"""
+        self.cache.record_candidates(candidates)
 
 # ==================== 主程序 ====================
 
@@ -424,6 +598,7 @@ def main():
         total_candidates += len(candidates)
     
     print(f"\n✅ 總計：{total_candidates} 位候選人找到")
+    print(f"💾 搜尋缓存：命中 {executor.cache.hits}，未命中 {executor.cache.misses}（TTL {executor.cache.ttl_seconds / 3600:.0f} 小时）")
     
     # 保存为 JSON
     output = {
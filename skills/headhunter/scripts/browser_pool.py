@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+agent-browser session 池
+用途：維持 N 個長駐的具名瀏覽器 session（agent-browser --session），租借給 worker，
+讓多個職缺詳細頁同時載入，不再共用同一個全域瀏覽器逐頁處理
+
+用法：
+    def get_title(session, url):
+        session.open(url)
+        return session.eval('document.title')
+
+    with BrowserPool(size=3) as pool:
+        titles = pool.map(get_title, urls)
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, List, Optional
+
+DEFAULT_POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE', '3'))
+
+
+def parse_json_result(output: str) -> Any:
+    """解析 eval 輸出（JS 回傳 JSON.stringify(...) 時可能再包一層字串）；失敗回傳 None"""
+    try:
+        value = json.loads(output.strip())
+        return json.loads(value) if isinstance(value, str) else value
+    except ValueError:
+        return None
+
+
+class BrowserSession:
+    """單一具名 session；agent-browser 的 daemon 在指令之間保持該 session 的瀏覽器開啟"""
+
+    def __init__(self, name: str, command: str = 'agent-browser', timeout: int = 60):
+        self.name = name
+        self.command = command
+        self.timeout = timeout
+
+    def run(self, *args: str, timeout: Optional[int] = None) -> str:
+        """執行一個 agent-browser 指令（參數直接傳遞，不經 shell，JS / URL 不需跳脫）"""
+        try:
+            result = subprocess.run(
+                [self.command, '--session', self.name, *args],
+                capture_output=True, text=True, timeout=timeout or self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return ''
+        return result.stdout
+
+    def open(self, url: str, wait: bool = True, wait_timeout_ms: Optional[int] = None) -> str:
+        """開啟頁面，預設等待網路閒置"""
+        output = self.run('open', url)
+        if wait:
+            args = ['wait', '--load', 'networkidle']
+            if wait_timeout_ms:
+                args += ['--timeout', str(wait_timeout_ms)]
+            self.run(*args)
+        return output
+
+    def eval(self, js: str) -> str:
+        """在目前頁面執行 JavaScript"""
+        return self.run('eval', js).strip()
+
+    def eval_json(self, js: str) -> Any:
+        """執行 JavaScript 並解析 JSON 結果；失敗回傳 None"""
+        return parse_json_result(self.eval(js))
+
+    def snapshot(self, interactive: bool = False, as_json: bool = False) -> str:
+        """取得頁面 snapshot"""
+        args = ['snapshot']
+        if interactive:
+            args.append('-i')
+        if as_json:
+            args.append('--json')
+        return self.run(*args)
+
+    def close(self):
+        """關閉這個 session 的瀏覽器"""
+        self.run('close', timeout=30)
+
+
+class BrowserPool:
+    """固定數量的 session，以 lease() 租借；map() 讓各 session 同時處理不同頁面"""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, prefix: str = 'headhunter',
+                 command: str = 'agent-browser'):
+        self.size = max(1, size)
+        self.sessions = [BrowserSession(f"{prefix}-{os.getpid()}-{i}", command) for i in range(self.size)]
+        self.idle: queue.Queue = queue.Queue()
+        for session in self.sessions:
+            self.idle.put(session)
+        self.lock = threading.Lock()
+        self.closed = False
+        self.errors: List[tuple] = []  # map() 中失敗的 (item, exception)
+
+    @contextmanager
+    def lease(self):
+        """租借一個閒置的 session（沒有閒置時等待），用完自動歸還"""
+        session = self.idle.get()
+        try:
+            yield session
+        finally:
+            self.idle.put(session)
+
+    def map(self, func: Callable[[BrowserSession, Any], Any], items: Iterable[Any]) -> List[Any]:
+        """以所有 session 並行處理 items，結果依輸入順序回傳
+
+        單筆出錯時該筆為 None，例外連同 item 與 session 印到 stderr，並記錄在 self.errors
+        """
+        def run_one(item):
+            with self.lease() as session:
+                try:
+                    return func(session, item)
+                except Exception as e:
+                    print(f"⚠️ [{session.name}] 處理 {item!r} 失敗: {e!r}\n{traceback.format_exc()}",
+                          file=sys.stderr, end='', flush=True)
+                    with self.lock:
+                        self.errors.append((item, e))
+                    return None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run_one, items))
+
+    def close(self):
+        """關閉所有 session 的瀏覽器"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            list(executor.map(lambda s: s.close(), self.sessions))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def get_title(session: BrowserSession, url: str) -> str:
+    session.open(url)
+    return session.eval('document.title')
+
+
+def main():
+    """測試用：同時開啟多個頁面並讀取標題"""
+    import time
+
+    urls = sys.argv[1:] or ['https://example.com', 'https://example.org', 'https://example.net']
+    start = time.perf_counter()
+    with BrowserPool(size=min(len(urls), DEFAULT_POOL_SIZE)) as pool:
+        titles = pool.map(get_title, urls)
+    for url, title in zip(urls, titles):
+        print(f"{url} → {title}")
+    print(f"\n{len(urls)} 頁，耗時 {time.perf_counter() - start:.1f} 秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,11 @@ import sys
 import time
 from datetime import datetime
 
+from page_cache import PageCache
+
+# 頁面快取在 main() 才建立（import 時不建目錄、不開 SQLite）；未建立時直接抓取
+PAGE_CACHE = None
+
 def run_browser(cmd):
     """執行 agent-browser 指令"""
     result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
@@ -90,12 +95,24 @@ def get_user_profile(username):
     """
     print(f"  📄 讀取 {username} 的資料...")
     
-    # 開啟用戶頁面
-    run_browser(f'agent-browser open "https://github.com/{username}"')
-    time.sleep(1)
-    
-    # 取得頁面內容
-    snapshot = run_browser('agent-browser snapshot -i --json')
+    def fetch():
+        # 開啟用戶頁面
+        run_browser(f'agent-browser open "https://github.com/{username}"')
+        time.sleep(1)
+        
+        # 取得頁面內容（只快取可解析的 snapshot）
+        snapshot = run_browser('agent-browser snapshot -i --json')
+        try:
+            json.loads(snapshot)
+        except ValueError:
+            return None
+        return snapshot
+    
+    # 近期讀過的用戶頁面直接重用快取
+    if PAGE_CACHE is None:
+        snapshot = fetch() or ''
+    else:
+        snapshot = PAGE_CACHE.get_or_fetch(f'https://github.com/{username}', fetch, variant='snapshot -i --json') or ''
     
     profile = {
         'username': username,
@@ -183,11 +200,16 @@ def search_and_extract(location="taipei", language="python", min_repos=5, min_fo
     
     # 關閉瀏覽器
     run_browser('agent-browser close')
+    if PAGE_CACHE is not None:
+        print(f"\n{PAGE_CACHE.summary()}")
     
     return results
 
 def main():
     """主函數"""
+    global PAGE_CACHE
+    PAGE_CACHE = PageCache()
+    
     # 預設參數
     location = sys.argv[1] if len(sys.argv) > 1 else "taipei"
     language = sys.argv[2] if len(sys.argv) > 2 else "python"
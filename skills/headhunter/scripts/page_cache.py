@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+agent-browser 頁面快取 - 內容定址的磁碟快取
+用途：重跑、當機後續跑、每日增量任務重用近期抓過的頁面，不必每頁再花 10+ 秒開瀏覽器
+
+- 以標準化 URL（+ 擷取方式）為 key，內容以 SHA-256 命名、gzip 壓縮存放（相同內容只存一份）
+- 依 URL 類別設定 TTL；過期的官網 / GitHub 頁面先以 ETag / Last-Modified 條件式請求驗證
+- 模式（環境變數 STEP1NE_PAGE_CACHE）：normal（預設）、offline（只重播快取）、refresh（全部重抓）、off
+
+用法：
+    python3 page_cache.py stats
+    python3 page_cache.py get <url> [variant]
+    python3 page_cache.py prune [--days 30]
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_CACHE_DIR = os.environ.get('STEP1NE_PAGE_CACHE_DIR', os.path.expanduser('~/.cache/step1ne/pages'))
+MODES = ('normal', 'offline', 'refresh', 'off')
+
+DAY = 86400
+# URL 類別：(名稱, regex（比對標準化後的 URL）, TTL 秒數, 過期時是否先做條件式驗證)
+# 104 頁面為前端渲染，HTTP 驗證標頭反映不了內容變動，過期一律重抓
+URL_CLASSES = [
+    ('104-company', re.compile(r'^https://www\.104\.com\.tw/company/'), 7 * DAY, False),
+    ('104-job', re.compile(r'^https://www\.104\.com\.tw/job/'), 1 * DAY, False),
+    ('104-search', re.compile(r'^https://www\.104\.com\.tw/jobs/search'), 3600, False),
+    ('github-search', re.compile(r'^https://github\.com/search'), 3600, False),
+    ('github-profile', re.compile(r'^https://github\.com/[^/?]+$'), 3 * DAY, True),
+    ('website', re.compile(r''), 3 * DAY, True),  # 公司官網等其他網站
+]
+
+# 不影響頁面內容的追蹤參數
+TRACKING_PARAMS = {'jobsource', 'fbclid', 'gclid', 'ref', 'ref_src'}
+
+
+def normalize_url(url: str) -> str:
+    """標準化 URL：https、小寫 host、去除預設埠 / fragment / 追蹤參數、排序 query、去除結尾斜線"""
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    parts = urlsplit(url)
+
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')
+    )
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def classify_url(normalized_url: str) -> Tuple[str, int, bool]:
+    """回傳 (URL 類別, TTL 秒數, 是否條件式驗證)"""
+    for name, pattern, ttl, revalidate in URL_CLASSES:
+        if pattern.match(normalized_url):
+            return name, ttl, revalidate
+    return URL_CLASSES[-1][0], URL_CLASSES[-1][2], URL_CLASSES[-1][3]
+
+
+class PageCache:
+    """頁面快取（thread-safe；多個行程可共用同一個快取目錄）"""
+
+    def __init__(self, cache_dir: Optional[str] = None, mode: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.mode = mode or os.environ.get('STEP1NE_PAGE_CACHE', 'normal')
+        if self.mode not in MODES:
+            raise ValueError(f"未知的快取模式: {self.mode}（可用: {', '.join(MODES)}）")
+
+        self.objects_dir = self.cache_dir / 'objects'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.cache_dir / 'index.db'), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                url_class TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                validated_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        ''')
+        self.conn.commit()
+
+        self.stats: Dict[str, int] = {'hits': 0, 'revalidated': 0, 'misses': 0, 'fetched': 0}
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == 'offline'
+
+    @staticmethod
+    def _key(normalized_url: str, variant: str) -> str:
+        return hashlib.sha256(f"{variant}\n{normalized_url}".encode('utf-8')).hexdigest()
+
+    def _object_path(self, body_hash: str) -> Path:
+        return self.objects_dir / body_hash[:2] / f"{body_hash}.gz"
+
+    def _read_body(self, body_hash: str) -> Optional[str]:
+        try:
+            with gzip.open(self._object_path(body_hash), 'rt', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def _write_body(self, body: str) -> str:
+        """存放內容，回傳內容雜湊（已存在則不重寫）"""
+        data = body.encode('utf-8')
+        body_hash = hashlib.sha256(data).hexdigest()
+        path = self._object_path(body_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+        return body_hash
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT body_hash, fetched_at, validated_at, etag, last_modified FROM pages WHERE key = ?',
+                (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(('body_hash', 'fetched_at', 'validated_at', 'etag', 'last_modified'), row))
+
+    def _head(self, url: str, entry: Optional[Dict] = None) -> Tuple[Optional[int], Dict[str, str]]:
+        """HEAD 請求（可帶條件式標頭），回傳 (狀態碼, 標頭（名稱轉小寫）)；失敗時狀態碼為 None"""
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        request = urllib.request.Request(url, headers=headers, method='HEAD')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, {k.lower(): v for k, v in response.headers.items()}
+        except urllib.error.HTTPError as e:
+            return e.code, {k.lower(): v for k, v in (e.headers or {}).items()}
+        except Exception:
+            return None, {}
+
+    def _revalidate(self, url: str, key: str, entry: Dict) -> bool:
+        """過期項目的條件式驗證：304，或 200 且快取時記錄的驗證標頭都在且未變，才視為仍有效
+
+        回應缺少驗證標頭時無從判斷，視為已變動並重抓
+        """
+        validators = [(header, entry[field]) for header, field in (('etag', 'etag'), ('last-modified', 'last_modified'))
+                      if entry.get(field)]
+        if not validators:
+            return False
+
+        status, headers = self._head(url, entry)
+        unchanged = status == 304 or (
+            status == 200 and all(headers.get(header) == value for header, value in validators)
+        )
+        if unchanged:
+            with self.lock:
+                self.conn.execute('UPDATE pages SET validated_at = ? WHERE key = ?', (time.time(), key))
+                self.conn.commit()
+        return unchanged
+
+    def get(self, url: str, variant: str = 'snapshot', allow_stale: bool = False) -> Optional[str]:
+        """只查快取（不抓取）；allow_stale=True 時忽略 TTL"""
+        normalized = normalize_url(url)
+        entry = self._lookup(self._key(normalized, variant))
+        if not entry:
+            return None
+        _, ttl, _ = classify_url(normalized)
+        if not allow_stale and time.time() - max(entry['fetched_at'], entry['validated_at']) >= ttl:
+            return None
+        return self._read_body(entry['body_hash'])
+
+    def put(self, url: str, body: str, variant: str = 'snapshot'):
+        """存入頁面內容；需驗證的 URL 類別另外記錄 ETag / Last-Modified"""
+        normalized = normalize_url(url)
+        url_class, _, revalidate = classify_url(normalized)
+        etag = last_modified = None
+        if revalidate:
+            status, headers = self._head(url)
+            if status == 200:
+                etag, last_modified = headers.get('etag'), headers.get('last-modified')
+
+        body_hash = self._write_body(body)
+        now = time.time()
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO pages
+                    (key, url, variant, url_class, body_hash, fetched_at, validated_at, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (self._key(normalized, variant), normalized, variant, url_class, body_hash,
+                  now, now, etag, last_modified))
+            self.conn.commit()
+
+    def get_or_fetch(self, url: str, fetch: Callable[[], Optional[str]],
+                     variant: str = 'snapshot') -> Optional[str]:
+        """
+        有效快取直接回傳，否則呼叫 fetch() 抓取並存入（fetch 回傳空值時不快取）
+
+        Args:
+            url: 頁面 URL
+            fetch: 實際抓取函數（開瀏覽器）
+            variant: 擷取方式（如 'snapshot'、'snapshot -i --json'、'eval:<js 雜湊>'），同一頁面不同擷取方式分開快取
+        """
+        if self.mode == 'off':
+            return fetch()
+
+        normalized = normalize_url(url)
+        key = self._key(normalized, variant)
+
+        if self.mode != 'refresh':
+            entry = self._lookup(key)
+            body = self._read_body(entry['body_hash']) if entry else None
+            if body is not None:
+                _, ttl, revalidate = classify_url(normalized)
+                if self.offline or time.time() - max(entry['fetched_at'], entry['validated_at']) < ttl:
+                    self.stats['hits'] += 1
+                    return body
+                if revalidate and self._revalidate(url, key, entry):
+                    self.stats['revalidated'] += 1
+                    return body
+
+        self.stats['misses'] += 1
+        if self.offline:
+            return None
+
+        body = fetch()
+        if body:
+            self.stats['fetched'] += 1
+            self.put(url, body, variant)
+        return body
+
+    def summary(self) -> str:
+        """本次執行的快取統計"""
+        s = self.stats
+        return (f"頁面快取（{self.mode}）: 命中 {s['hits']}、驗證後重用 {s['revalidated']}、"
+                f"未命中 {s['misses']}（實際抓取 {s['fetched']}）")
+
+    def prune(self, max_age_days: float = 30) -> Tuple[int, int]:
+        """刪除超過 max_age_days 未更新的項目與不再被引用的內容，回傳 (項目數, 內容檔數)"""
+        cutoff = time.time() - max_age_days * DAY
+        with self.lock:
+            removed = self.conn.execute(
+                'DELETE FROM pages WHERE MAX(fetched_at, validated_at) < ?', (cutoff,)
+            ).rowcount
+            self.conn.commit()
+            referenced = {row[0] for row in self.conn.execute('SELECT DISTINCT body_hash FROM pages')}
+
+        removed_objects = 0
+        for path in self.objects_dir.glob('*/*.gz'):
+            if path.name[:-3] not in referenced:
+                path.unlink()
+                removed_objects += 1
+        return removed, removed_objects
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='agent-browser 頁面快取')
+    parser.add_argument('command', choices=['stats', 'get', 'prune'])
+    parser.add_argument('url', nargs='?')
+    parser.add_argument('variant', nargs='?', default='snapshot')
+    parser.add_argument('--days', type=float, default=30, help='prune：保留天數')
+    parser.add_argument('--dir', help=f'快取目錄（預設 {DEFAULT_CACHE_DIR}）')
+    args = parser.parse_args()
+
+    cache = PageCache(args.dir, mode='normal')
+
+    if args.command == 'stats':
+        rows = cache.conn.execute(
+            'SELECT url_class, COUNT(*) FROM pages GROUP BY url_class ORDER BY url_class'
+        ).fetchall()
+        objects = list(cache.objects_dir.glob('*/*.gz'))
+        print(f"快取目錄: {cache.cache_dir}")
+        for url_class, count in rows:
+            print(f"  {url_class:<16} {count} 頁")
+        print(f"內容檔: {len(objects)} 個，共 {sum(p.stat().st_size for p in objects) / 1024:.1f} KB（壓縮後）")
+    elif args.command == 'get':
+        body = cache.get(args.url, args.variant, allow_stale=True)
+        print(body if body is not None else f"快取中沒有 {normalize_url(args.url)}")
+    elif args.command == 'prune':
+        pages, objects = cache.prune(args.days)
+        print(f"已刪除 {pages} 個項目、{objects} 個內容檔")
+
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
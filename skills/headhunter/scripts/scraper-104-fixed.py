@@ -3,51 +3,23 @@
 104人力銀行職缺爬蟲（修正版）
 """
 
-import subprocess
+import hashlib
 import json
 import sys
 from datetime import datetime
 
-def run_cmd(cmd):
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    return result.stdout.strip()
+from browser_pool import BrowserPool, DEFAULT_POOL_SIZE
+from page_cache import PageCache
+
+# 頁面快取在 main() 才建立（import 時不建目錄、不開 SQLite）；未建立時直接抓取
+PAGE_CACHE = None
 
 def log(msg):
     log_file = f"/tmp/104-scraper-{datetime.now().strftime('%Y%m%d-%H%M%S')}.log"
     with open(log_file, 'a', encoding='utf-8') as f:
         f.write(f"[{datetime.now()}] {msg}\n")
 
-def search_jobs(keyword, max_results=20):
-    log(f"搜尋: {keyword}")
-    
-    # 開啟搜尋頁面
-    url = f"https://www.104.com.tw/jobs/search/?keyword={keyword}"
-    run_cmd(f'agent-browser open "{url}"')
-    run_cmd('agent-browser wait --load networkidle')
-    
-    # 提取職缺 URL 和標題
-    js = "Array.from(document.querySelectorAll('a[href*=\"/job/\"]')).slice(0, %d).map(a => ({url: a.href, title: a.textContent.trim()})).filter(j => j.title.length > 5)" % max_results
-    result = run_cmd(f"agent-browser eval '{js}'")
-    
-    try:
-        jobs = json.loads(result)
-        log(f"找到 {len(jobs)} 個職缺")
-    except:
-        log("解析失敗")
-        run_cmd('agent-browser close')
-        return []
-    
-    # 抓取詳細資訊
-    detailed = []
-    for job in jobs[:max_results]:
-        log(f"處理: {job['title'][:40]}")
-        
-        # 訪問職缺頁面
-        run_cmd(f"agent-browser open '{job['url']}'")
-        run_cmd('agent-browser wait --load networkidle --timeout 5000')
-        
-        # 提取資訊
-        js_detail = """
+JS_DETAIL = """
 (function(){
   const get = (sel) => {
     const el = document.querySelector(sel);
@@ -60,26 +32,72 @@ def search_jobs(keyword, max_results=20):
   };
 })()
 """
-        detail_result = run_cmd(f"agent-browser eval '{js_detail}'")
+
+def browse_eval(session, url, js, wait_timeout_ms=None):
+    """用租借到的 session 開啟頁面並執行 JS，結果經頁面快取（重跑時直接重用）"""
+    def fetch():
+        session.open(url, wait_timeout_ms=wait_timeout_ms)
+        result = session.eval(js)
+        # 只快取可解析的結果，失敗的頁面下次重抓
+        try:
+            json.loads(result)
+        except ValueError:
+            return None
+        return result
+    
+    if PAGE_CACHE is None:
+        return fetch()
+    variant = 'eval:' + hashlib.sha1(js.encode('utf-8')).hexdigest()[:12]
+    return PAGE_CACHE.get_or_fetch(url, fetch, variant=variant)
+
+def fetch_job_detail(session, job):
+    """抓取單一職缺詳細資訊（各 session 並行執行）"""
+    log(f"處理: {job['title'][:40]}")
+    
+    detail_result = browse_eval(session, job['url'], JS_DETAIL, wait_timeout_ms=5000) or ''
+    
+    try:
+        details = json.loads(detail_result)
+    except:
+        details = {"company": "N/A", "location": "N/A", "salary": "N/A"}
+    
+    return {
+        "company": details.get('company', 'N/A'),
+        "job_title": job['title'],
+        "location": details.get('location', 'N/A'),
+        "salary": details.get('salary', 'N/A'),
+        "url": job['url']
+    }
+
+def search_jobs(keyword, max_results=20, pool_size=DEFAULT_POOL_SIZE):
+    log(f"搜尋: {keyword}")
+    
+    with BrowserPool(size=pool_size, prefix='104-fixed') as pool:
+        # 開啟搜尋頁面，提取職缺 URL 和標題
+        url = f"https://www.104.com.tw/jobs/search/?keyword={keyword}"
+        js = "Array.from(document.querySelectorAll('a[href*=\"/job/\"]')).slice(0, %d).map(a => ({url: a.href, title: a.textContent.trim()})).filter(j => j.title.length > 5)" % max_results
+        with pool.lease() as session:
+            result = browse_eval(session, url, js) or ''
         
         try:
-            details = json.loads(detail_result)
+            jobs = json.loads(result)
+            log(f"找到 {len(jobs)} 個職缺")
         except:
-            details = {"company": "N/A", "location": "N/A", "salary": "N/A"}
+            log("解析失敗")
+            return []
         
-        detailed.append({
-            "company": details.get('company', 'N/A'),
-            "job_title": job['title'],
-            "location": details.get('location', 'N/A'),
-            "salary": details.get('salary', 'N/A'),
-            "url": job['url']
-        })
+        # 抓取詳細資訊：多個 session 同時載入不同職缺頁
+        detailed = [d for d in pool.map(fetch_job_detail, jobs[:max_results]) if d]
     
-    run_cmd('agent-browser close')
     log(f"完成，共 {len(detailed)} 個")
+    if PAGE_CACHE is not None:
+        log(PAGE_CACHE.summary())
     return detailed
 
 def main():
+    global PAGE_CACHE
+    PAGE_CACHE = PageCache()
+    
     keyword = sys.argv[1] if len(sys.argv) > 1 else "backend"
     max_results = int(sys.argv[2]) if len(sys.argv) > 2 else 20
     
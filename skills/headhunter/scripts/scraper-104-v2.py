@@ -4,49 +4,25 @@
 用途：搜尋職缺，提取公司和職位資訊（使用 JavaScript eval 提取）
 """
 
-import subprocess
 import json
 import re
 import sys
-import tempfile
 from datetime import datetime
 
-def run_browser_command(cmd):
-    """執行 agent-browser 指令"""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    return result.stdout
-
-def run_js_in_browser(js_code):
-    """在瀏覽器中執行 JavaScript 並返回結果"""
-    # 將 JavaScript 存成臨時檔案
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-        f.write(js_code)
-        js_file = f.name
-    
-    # 執行
-    result = run_browser_command(f'agent-browser eval "$(cat {js_file})"')
-    
-    # 清理
-    import os
-    os.unlink(js_file)
-    
-    return result
+from browser_pool import BrowserPool, DEFAULT_POOL_SIZE, parse_json_result
 
 def log_debug(message):
     """寫入 debug 日誌"""
     with open("/tmp/104-scraper-v2-debug.log", 'a', encoding='utf-8') as log:
         log.write(f"[{datetime.now()}] {message}\n")
 
-def search_104_jobs(keyword, max_results=20):
+def search_104_jobs(session, keyword, max_results=20):
     """搜尋 104 職缺"""
     log_debug(f"🔍 搜尋: {keyword}")
     
-    # 開啟搜尋頁面
+    # 開啟搜尋頁面並等待載入
     url = f"https://www.104.com.tw/jobs/search/?keyword={keyword}"
-    run_browser_command(f'agent-browser open "{url}"')
-    
-    # 等待載入
-    run_browser_command('agent-browser wait --load networkidle --timeout 10000')
+    session.open(url, wait_timeout_ms=10000)
     
     # 使用 JavaScript 提取職缺資料
     js_code = """
@@ -76,28 +52,23 @@ def search_104_jobs(keyword, max_results=20):
     """
     
     # 執行 JavaScript
-    result = run_js_in_browser(js_code)
+    result = session.eval(js_code)
     
     log_debug(f"JavaScript result: {result[:200]}...")
     
-    # 關閉瀏覽器
-    run_browser_command('agent-browser close')
-    
     # 解析結果
-    try:
-        jobs = json.loads(result.strip())
-        log_debug(f"✅ 找到 {len(jobs)} 個職缺")
-        return jobs
-    except Exception as e:
-        log_debug(f"❌ 解析失敗: {e}, result={result[:500]}")
+    jobs = parse_json_result(result)
+    if not isinstance(jobs, list):
+        log_debug(f"❌ 解析失敗: result={result[:500]}")
         return []
+    log_debug(f"✅ 找到 {len(jobs)} 個職缺")
+    return jobs
 
-def get_company_contact(job_url):
+def get_company_contact(session, job_url):
     """從職缺頁面提取公司聯絡方式"""
     log_debug(f"📞 訪問職缺頁面: {job_url}")
     
-    run_browser_command(f'agent-browser open "{job_url}"')
-    run_browser_command('agent-browser wait --load networkidle --timeout 10000')
+    session.open(job_url, wait_timeout_ms=10000)
     
     # 提取公司資訊的 JavaScript
     js_code = """
@@ -137,20 +108,15 @@ def get_company_contact(job_url):
     })();
     """
     
-    result = run_js_in_browser(js_code)
-    
-    # 關閉瀏覽器
-    run_browser_command('agent-browser close')
+    contact_info = session.eval_json(js_code)
     
-    try:
-        contact_info = json.loads(result.strip())
+    if isinstance(contact_info, dict):
         log_debug(f"✅ 提取資訊: Phone={contact_info.get('phone')}, Email={contact_info.get('email')}, Website={contact_info.get('website')}")
         return contact_info
-    except Exception as e:
-        log_debug(f"❌ 提取失敗: {e}")
-        return {"phone": None, "email": None, "website": None, "companyUrl": None}
+    log_debug(f"❌ 提取失敗: {job_url}")
+    return {"phone": None, "email": None, "website": None, "companyUrl": None}
 
-def scrape_company_website(website_url):
+def scrape_company_website(session, website_url):
     """爬取公司官網，提取聯絡方式"""
     if not website_url or not website_url.startswith('http'):
         return {"phone": None, "email": None}
@@ -167,8 +133,7 @@ def scrape_company_website(website_url):
     
     for url in contact_urls:
         try:
-            run_browser_command(f'agent-browser open "{url}"')
-            run_browser_command('agent-browser wait --load networkidle --timeout 5000')
+            session.open(url, wait_timeout_ms=5000)
             
             # 提取電話和 Email
             js_code = """
@@ -188,12 +153,7 @@ def scrape_company_website(website_url):
             })();
             """
             
-            result = run_js_in_browser(js_code)
-            
-            # 關閉瀏覽器
-            run_browser_command('agent-browser close')
-            
-            contact_info = json.loads(result.strip())
+            contact_info = session.eval_json(js_code) or {}
             
             if contact_info.get('phone') or contact_info.get('email'):
                 log_debug(f"✅ 官網找到資訊: {contact_info}")
@@ -204,6 +164,39 @@ def scrape_company_website(website_url):
     log_debug(f"⚠️ 官網未找到聯絡方式")
     return {"phone": None, "email": None}
 
+def process_job(session, job):
+    """處理單一職缺：職缺頁聯絡方式，不足時再爬官網"""
+    log_debug(f"處理職缺: {job.get('title')}")
+    
+    # 從職缺頁面提取聯絡方式
+    contact_info = get_company_contact(session, job.get('url', ''))
+    
+    # 如果沒有電話或 Email，嘗試爬官網
+    if (not contact_info.get('phone') or not contact_info.get('email')) and contact_info.get('website'):
+        website_contact = scrape_company_website(session, contact_info.get('website'))
+        
+        if not contact_info.get('phone'):
+            contact_info['phone'] = website_contact.get('phone')
+        if not contact_info.get('email'):
+            contact_info['email'] = website_contact.get('email')
+    
+    # 整合資料
+    detailed_job = {
+        "company": job.get('company', 'N/A'),
+        "job_title": job.get('title', 'N/A'),
+        "location": job.get('location', 'N/A'),
+        "salary": job.get('salary', 'N/A'),
+        "url": job.get('url', ''),
+        "phone": contact_info.get('phone') or "待查",
+        "email": contact_info.get('email') or "待查",
+        "website": contact_info.get('website') or "待查",
+        "contact_person": "您好",
+        "status": "待聯繫"
+    }
+    
+    log_debug(f"✅ 完成: {detailed_job['company']}")
+    return detailed_job
+
 def main():
     """主程式"""
     keyword = sys.argv[1] if len(sys.argv) > 1 else "backend engineer"
@@ -211,47 +204,17 @@ def main():
     
     log_debug(f"開始處理: {keyword}, 數量: {max_results}")
     
-    # 步驟 1：搜尋職缺
-    jobs = search_104_jobs(keyword, max_results)
-    
-    if not jobs:
-        print("[]")
-        return
-    
-    # 步驟 2：提取每個職缺的公司聯絡方式
-    detailed_jobs = []
-    
-    for job in jobs:
-        log_debug(f"處理職缺: {job.get('title')}")
-        
-        # 從職缺頁面提取聯絡方式
-        contact_info = get_company_contact(job.get('url', ''))
+    with BrowserPool(size=DEFAULT_POOL_SIZE, prefix='104-v2') as pool:
+        # 步驟 1：搜尋職缺
+        with pool.lease() as session:
+            jobs = search_104_jobs(session, keyword, max_results)
         
-        # 如果沒有電話或 Email，嘗試爬官網
-        if (not contact_info.get('phone') or not contact_info.get('email')) and contact_info.get('website'):
-            website_contact = scrape_company_website(contact_info.get('website'))
-            
-            if not contact_info.get('phone'):
-                contact_info['phone'] = website_contact.get('phone')
-            if not contact_info.get('email'):
-                contact_info['email'] = website_contact.get('email')
-        
-        # 整合資料
-        detailed_job = {
-            "company": job.get('company', 'N/A'),
-            "job_title": job.get('title', 'N/A'),
-            "location": job.get('location', 'N/A'),
-            "salary": job.get('salary', 'N/A'),
-            "url": job.get('url', ''),
-            "phone": contact_info.get('phone') or "待查",
-            "email": contact_info.get('email') or "待查",
-            "website": contact_info.get('website') or "待查",
-            "contact_person": "您好",
-            "status": "待聯繫"
-        }
+        if not jobs:
+            print("[]")
+            return
         
-        detailed_jobs.append(detailed_job)
-        log_debug(f"✅ 完成: {detailed_job['company']}")
+        # 步驟 2：提取每個職缺的公司聯絡方式（多個 session 同時處理不同職缺）
+        detailed_jobs = [d for d in pool.map(process_job, jobs) if d]
     
     # 輸出 JSON
     print(json.dumps(detailed_jobs, ensure_ascii=False, indent=2))
@@ -4,16 +4,13 @@
 用途：搜尋職缺，提取公司和職位資訊
 """
 
-import subprocess
 import json
+import os
 import re
 import sys
 from datetime import datetime
 
-def run_browser_command(cmd):
-    """執行 agent-browser 指令"""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    return result.stdout
+from browser_pool import BrowserSession
 
 def search_104_jobs(keyword, max_results=20):
     """搜尋 104 職缺"""
@@ -21,15 +18,18 @@ def search_104_jobs(keyword, max_results=20):
     with open(f"/tmp/104-scraper-debug.log", 'a', encoding='utf-8') as log:
         log.write(f"[{datetime.now()}] 🔍 搜尋: {keyword}\n")
     
-    # 開啟搜尋頁面
-    url = f"https://www.104.com.tw/jobs/search/?keyword={keyword}"
-    run_browser_command(f'agent-browser open "{url}"')
+    # 使用獨立的具名 session，不影響其他同時執行的爬蟲
+    session = BrowserSession(f"104-search-{os.getpid()}")
     
-    # 等待載入
-    run_browser_command('agent-browser wait --load networkidle')
+    # 開啟搜尋頁面並等待載入
+    url = f"https://www.104.com.tw/jobs/search/?keyword={keyword}"
+    session.open(url)
     
     # 取得快照
-    snapshot_json = run_browser_command('agent-browser snapshot -i --json')
+    snapshot_json = session.snapshot(interactive=True, as_json=True)
+    
+    # 關閉瀏覽器
+    session.close()
     
     try:
         data = json.loads(snapshot_json)
@@ -90,9 +90,6 @@ def search_104_jobs(keyword, max_results=20):
     if current_job and len(jobs) < max_results:
         jobs.append(current_job)
     
-    # 關閉瀏覽器
-    run_browser_command('agent-browser close')
-    
     return jobs
 
 def main():
@@ -10,11 +10,33 @@ import re
 import sys
 from datetime import datetime
 
+from page_cache import PageCache
+
+# 頁面快取在 main() 才建立（import 時不建目錄、不開 SQLite）；未建立時直接抓取
+PAGE_CACHE = None
+
 def run_browser_command(cmd):
     """執行 agent-browser 指令"""
     result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
     return result.stdout
 
+def fetch_snapshot_json(url, wait_cmd='agent-browser wait --load networkidle'):
+    """開啟頁面並取得 snapshot JSON，經頁面快取（重跑時直接重用）"""
+    def fetch():
+        run_browser_command(f'agent-browser open "{url}"')
+        run_browser_command(wait_cmd)
+        snapshot_json = run_browser_command('agent-browser snapshot -i --json')
+        # 只快取可解析的 snapshot，失敗的頁面下次重抓
+        try:
+            json.loads(snapshot_json)
+        except ValueError:
+            return None
+        return snapshot_json
+    
+    if PAGE_CACHE is None:
+        return fetch() or ''
+    return PAGE_CACHE.get_or_fetch(url, fetch, variant='snapshot -i --json') or ''
+
 def extract_company_id_from_url(url):
     """從 104 職缺 URL 提取公司 ID"""
     # URL 格式：https://www.104.com.tw/job/xxxxx
@@ -28,12 +50,8 @@ def scrape_104_company_page(job_url):
     """訪問 104 職缺頁面，提取公司資訊"""
     log_debug(f"訪問職缺頁面: {job_url}")
     
-    # 開啟職缺頁面
-    run_browser_command(f'agent-browser open "{job_url}"')
-    run_browser_command('agent-browser wait --load networkidle')
-    
-    # 取得快照
-    snapshot_json = run_browser_command('agent-browser snapshot -i --json')
+    # 開啟職缺頁面並取得快照
+    snapshot_json = fetch_snapshot_json(job_url)
     
     try:
         data = json.loads(snapshot_json)
@@ -96,10 +114,7 @@ def scrape_company_website(website_url):
     
     for url in contact_urls:
         try:
-            run_browser_command(f'agent-browser open "{url}"')
-            run_browser_command('agent-browser wait --load networkidle --timeout 5000')
-            
-            snapshot_json = run_browser_command('agent-browser snapshot -i --json')
+            snapshot_json = fetch_snapshot_json(url, 'agent-browser wait --load networkidle --timeout 5000')
             data = json.loads(snapshot_json)
             text = data.get('data', {}).get('text', '')
             
@@ -168,6 +183,9 @@ def main():
     
     input_file = sys.argv[1]
     
+    global PAGE_CACHE
+    PAGE_CACHE = PageCache()
+    
     # 讀取公司列表
     with open(input_file, 'r', encoding='utf-8') as f:
         companies = json.load(f)
@@ -187,6 +205,8 @@ def main():
     run_browser_command('agent-browser close')
     
     log_debug(f"✅ 全部完成，共處理 {len(detailed_companies)} 家公司")
+    if PAGE_CACHE is not None:
+        log_debug(PAGE_CACHE.summary())
 
 if __name__ == "__main__":
     main()